@@ -0,0 +1,297 @@
+"""Headless benchmark of DownloadCore against a local stand-in server.
+
+Run from the tool folder:  python -m Benchmarks.DownloadBenchmark [--backends native,aria2,idm] [--size 64]
+Results are written as JSON to Logs/Benchmarks so runs can be compared before a release.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import platform
+import argparse
+import threading
+import subprocess
+import urllib.request
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+import psutil
+from PySide6.QtCore import QCoreApplication
+
+from Core.Logger import logger
+from Core.ConfigManager import ConfigManager
+from Core.GameManager import GameManager
+from Core.MainDataManager import MainDataManager
+from Core.AppDataManager import AppDataManager
+from Core.ErrorHandler import ErrorHandler
+from Core.DownloadCore import DownloadCore
+
+BENCHMARK_DIR = os.path.join("Logs", "Benchmarks")
+BACKENDS = ["native", "aria2", "idm"]
+SCENARIOS = {
+    # Server options per scenario; "resume" cancels the download part way and starts it again
+    "baseline": {},
+    "no-ranges": {"--no-ranges": None},
+    "disconnects": {"--disconnect-after": 1024 * 1024, "--disconnect-count": 3},
+    "resume": {},
+}
+RESUME_AT = 0.4  # Fraction of the payload served before the first attempt of "resume" is canceled
+
+class BenchmarkConfig:
+    """Answers the download settings of a run and defers every other key to the user's ConfigManager."""
+    def __init__(self, **settings):
+        self.settings = settings
+        self.config_manager = ConfigManager()
+
+    def __getattr__(self, name: str):
+        key = name[len("getConfigKey"):] if name.startswith("getConfigKey") else None
+        if key in self.settings:
+            value = self.settings[key]
+            return lambda: value
+        return getattr(self.config_manager, name)
+
+class BenchmarkDownloadCore(DownloadCore):
+    """DownloadCore storing into the benchmark folder instead of the game's Profiles folder."""
+    def __init__(self, url: str, update_name: str, work_dir: str, config: BenchmarkConfig, size_bytes: int):
+        self.work_dir = work_dir
+        super().__init__(url, "", update_name, GameManager().getTabKeyTitleUpdates(), size_bytes=size_bytes, config_manager=config)
+
+    def _get_profile_folder(self) -> str: return os.path.join(self.work_dir, "Profiles")
+    def _get_tuning_store(self) -> str: return os.path.join(self.work_dir, "SegmentTuning.json")
+
+class ResourceSampler:
+    """CPU time of this process and its children (aria2c, the IDM stub) over a run."""
+    INTERVAL = 0.1
+
+    def __init__(self):
+        self.process = psutil.Process()
+        self.children: Dict[int, float] = {}
+        self.stop_event = threading.Event()
+        self.start_cpu = self._own_cpu()
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+        self.thread.start()
+
+    def _own_cpu(self) -> float:
+        times = self.process.cpu_times()
+        return times.user + times.system
+
+    def _sample(self) -> None:
+        while not self.stop_event.wait(self.INTERVAL):
+            for child in self.process.children(recursive=True):
+                try:
+                    times = child.cpu_times()
+                    self.children[child.pid] = times.user + times.system
+                except psutil.Error:
+                    continue
+
+    def stop(self) -> float:
+        self.stop_event.set()
+        self.thread.join()
+        return self._own_cpu() - self.start_cpu + sum(self.children.values())
+
+class StandInProcess:
+    """The stand-in server in its own process, so its CPU use is not counted against the backend."""
+    def __init__(self, size_bytes: int, latency: float, bandwidth: int, options: Dict[str, Any]):
+        command = [sys.executable, "-m", "Benchmarks.StandInServer", "--size", str(size_bytes),
+                   "--latency", str(latency), "--bandwidth", str(bandwidth)]
+        for flag, value in options.items():
+            command += [flag] if value is None else [flag, str(value)]
+        self.process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        info = json.loads(self.process.stdout.readline())
+        self.base_url = f"http://127.0.0.1:{info['Port']}"
+        self.sha1 = info["SHA1"]
+
+    def url(self, name: str) -> str: return f"{self.base_url}/{name}.bin"
+
+    def call(self, endpoint: str) -> Dict[str, Any]:
+        with urllib.request.urlopen(f"{self.base_url}/{endpoint}", timeout=10) as response:
+            return json.loads(response.read())
+
+    def stop(self) -> None:
+        self.process.terminate()
+        self.process.wait(timeout=10)
+
+class ErrorCapture(logging.Handler):
+    """Collects the errors DownloadCore reports while dialogs are off."""
+    def __init__(self, errors: List[str]):
+        super().__init__(level=logging.ERROR)
+        self.errors = errors
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.errors.append(record.getMessage())
+
+def create_idm_stub(work_dir: str) -> str:
+    """Command file that runs the IDM stub, since DownloadCore launches IDM as an executable path."""
+    stub = os.path.abspath(os.path.join(os.path.dirname(__file__), "IDMStub.py"))
+    wrapper = os.path.join(work_dir, "IDMStub.cmd")
+    with open(wrapper, "w", encoding="utf-8") as f:
+        f.write(f'@"{sys.executable}" "{stub}" %*\n')
+    return wrapper
+
+def get_backend_settings(backend: str, segments: int, idm_path: str) -> Dict[str, Any]:
+    return {
+        "DownloadEngine": "Aria2" if backend == "aria2" else "Native",
+        "AutoUseIDM": backend == "idm",
+        "IDMPath": idm_path,
+        "Segments": str(segments),
+        "AutoTuneSegments": False,
+        "SpeedLimitEnabled": False,
+        "EnableDownloadLogs": False,
+        "LogDownloadProgress": False,
+        "InstallSquadsWhileDownloading": False,
+    }
+
+def sha1_of(path: str) -> Optional[str]:
+    if not os.path.isfile(path):
+        return None
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+def run_attempt(core: DownloadCore, server: StandInProcess, timeout: float, cancel_at: Optional[int] = None) -> bool:
+    """Run one DownloadCore synchronously; a watcher cancels it at cancel_at bytes served or on timeout."""
+    completed, done = [], threading.Event()
+    core.download_completed_signal.connect(lambda: completed.append(True))
+
+    def watch():
+        deadline = time.monotonic() + timeout
+        while not done.wait(0.05):
+            if time.monotonic() > deadline:
+                logger.warning(f"Benchmark run {core.update_name} timed out after {timeout:.0f}s")
+                core.cancel(keep_partial=True)
+                return
+            if cancel_at is not None and server.call("__stats")["BytesSent"] >= cancel_at:
+                core.cancel(keep_partial=True)
+                return
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    try:
+        core.run()
+    finally:
+        done.set()
+        watcher.join()
+    return bool(completed)
+
+def run_benchmark(backend: str, scenario: str, index: int, server: StandInProcess, args, work_dir: str, idm_path: str) -> Dict[str, Any]:
+    size_bytes = args.size * 1024 * 1024
+    update_name = f"Benchmark {backend} {scenario} {index}"
+    result: Dict[str, Any] = {"Backend": backend, "Scenario": scenario, "Run": index, "SizeBytes": size_bytes}
+    if backend == "aria2" and not MainDataManager().getAria2c():
+        return {**result, "Skipped": "aria2c.exe not found in Data/ThirdParty"}
+    if backend == "idm" and scenario == "resume":
+        return {**result, "Skipped": "IDM downloads are handed off and cannot be canceled by the tool"}
+
+    config = BenchmarkConfig(**get_backend_settings(backend, args.segments, idm_path))
+    final_path = os.path.join(work_dir, "Profiles", f"{update_name}.rar")
+    for path in (final_path, final_path + ".digest"):
+        if os.path.exists(path):
+            os.remove(path)
+    AppDataManager.manageTempFolder(clean=True, subfolder=update_name)
+    errors: List[str] = []
+    capture = ErrorCapture(errors)
+    logger.addHandler(capture)
+    server.call("__reset")
+    sampler = ResourceSampler()
+    started_wall, started = time.time(), time.monotonic()
+    success = False
+    try:
+        if scenario == "resume":
+            first = BenchmarkDownloadCore(server.url(update_name), update_name, work_dir, config, size_bytes)
+            run_attempt(first, server, args.timeout, cancel_at=int(size_bytes * RESUME_AT))
+            result["ServedBeforeCancel"] = server.call("__stats")["BytesSent"]
+        core = BenchmarkDownloadCore(server.url(update_name), update_name, work_dir, config, size_bytes)
+        success = run_attempt(core, server, args.timeout)
+        if backend == "idm" and success:
+            # DownloadCore only sees the IDM file once it is renamed into place
+            core.process.wait(timeout=args.timeout)
+    finally:
+        elapsed = time.monotonic() - started
+        cpu_seconds = sampler.stop()
+        logger.removeHandler(capture)
+    stats = server.call("__stats")
+    digest = sha1_of(final_path)
+    first_byte = stats["FirstByteTime"]
+    result.update({
+        "Success": success and digest == server.sha1,
+        "SHA1Match": digest == server.sha1,
+        "Seconds": round(elapsed, 3),
+        "ThroughputMBps": round(size_bytes / elapsed / 1024 ** 2, 2) if success and elapsed else None,
+        "TimeToFirstByte": round(first_byte - started_wall, 3) if first_byte else None,
+        "CPUSeconds": round(cpu_seconds, 3),
+        "CPUPercent": round(cpu_seconds / elapsed * 100, 1) if elapsed else None,
+        "Requests": stats["Requests"],
+        "BytesServed": stats["BytesSent"],
+        "Overfetch": round(stats["BytesSent"] / size_bytes, 3),
+        "Errors": errors,
+    })
+    if scenario == "resume":
+        # A correct resume fetches again at most a little of what the first attempt kept, a restart fetches all of it
+        result["Refetched"] = max(stats["BytesSent"] - size_bytes, 0)
+        result["ResumeCorrect"] = result["SHA1Match"] and result["Refetched"] < result["ServedBeforeCancel"] * 0.5
+    for path in (final_path, final_path + ".digest"):
+        if os.path.exists(path):
+            os.remove(path)
+    AppDataManager.manageTempFolder(clean=True, subfolder=update_name)
+    return result
+
+def print_summary(results: List[Dict[str, Any]]) -> None:
+    print(f"\n{'Backend':<8} {'Scenario':<12} {'Run':>3} {'OK':<4} {'MB/s':>8} {'TTFB s':>7} {'CPU %':>6} {'Served':>7}")
+    for r in results:
+        if "Skipped" in r:
+            print(f"{r['Backend']:<8} {r['Scenario']:<12} {r['Run']:>3} skipped: {r['Skipped']}")
+            continue
+        print(f"{r['Backend']:<8} {r['Scenario']:<12} {r['Run']:>3} {'yes' if r['Success'] else 'NO':<4} "
+              f"{r['ThroughputMBps'] or 0:>8.2f} {r['TimeToFirstByte'] or 0:>7.3f} {r['CPUPercent'] or 0:>6.1f} {r['Overfetch']:>7.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DownloadCore against a local stand-in server.")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Comma separated: native, aria2, idm")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--size", type=int, default=64, help="Payload size in MB")
+    parser.add_argument("--latency", type=float, default=50, help="Milliseconds before each response")
+    parser.add_argument("--bandwidth", type=int, default=4096, help="KB/s per connection, 0 for unlimited")
+    parser.add_argument("--segments", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds before a run is canceled")
+    parser.add_argument("--output", default=None, help="JSON file for the results")
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)  # Qt objects without any window
+    ErrorHandler.show_dialogs = False
+    work_dir = os.path.abspath(os.path.join(BENCHMARK_DIR, "Work"))
+    os.makedirs(work_dir, exist_ok=True)
+    idm_path = create_idm_stub(work_dir)
+    backends = [b.strip().lower() for b in args.backends.split(",") if b.strip()]
+    scenarios = [s.strip().lower() for s in args.scenarios.split(",") if s.strip()]
+    report = {
+        "Started": datetime.now().isoformat(timespec="seconds"),
+        "Machine": {"Platform": platform.platform(), "Python": platform.python_version(), "CPUs": os.cpu_count()},
+        "Settings": {k: v for k, v in vars(args).items() if k != "output"},
+        "Results": [],
+    }
+    for scenario in scenarios:
+        server = StandInProcess(args.size * 1024 * 1024, args.latency / 1000, args.bandwidth * 1024, SCENARIOS[scenario])
+        try:
+            for backend in backends:
+                for index in range(1, args.runs + 1):
+                    logger.info(f"Benchmark: {backend} / {scenario} / run {index}")
+                    report["Results"].append(run_benchmark(backend, scenario, index, server, args, work_dir, idm_path))
+        finally:
+            server.stop()
+
+    output = args.output or os.path.join(BENCHMARK_DIR, f"DownloadBenchmark {datetime.now():%Y-%m-%d %H.%M.%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print_summary(report["Results"])
+    print(f"\nResults written to {output}")
+    del app
+    sys.exit(0 if all(r.get("Success", True) for r in report["Results"]) else 1)
+
+if __name__ == "__main__":
+    main()
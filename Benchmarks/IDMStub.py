@@ -0,0 +1,43 @@
+import os
+import sys
+import shutil
+import http.client
+import urllib.request
+
+MAX_ATTEMPTS = 5
+
+def main():
+    """Stands in for IDMan.exe: /d <url> /p <folder> /f <file name> [/n].
+
+    Downloads over one connection, resuming it if it drops, next to the target and renames it into
+    place once complete, which is when DownloadCore sees the file appear, as with IDM.
+    """
+    args, options = sys.argv[1:], {}
+    while args:
+        flag = args.pop(0).lower()
+        if flag in ("/d", "/p", "/f") and args:
+            options[flag] = args.pop(0)
+    url, folder, file_name = options.get("/d"), options.get("/p"), options.get("/f")
+    if not (url and folder and file_name):
+        print("Usage: IDMStub.py /d <url> /p <folder> /f <file name> [/n]", file=sys.stderr)
+        sys.exit(2)
+    os.makedirs(folder, exist_ok=True)
+    temp_path = os.path.join(folder, f"{file_name}.idmstub")
+    with open(temp_path, "wb") as f:
+        for attempt in range(MAX_ATTEMPTS):
+            # Pick up where a dropped connection left off
+            request = urllib.request.Request(url, headers={"Range": f"bytes={f.tell()}-"} if f.tell() else {})
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    total = f.tell() + int(response.headers.get("Content-Length") or 0)
+                    shutil.copyfileobj(response, f, 1024 * 1024)
+                if f.tell() >= total:
+                    break
+            except (OSError, http.client.HTTPException) as e:
+                print(f"Attempt {attempt + 1} stopped at {f.tell()} bytes: {e}", file=sys.stderr)
+        else:
+            sys.exit(1)
+    os.replace(temp_path, os.path.join(folder, file_name))
+
+if __name__ == "__main__":
+    main()
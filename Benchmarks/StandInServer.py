@@ -0,0 +1,161 @@
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class StandInServer:
+    """Local HTTP server standing in for the download hosts in benchmarks.
+
+    Serves one deterministic payload under any path, with a configurable delay before each response,
+    a bandwidth cap per connection, optional Range support and connections that are cut mid-stream.
+    GET /__stats returns the counters as JSON and GET /__reset clears them; neither is counted.
+    """
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, size_bytes: int, latency: float = 0.0, bandwidth: int = 0, ranges: bool = True,
+                 disconnect_after: int = 0, disconnect_count: int = 0, seed: int = 2025):
+        self.size_bytes = size_bytes
+        self.latency = latency  # Seconds before the response headers are sent
+        self.bandwidth = bandwidth  # Bytes per second per connection, 0 for unlimited
+        self.ranges = ranges
+        self.disconnect_after = disconnect_after  # Bytes sent before a connection is cut, 0 to never cut
+        self.disconnect_count = disconnect_count  # How many connections are cut, 0 for all of them
+        self.payload = random.Random(seed).randbytes(size_bytes)
+        self.sha1 = hashlib.sha1(self.payload).hexdigest()
+        self.lock = threading.Lock()
+        self.httpd = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.disconnects = 0
+            self.first_byte_time = None  # Wall clock, so other processes can compare it with their own
+
+    def getStats(self) -> dict:
+        with self.lock:
+            return {"Requests": self.requests, "BytesSent": self.bytes_sent, "Disconnects": self.disconnects,
+                    "FirstByteTime": self.first_byte_time, "SizeBytes": self.size_bytes, "SHA1": self.sha1}
+
+    def serve(self, port: int = 0) -> None:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_HEAD(self):
+                server._respond(self, send_body=False)
+
+            def do_GET(self):
+                if self.path == "/__stats":
+                    server._send_json(self, server.getStats())
+                elif self.path == "/__reset":
+                    server.reset()
+                    server._send_json(self, server.getStats())
+                else:
+                    server._respond(self, send_body=True)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        # The benchmark reads the port from the first line
+        print(json.dumps({"Port": self.httpd.server_address[1], "SHA1": self.sha1}), flush=True)
+        self.httpd.serve_forever()
+
+    @staticmethod
+    def _send_json(handler: BaseHTTPRequestHandler, data: dict) -> None:
+        body = json.dumps(data).encode("utf-8")
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _should_disconnect(self) -> bool:
+        with self.lock:
+            if not self.disconnect_after or (self.disconnect_count and self.disconnects >= self.disconnect_count):
+                return False
+            self.disconnects += 1
+            return True
+
+    def _respond(self, handler: BaseHTTPRequestHandler, send_body: bool) -> None:
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        start, end, status = 0, self.size_bytes - 1, 200
+        match = re.match(r"bytes=(\d+)-(\d*)", handler.headers.get("Range", ""))
+        if self.ranges and match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), end) if match.group(2) else end
+            if start > end:
+                handler.send_response(416)
+                handler.send_header("Content-Range", f"bytes */{self.size_bytes}")
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+                return
+            status = 206
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/octet-stream")
+        handler.send_header("Content-Length", str(end - start + 1))
+        handler.send_header("ETag", f'"{self.sha1[:16]}"')
+        handler.send_header("Last-Modified", "Wed, 01 Jan 2025 00:00:00 GMT")
+        if self.ranges:
+            handler.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            handler.send_header("Content-Range", f"bytes {start}-{end}/{self.size_bytes}")
+        handler.end_headers()
+        if send_body:
+            self._send_body(handler, start, end)
+
+    def _send_body(self, handler: BaseHTTPRequestHandler, start: int, end: int) -> None:
+        cut_at = start + self.disconnect_after if end - start + 1 > self.disconnect_after and self._should_disconnect() else None
+        position, began = start, time.monotonic()
+        try:
+            while position <= end:
+                size = min(self.CHUNK_SIZE, end - position + 1)
+                if cut_at is not None and position + size > cut_at:
+                    size = cut_at - position
+                handler.wfile.write(self.payload[position:position + size])
+                with self.lock:
+                    if self.first_byte_time is None:
+                        self.first_byte_time = time.time()
+                    self.bytes_sent += size
+                position += size
+                if position == cut_at:
+                    handler.close_connection = True
+                    return
+                if self.bandwidth:
+                    # Sleep off whatever this connection is ahead of its cap
+                    ahead = (position - start) / self.bandwidth - (time.monotonic() - began)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except (ConnectionError, OSError):
+            handler.close_connection = True
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP stand-in for download hosts.")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--size", type=int, required=True, help="Payload size in bytes")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+    parser.add_argument("--bandwidth", type=int, default=0, help="Bytes per second per connection")
+    parser.add_argument("--no-ranges", action="store_true")
+    parser.add_argument("--disconnect-after", type=int, default=0, help="Bytes sent before a connection is cut")
+    parser.add_argument("--disconnect-count", type=int, default=0, help="Connections to cut, 0 for all")
+    args = parser.parse_args()
+    try:
+        StandInServer(args.size, args.latency, args.bandwidth, not args.no_ranges,
+                      args.disconnect_after, args.disconnect_count).serve(args.port)
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
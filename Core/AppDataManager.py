@@ -1,8 +1,8 @@
 import os
-import shutil
 from typing import Optional
 from Core.Logger import logger
 from Core.ErrorHandler import ErrorHandler
+from Core.FastDelete import FastDelete
 
 class AppDataManager:
     TEMP_ROOT = os.getenv('LOCALAPPDATA')
@@ -21,15 +21,34 @@ class AppDataManager:
     def getBackupsFolder() -> str: return AppDataManager.BACKUPS_DIR
 
     @staticmethod
-    def manageTempFolder(clean: bool = False, subfolder: str = None, clean_all: bool = False) -> Optional[str]:
+    def isResumableDownload(folder: str) -> bool:
+        """Whether a temp subfolder holds a partial download with a journal or aria2 control file."""
         try:
-            if clean_all and os.path.exists(AppDataManager.TEMP_DIR):
-                shutil.rmtree(AppDataManager.TEMP_DIR, ignore_errors=True)
+            return any(name.endswith((".journal", ".aria2")) for name in os.listdir(folder))
+        except OSError:
+            return False
+
+    @staticmethod
+    def manageTempFolder(clean: bool = False, subfolder: str = None, clean_all: bool = False, keep_resumable: bool = False) -> Optional[str]:
+        try:
+            if clean_all and keep_resumable and os.path.exists(AppDataManager.TEMP_DIR):
+                for entry in os.scandir(AppDataManager.TEMP_DIR):
+                    if FastDelete.isTrash(entry.name):
+                        continue
+                    if entry.is_dir() and AppDataManager.isResumableDownload(entry.path):
+                        logger.info(f"Keeping resumable download: {entry.path}")
+                    elif entry.is_dir():
+                        FastDelete.deleteInBackground(entry.path, ignore_errors=True)
+                    else:
+                        os.remove(entry.path)
+                logger.info(f"Temp folder cleaned: {AppDataManager.TEMP_DIR}")
+            elif clean_all and os.path.exists(AppDataManager.TEMP_DIR):
+                FastDelete.deleteInBackground(AppDataManager.TEMP_DIR, ignore_errors=True)
                 logger.info(f"Temp folder fully cleaned: {AppDataManager.TEMP_DIR}")
             elif clean and subfolder:
                 subfolder_path = os.path.join(AppDataManager.TEMP_DIR, subfolder)
                 if os.path.exists(subfolder_path):
-                    shutil.rmtree(subfolder_path, ignore_errors=True)
+                    FastDelete.deleteInBackground(subfolder_path, ignore_errors=True)
                     logger.info(f"Temp subfolder cleaned: {subfolder_path}")
             if not os.path.exists(AppDataManager.TEMP_DIR):
                 os.makedirs(AppDataManager.TEMP_DIR, exist_ok=True)
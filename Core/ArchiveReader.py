@@ -0,0 +1,367 @@
+import os
+import time
+import hashlib
+import threading
+import subprocess
+import zipfile
+import py7zr
+import rarfile
+from py7zr.io import Py7zIO, WriterFactory, NullIO
+from typing import Optional, List, Dict, Callable
+
+from Core.Logger import logger
+from Core.DiskAllocator import DiskAllocator
+from Core.MainDataManager import MainDataManager
+
+EXTRACT_CHUNK_SIZE = 1024 * 1024
+
+class ArchiveError(Exception):
+    """Raised when an archive cannot be opened or one of its members cannot be extracted."""
+
+class ArchiveCanceled(ArchiveError):
+    """Raised inside an extraction to stop it once the caller asks to cancel."""
+
+class ArchiveMember:
+    """A file stored in an archive, in archive order; directories are not listed."""
+    def __init__(self, name: str, size: int, mtime: Optional[float] = None):
+        self.name = name.replace('\\', '/')
+        self.size = size
+        self.mtime = mtime
+        self.sha1: Optional[str] = None  # Of the extracted bytes, when extract() was asked for digests
+
+    def __repr__(self) -> str:
+        return f"ArchiveMember({self.name!r}, {self.size})"
+
+class ArchiveReader:
+    """One way to list and extract zip, rar and 7z archives.
+
+    extract() reads the archive once from front to back and writes every selected member while it goes,
+    into a file whose full size is reserved first. For solid 7z and rar archives that matters most: asking
+    for members one at a time decompresses the solid block again from its start for each of them.
+    """
+    EXTENSIONS = (".zip", ".rar", ".7z")
+    MAX_WORKERS = 8
+    UNKNOWN_DRIVE_WORKERS = 2
+
+    def __init__(self, path: str, password: Optional[str] = None, unrar_tool: Optional[str] = None):
+        self.path = path
+        self.password = password
+        self.unrar_tool = unrar_tool or MainDataManager().getUnRAR()
+        self.ext = os.path.splitext(path)[1].lower()
+        self._members: Optional[List[ArchiveMember]] = None
+        self._archive = None
+        if self.ext not in self.EXTENSIONS:
+            raise ArchiveError(f"Unsupported archive type: {self.ext}")
+        if self.ext == ".rar" and unrar_tool:
+            if not os.path.exists(unrar_tool):
+                raise ArchiveError(f"UnRAR tool not found at: {unrar_tool}")
+            rarfile.UNRAR_TOOL = unrar_tool
+        try:
+            self._archive = self._open_archive()
+        except Exception as e:
+            raise ArchiveError(f"Failed to open archive {path}: {str(e)}") from e
+
+    def _open_archive(self):
+        """A new handle on the archive; parallel workers each read through their own."""
+        if self.ext == ".zip":
+            archive = zipfile.ZipFile(self.path, 'r')
+            if self.password:
+                archive.setpassword(self.password.encode('utf-8'))
+        elif self.ext == ".rar":
+            archive = rarfile.RarFile(self.path)
+            archive.setpassword(self.password)
+        else:
+            archive = py7zr.SevenZipFile(self.path, 'r', password=self.password)
+        return archive
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        if self._archive:
+            self._archive.close()
+            self._archive = None
+
+    # region Public API
+    def getMembers(self) -> List[ArchiveMember]:
+        """Files in the archive, in the order they are stored."""
+        if self._members is None:
+            if self.ext == ".7z":
+                self._members = [
+                    ArchiveMember(item.filename, item.uncompressed, item.creationtime.timestamp() if item.creationtime else None)
+                    for item in self._archive.list() if not item.is_directory and not item.is_symlink
+                ]
+            else:
+                self._members = [
+                    ArchiveMember(item.filename, item.file_size, time.mktime(tuple(item.date_time) + (0, 0, -1)) if item.date_time else None)
+                    for item in self._archive.infolist() if not item.is_dir()
+                ]
+        return self._members
+
+    def getNames(self) -> List[str]:
+        return [member.name for member in self.getMembers()]
+
+    def extract(self, dest_dir: str, include: Optional[Callable[[ArchiveMember], bool]] = None,
+                rename: Optional[Callable[[ArchiveMember], str]] = None,
+                progress_callback: Optional[Callable[[int, int, int, int, str], None]] = None,
+                cancel_check: Optional[Callable[[], bool]] = None, workers: int = 1, digest: bool = False) -> List[ArchiveMember]:
+        """Extract the members include() accepts, or all of them, under dest_dir in a single pass.
+
+        rename(member) gives the path a member is written to relative to dest_dir, its name in the archive
+        by default, so files land where they belong without being moved afterwards.
+        progress_callback(bytes_done, bytes_total, files_done, files_total, name) follows every written chunk.
+        Returns the members that were written; if cancel_check() turns true the extraction stops where it is.
+        With workers above 1, zip and non-solid rar members are written by that many threads, see getWorkerCount().
+        With digest, the SHA1 of every written member is taken on the way through and kept in member.sha1.
+        """
+        members = [member for member in self.getMembers() if include is None or include(member)]
+        names = {id(member): (rename(member) if rename else member.name).replace('\\', '/') for member in members}
+        progress = _ExtractProgress(members, names, progress_callback, cancel_check, digest)
+        targets = {id(member): self.getTargetPath(dest_dir, names[id(member)]) for member in members}
+        try:
+            if self.ext == ".rar" and self._archive.is_solid():
+                self._extract_solid_rar(members, targets, progress)
+            elif self.ext in (".zip", ".rar") and workers > 1 and len(members) > 1:
+                self._extract_parallel(members, targets, progress, workers)
+            elif self.ext in (".zip", ".rar"):
+                self._extract_zip(members, targets, progress)
+            else:
+                self._extract_7z(dest_dir, members, targets, progress)
+        except ArchiveCanceled:
+            logger.info(f"Extraction of {os.path.basename(self.path)} canceled after {progress.files_done} of {len(members)} files")
+        return progress.written
+
+    @staticmethod
+    def getWorkerCount(dest_dir: str) -> int:
+        """Threads worth extracting with into dest_dir: up to one per core on SSD/NVMe, one on a spinning disk."""
+        solid_state = DiskAllocator.isSolidState(dest_dir)
+        if solid_state is False:
+            # Parallel writers only make the heads seek between files
+            return 1
+        cpus = os.cpu_count() or 1
+        return max(1, min(cpus, ArchiveReader.MAX_WORKERS if solid_state else ArchiveReader.UNKNOWN_DRIVE_WORKERS))
+    # endregion
+
+    # region Extraction
+    def _extract_zip(self, members: List[ArchiveMember], targets: Dict[int, str], progress: "_ExtractProgress") -> None:
+        """Zip members, and rar members that are not solid, can each be opened where they start."""
+        for member in members:
+            progress.check()
+            with self._archive.open(member.name) as src:
+                self._write_member(src, targets[id(member)], member, progress)
+
+    def _extract_parallel(self, members: List[ArchiveMember], targets: Dict[int, str], progress: "_ExtractProgress", workers: int) -> None:
+        """Spread independent members over worker threads, largest first so the drive is kept busy to the end."""
+        queue = sorted(members, key=lambda member: member.size, reverse=True)
+        lock = threading.Lock()
+        errors: List[BaseException] = []
+
+        def next_member() -> Optional[ArchiveMember]:
+            with lock:
+                return queue.pop(0) if queue and not progress.aborted.is_set() else None
+
+        def run_worker():
+            archive = None
+            try:
+                archive = self._open_archive()
+                while member := next_member():
+                    with archive.open(member.name) as src:
+                        self._write_member(src, targets[id(member)], member, progress)
+            except BaseException as e:
+                errors.append(e)
+                # The other workers stop at their next chunk
+                progress.aborted.set()
+            finally:
+                if archive:
+                    archive.close()
+
+        threads = [threading.Thread(target=run_worker, daemon=True) for _ in range(min(workers, len(members)))]
+        logger.debug(f"Extracting {len(members)} files from {os.path.basename(self.path)} with {len(threads)} workers")
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            # A real failure is worth more than the cancellations it caused in the other workers
+            raise next((e for e in errors if not isinstance(e, ArchiveCanceled)), errors[0])
+
+    def _extract_solid_rar(self, members: List[ArchiveMember], targets: Dict[int, str], progress: "_ExtractProgress") -> None:
+        """Run unrar once over the whole archive and split what it prints by the member sizes."""
+        # "p" prints every file in archive order, -inul drops the messages around them, -p- never prompts for a password
+        cmd = [self.unrar_tool, "p", "-inul", f"-p{self.password}" if self.password else "-p-", "--", self.path]
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+        try:
+            for member in self.getMembers():
+                progress.check()
+                if id(member) in targets:
+                    self._write_member(_LimitedReader(proc.stdout, member.size), targets[id(member)], member, progress)
+                else:
+                    _LimitedReader(proc.stdout, member.size).skip()
+            if proc.stdout.read(1):
+                raise ArchiveError(f"{os.path.basename(self.path)} holds more data than its file list")
+            proc.wait()
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        finally:
+            proc.stdout.close()
+        if proc.returncode:
+            raise ArchiveError(f"UnRAR failed with exit code {proc.returncode} on {os.path.basename(self.path)}")
+
+    def _extract_7z(self, dest_dir: str, members: List[ArchiveMember], targets: Dict[int, str], progress: "_ExtractProgress") -> None:
+        """One py7zr pass; the selected members are handed to writers that put them in place as they are decoded."""
+        if not members:
+            return
+        self._archive.reset()
+        self._archive.extract(path=dest_dir, targets=[member.name for member in members],
+                              factory=_MemberWriterFactory(dest_dir, members, targets, progress))
+
+    @staticmethod
+    def _write_member(src, target: str, member: ArchiveMember, progress: "_ExtractProgress") -> None:
+        hasher = hashlib.sha1() if progress.digest else None
+        with DiskAllocator.openPreallocated(target, member.size) as dst:
+            while chunk := src.read(EXTRACT_CHUNK_SIZE):
+                dst.write(chunk)
+                if hasher:
+                    hasher.update(chunk)
+                progress.advance(len(chunk), member)
+            written = dst.truncate()
+        if hasher:
+            member.sha1 = hasher.hexdigest()
+        if written != member.size:
+            raise ArchiveError(f"{member.name} ended after {written} of {member.size} bytes")
+        ArchiveReader._set_mtime(target, member)
+        progress.finish(member)
+
+    @staticmethod
+    def _set_mtime(target: str, member: ArchiveMember) -> None:
+        if member.mtime is not None:
+            try:
+                os.utime(target, (member.mtime, member.mtime))
+            except (OSError, OverflowError) as e:
+                logger.debug(f"Could not set the modified time of {target}: {e}")
+
+    @staticmethod
+    def getTargetPath(dest_dir: str, name: str) -> str:
+        """Where a member goes under dest_dir; drive letters and ".." parts are dropped."""
+        parts = [part for part in os.path.splitdrive(name.replace('\\', '/'))[1].split('/') if part not in ('', '.', '..')]
+        if not parts:
+            raise ArchiveError(f"Invalid member name in archive: {name!r}")
+        return os.path.join(dest_dir, *parts)
+    # endregion
+
+class _ExtractProgress:
+    """Byte and file counters of one extraction; writers of a 7z archive may call in from several threads."""
+    def __init__(self, members: List[ArchiveMember], names: Dict[int, str], callback: Optional[Callable[[int, int, int, int, str], None]],
+                 cancel_check: Optional[Callable[[], bool]], digest: bool = False):
+        self.bytes_total = sum(member.size for member in members)
+        self.files_total = len(members)
+        self.bytes_done = 0
+        self.files_done = 0
+        self.written: List[ArchiveMember] = []
+        self.names = names
+        self.callback = callback
+        self.cancel_check = cancel_check
+        self.digest = digest
+        self.lock = threading.Lock()
+        self.aborted = threading.Event()
+
+    def check(self) -> None:
+        if self.aborted.is_set() or (self.cancel_check and self.cancel_check()):
+            raise ArchiveCanceled("Extraction canceled")
+
+    def advance(self, size: int, member: ArchiveMember) -> None:
+        self.check()
+        with self.lock:
+            self.bytes_done += size
+            bytes_done, files_done = self.bytes_done, self.files_done
+        if self.callback:
+            self.callback(bytes_done, self.bytes_total, files_done, self.files_total, self.names.get(id(member), member.name))
+
+    def finish(self, member: ArchiveMember) -> None:
+        with self.lock:
+            self.files_done += 1
+            self.written.append(member)
+            bytes_done, files_done = self.bytes_done, self.files_done
+        logger.debug(f"Extracted: {member.name}")
+        if self.callback:
+            self.callback(bytes_done, self.bytes_total, files_done, self.files_total, self.names.get(id(member), member.name))
+
+class _LimitedReader:
+    """Reads the next size bytes of a stream holding several members back to back."""
+    def __init__(self, stream, size: int):
+        self.stream = stream
+        self.remaining = size
+
+    def read(self, size: int) -> bytes:
+        data = self.stream.read(min(size, self.remaining)) if self.remaining else b""
+        if self.remaining and not data:
+            raise ArchiveError("UnRAR output ended early, the archive may be damaged or the password wrong")
+        self.remaining -= len(data)
+        return data
+
+    def skip(self) -> None:
+        while self.read(EXTRACT_CHUNK_SIZE):
+            pass
+
+class _MemberWriter(Py7zIO):
+    """Receives one 7z member from py7zr and writes it to its preallocated target file."""
+    def __init__(self, target: str, member: ArchiveMember, progress: _ExtractProgress):
+        self.target = target
+        self.member = member
+        self.progress = progress
+        self.file = DiskAllocator.openPreallocated(target, member.size)
+        self.hasher = hashlib.sha1() if progress.digest else None
+
+    def write(self, s) -> int:
+        self.file.write(s)
+        if self.hasher:
+            self.hasher.update(s)
+        self.progress.advance(len(s), self.member)
+        return len(s)
+
+    def read(self, size: Optional[int] = None) -> bytes:
+        return b""
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self.file.tell()
+
+    def seekable(self) -> bool:
+        return False
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def size(self) -> int:
+        return self.file.tell()
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self.file.truncate()
+        self.file.close()
+        if self.hasher:
+            self.member.sha1 = self.hasher.hexdigest()
+        ArchiveReader._set_mtime(self.target, self.member)
+        self.progress.finish(self.member)
+
+class _MemberWriterFactory(WriterFactory):
+    """Hands py7zr a writer for each selected member, found by the path py7zr would have written it to."""
+    def __init__(self, dest_dir: str, members: List[ArchiveMember], targets: Dict[int, str], progress: _ExtractProgress):
+        self.dest_dir = os.path.abspath(dest_dir)
+        self.progress = progress
+        self.targets = targets
+        self.members = {os.path.normcase(ArchiveReader.getTargetPath(self.dest_dir, member.name)): member for member in members}
+
+    def create(self, filename: str) -> Py7zIO:
+        member = self.members.get(os.path.normcase(os.path.abspath(filename)))
+        if member is None:
+            # py7zr renames the second of two members sharing a name, only the first one is listed and written
+            logger.debug(f"Skipping duplicate 7z member: {filename}")
+            return NullIO()
+        return _MemberWriter(self.targets[id(member)], member, self.progress)
@@ -0,0 +1,81 @@
+import os
+import sys
+import shutil
+import ctypes
+from typing import Optional, List, Callable
+
+from Core.Logger import logger
+from Core.DiskAllocator import DiskAllocator
+
+class BackupStrategy:
+    """Puts a copy of each file into a backup folder with the cheapest primitive the file system offers.
+
+    - Clone: a copy-on-write clone (FICLONE on Btrfs/XFS), which shares storage until either side is written.
+    - Link: a hard link on the same volume, instant and free of extra space, only used when link=True. Both
+      paths are the same file, so a write in place to either one changes the other: only ask for it where
+      every source file is deleted or replaced before anything writes to it.
+    - Copy: a full copy. On Windows it goes through CopyFileW, which block-clones by itself on ReFS and Dev Drive.
+
+    A primitive that the volume turns down is not tried again for the rest of the files.
+    """
+    CLONE, LINK, COPY = "Clone", "Link", "Copy"
+    FICLONE = 0x40049409
+
+    def __init__(self, source_dir: str, backup_dir: str, link: bool = False):
+        self.methods: List[str] = [self.COPY]
+        if DiskAllocator.isSameVolume(source_dir, backup_dir):
+            if link:
+                self.methods.insert(0, self.LINK)
+            if sys.platform.startswith("linux"):
+                self.methods.insert(0, self.CLONE)
+        self.counts = {method: 0 for method in self.methods}
+
+    def backupFile(self, src: str, dst: str) -> str:
+        """Back up src to dst, which must not exist yet; returns the method used."""
+        while True:
+            method = self.methods[0]
+            try:
+                {self.CLONE: self._clone, self.LINK: self._link, self.COPY: self._copy}[method](src, dst)
+                self.counts[method] += 1
+                return method
+            except OSError as e:
+                if method == self.COPY:
+                    raise
+                logger.info(f"{method} backups not available for {DiskAllocator.getVolume(dst)} ({e}), falling back")
+                self.methods.pop(0)
+                if os.path.lexists(dst):
+                    os.remove(dst)
+
+    def backupFiles(self, files: List[str], source_dir: str, backup_dir: str,
+                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                    cancel_check: Optional[Callable[[], bool]] = None) -> bool:
+        """Back up files, paths under source_dir, to the same relative paths under backup_dir; False if canceled."""
+        for i, src in enumerate(files):
+            if cancel_check and cancel_check():
+                return False
+            dst = os.path.join(backup_dir, os.path.relpath(src, source_dir))
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            self.backupFile(src, dst)
+            if progress_callback:
+                progress_callback(i + 1, len(files))
+        logger.info("Backup methods used: " + ", ".join(f"{method} {count}" for method, count in self.counts.items() if count))
+        return True
+
+    def _clone(self, src: str, dst: str) -> None:
+        import fcntl
+        with open(src, "rb") as s, open(dst, "xb") as d:
+            fcntl.ioctl(d.fileno(), self.FICLONE, s.fileno())
+        shutil.copystat(src, dst)
+
+    @staticmethod
+    def _link(src: str, dst: str) -> None:
+        os.link(src, dst)
+
+    @staticmethod
+    def _copy(src: str, dst: str) -> None:
+        if sys.platform == "win32":
+            # bFailIfExists, as with the other methods
+            if not ctypes.windll.kernel32.CopyFileW(src, dst, True):
+                raise ctypes.WinError()
+            return
+        shutil.copy2(src, dst)
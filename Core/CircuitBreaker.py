@@ -0,0 +1,94 @@
+import time
+import threading
+from urllib.parse import urlsplit
+from typing import Dict
+
+import requests
+
+from Core.Logger import logger
+
+class CircuitOpenError(requests.ConnectionError):
+    """A request was not sent because its host is known to be unreachable."""
+
+class CircuitBreaker:
+    """Remembers, per host, whether the network reaches it, for every remote call of the tool.
+
+    A request that fails to connect or times out counts against its host and any answer from the host clears
+    the count. After FAILURE_THRESHOLD failures in a row the circuit of the host opens: check raises
+    CircuitOpenError straight away instead of letting each call wait out its own timeout, so callers fail
+    fast or fall back to their cache. While it is open a background thread probes the host every
+    PROBE_INTERVAL seconds and closes the circuit once the host answers again.
+    """
+    FAILURE_THRESHOLD = 3
+    PROBE_INTERVAL = 15
+    PROBE_TIMEOUT = 5
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(CircuitBreaker, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._lock = threading.Lock()
+        self._failures: Dict[str, int] = {}  # Host -> consecutive failures
+        self._open: Dict[str, str] = {}  # Host of an open circuit -> URL its probe requests
+        self._initialized = True
+
+    @staticmethod
+    def getHost(url: str) -> str:
+        return urlsplit(url).netloc.lower()
+
+    def isOpen(self, url: str) -> bool:
+        with self._lock:
+            return self.getHost(url) in self._open
+
+    def check(self, url: str) -> None:
+        """Raise CircuitOpenError if the host of url is unreachable."""
+        if self.isOpen(url):
+            raise CircuitOpenError(f"{self.getHost(url)} is unreachable, not requesting {url}")
+
+    def recordSuccess(self, url: str) -> None:
+        host = self.getHost(url)
+        with self._lock:
+            self._failures.pop(host, None)
+            if self._open.pop(host, None):
+                logger.info(f"{host} is reachable again")
+
+    def recordFailure(self, url: str) -> None:
+        host = self.getHost(url)
+        with self._lock:
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if self._failures[host] < self.FAILURE_THRESHOLD or host in self._open:
+                return
+        self.trip(url)
+
+    def trip(self, url: str) -> None:
+        """Open the circuit of the host of url now, e.g. after a request that got no answer within a whole deadline."""
+        host = self.getHost(url)
+        parts = urlsplit(url)
+        with self._lock:
+            if host in self._open:
+                return
+            self._open[host] = f"{parts.scheme}://{parts.netloc}/"
+        logger.warning(f"{host} is unreachable, failing its requests fast until it answers again")
+        threading.Thread(target=self._probe, args=(host,), daemon=True).start()
+
+    def _probe(self, host: str) -> None:
+        while True:
+            time.sleep(self.PROBE_INTERVAL)
+            with self._lock:
+                probe_url = self._open.get(host)
+            if probe_url is None:
+                return
+            try:
+                requests.head(probe_url, timeout=self.PROBE_TIMEOUT)
+            except requests.RequestException as e:
+                logger.debug(f"Probe of {host} failed: {e}")
+                continue
+            self.recordSuccess(probe_url)
+            return
@@ -44,13 +44,21 @@ class ConfigManager:
                     "BackupTitleUpdate": False,
                     "DeleteStoredTitleUpdate": False,
                     "DeleteSquadsAfterInstall": False,
+                    "InstallSquadsWhileDownloading": False,
+                    "DeltaInstall": False,
+                    "ContentStore": False,
                     "DeleteLiveTuningUpdate": True
                 },
                 "DownloadOptions": {
+                    "DownloadEngine": "Native",
                     "Segments": "8",
+                    "AutoTuneSegments": True,
+                    "MaxConnections": "16",
+                    "MaxConnectionsPerHost": "8",
                     "SpeedLimitEnabled": False,
                     "SpeedLimit": None,
                     "AutoUseIDM": False,
+                    "InstallAfterDownload": False,
                     "IDMPath": None,
                     "EnableDownloadLogs": True,
                     "LogDownloadProgress": False
@@ -175,13 +183,21 @@ class ConfigManager:
     def getConfigKeyBackupTitleUpdate(self) -> bool: return self._get_config_value("Settings", "BackupTitleUpdate", False, "InstallationOptions")
     def getConfigKeyDeleteStoredTitleUpdate(self) -> bool: return self._get_config_value("Settings", "DeleteStoredTitleUpdate", False, "InstallationOptions")
     def getConfigKeyDeleteSquadsAfterInstall(self) -> bool: return self._get_config_value("Settings", "DeleteSquadsAfterInstall", False, "InstallationOptions")
+    def getConfigKeyInstallSquadsWhileDownloading(self) -> bool: return self._get_config_value("Settings", "InstallSquadsWhileDownloading", False, "InstallationOptions")
+    def getConfigKeyDeltaInstall(self) -> bool: return self._get_config_value("Settings", "DeltaInstall", False, "InstallationOptions")
+    def getConfigKeyContentStore(self) -> bool: return self._get_config_value("Settings", "ContentStore", False, "InstallationOptions")
     def getConfigKeyDeleteLiveTuningUpdate(self) -> bool: return self._get_config_value("Settings", "DeleteLiveTuningUpdate", True, "InstallationOptions")
+    def getConfigKeyDownloadEngine(self) -> str: return self._get_config_value("Settings", "DownloadEngine", "Native", "DownloadOptions")
     def getConfigKeySegments(self) -> str: return self._get_config_value("Settings", "Segments", "8", "DownloadOptions")
+    def getConfigKeyAutoTuneSegments(self) -> bool: return self._get_config_value("Settings", "AutoTuneSegments", True, "DownloadOptions")
+    def getConfigKeyMaxConnections(self) -> str: return self._get_config_value("Settings", "MaxConnections", "16", "DownloadOptions")
+    def getConfigKeyMaxConnectionsPerHost(self) -> str: return self._get_config_value("Settings", "MaxConnectionsPerHost", "8", "DownloadOptions")
     def getConfigKeySpeedLimitEnabled(self) -> bool: return self._get_config_value("Settings", "SpeedLimitEnabled", False, "DownloadOptions")
     def getConfigKeySpeedLimit(self) -> Optional[str]: return self._get_config_value("Settings", "SpeedLimit", None, "DownloadOptions")
     def getConfigKeyEnableDownloadLogs(self) -> bool: return self._get_config_value("Settings", "EnableDownloadLogs", True, "DownloadOptions")
     def getConfigKeyLogDownloadProgress(self) -> bool: return self._get_config_value("Settings", "LogDownloadProgress", False, "DownloadOptions")
     def getConfigKeyAutoUseIDM(self) -> bool: return self._get_config_value("Settings", "AutoUseIDM", False, "DownloadOptions")
+    def getConfigKeyInstallAfterDownload(self) -> bool: return self._get_config_value("Settings", "InstallAfterDownload", False, "DownloadOptions")
     def getConfigKeyIDMPath(self) -> Optional[str]: return self._get_config_value("Settings", "IDMPath", None, "DownloadOptions")
     def getConfigKeyLastUsedTab(self) -> str: return self._get_config_value("Settings", "LastUsedTab", "TitleUpdates", "Visual")
     def getConfigKeyTableColumns(self, table: str, default_columns: List[str] = None) -> List[str]:
@@ -219,13 +235,21 @@ class ConfigManager:
     def setConfigKeyBackupTitleUpdate(self, value: bool) -> None: self._set_config_value("Settings", "BackupTitleUpdate", value, "InstallationOptions")
     def setConfigKeyDeleteStoredTitleUpdate(self, value: bool) -> None: self._set_config_value("Settings", "DeleteStoredTitleUpdate", value, "InstallationOptions")
     def setConfigKeyDeleteSquadsAfterInstall(self, value: bool) -> None: self._set_config_value("Settings", "DeleteSquadsAfterInstall", value, "InstallationOptions")
+    def setConfigKeyInstallSquadsWhileDownloading(self, value: bool) -> None: self._set_config_value("Settings", "InstallSquadsWhileDownloading", value, "InstallationOptions")
+    def setConfigKeyDeltaInstall(self, value: bool) -> None: self._set_config_value("Settings", "DeltaInstall", value, "InstallationOptions")
+    def setConfigKeyContentStore(self, value: bool) -> None: self._set_config_value("Settings", "ContentStore", value, "InstallationOptions")
     def setConfigKeyDeleteLiveTuningUpdate(self, value: bool) -> None: self._set_config_value("Settings", "DeleteLiveTuningUpdate", value, "InstallationOptions")
+    def setConfigKeyDownloadEngine(self, value: str) -> None: self._set_config_value("Settings", "DownloadEngine", value, "DownloadOptions")
     def setConfigKeySegments(self, value: str) -> None: self._set_config_value("Settings", "Segments", value, "DownloadOptions")
+    def setConfigKeyAutoTuneSegments(self, value: bool) -> None: self._set_config_value("Settings", "AutoTuneSegments", value, "DownloadOptions")
+    def setConfigKeyMaxConnections(self, value: str) -> None: self._set_config_value("Settings", "MaxConnections", value, "DownloadOptions")
+    def setConfigKeyMaxConnectionsPerHost(self, value: str) -> None: self._set_config_value("Settings", "MaxConnectionsPerHost", value, "DownloadOptions")
     def setConfigKeySpeedLimitEnabled(self, value: bool) -> None: self._set_config_value("Settings", "SpeedLimitEnabled", value, "DownloadOptions")
     def setConfigKeySpeedLimit(self, value: Optional[str]) -> None: self._set_config_value("Settings", "SpeedLimit", value, "DownloadOptions")
     def setConfigKeyEnableDownloadLogs(self, value: bool) -> None: self._set_config_value("Settings", "EnableDownloadLogs", value, "DownloadOptions")
     def setConfigKeyLogDownloadProgress(self, value: bool) -> None: self._set_config_value("Settings", "LogDownloadProgress", value, "DownloadOptions")
     def setConfigKeyAutoUseIDM(self, value: bool) -> None: self._set_config_value("Settings", "AutoUseIDM", value, "DownloadOptions")
+    def setConfigKeyInstallAfterDownload(self, value: bool) -> None: self._set_config_value("Settings", "InstallAfterDownload", value, "DownloadOptions")
     def setConfigKeyIDMPath(self, value: Optional[str]) -> None: self._set_config_value("Settings", "IDMPath", value, "DownloadOptions")
     def setConfigKeyLastUsedTab(self, tab: str) -> None: self._set_config_value("Settings", "LastUsedTab", tab, "Visual")
     def setConfigKeyTableColumns(self, table: str, columns: List[str]) -> None:
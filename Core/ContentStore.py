@@ -0,0 +1,202 @@
+import os
+import json
+import shutil
+import hashlib
+from typing import Optional, Dict, List, Callable
+
+from Core.Logger import logger
+from Core.BackupStrategy import BackupStrategy
+from Core.ArchiveReader import ArchiveReader, ArchiveCanceled
+
+class ContentStore:
+    """Content-addressed store for the Title Updates kept in a profile folder.
+
+    Each unique file is kept once under .ContentStore/Objects, named by its SHA1, and each Title Update is
+    a small "<name>.fcstore" manifest next to the archives and folders, listing its files by relative path,
+    size, SHA1 and modified time. Consecutive updates share most of their files, so keeping many of them
+    costs little more than keeping one. Blobs are never written once stored and are never hard-linked to
+    files outside the store, so nothing that edits a game file can change a stored update.
+    """
+    EXTENSION = ".fcstore"
+    FOLDER = ".ContentStore"
+    VERSION = 1
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, profile_dir: str):
+        self.profile_dir = profile_dir
+        self.root = os.path.join(profile_dir, self.FOLDER)
+        self.objects = os.path.join(self.root, "Objects")
+        self.staging = os.path.join(self.root, "Staging")
+
+    @staticmethod
+    def isManifestFile(file_name: str) -> bool:
+        return file_name.lower().endswith(ContentStore.EXTENSION)
+
+    @staticmethod
+    def forManifest(manifest_path: str) -> "ContentStore":
+        return ContentStore(os.path.dirname(manifest_path))
+
+    def getManifestPath(self, name: str) -> str:
+        return os.path.join(self.profile_dir, name + self.EXTENSION)
+
+    def getBlobPath(self, sha1: str) -> str:
+        return os.path.join(self.objects, sha1[:2], sha1)
+
+    @staticmethod
+    def readManifest(manifest_path: str) -> List[Dict]:
+        """Files of a stored update: dicts with Path, Size, SHA1 and MTime."""
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("Version") != ContentStore.VERSION:
+            raise ValueError(f"Unsupported content store manifest version in {manifest_path}")
+        return data["Files"]
+
+    def _write_manifest(self, name: str, files: List[Dict]) -> str:
+        manifest_path = self.getManifestPath(name)
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"Version": self.VERSION, "Name": name, "Files": files}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, manifest_path)
+        logger.info(f"Stored {name} in the content store: {len(files)} files, "
+                    f"{sum(entry['Size'] for entry in files) / 1024 ** 3:.2f} GB")
+        return manifest_path
+
+    @staticmethod
+    def _entry(rel_path: str, path: str, sha1: str) -> Dict:
+        stat = os.stat(path)
+        return {"Path": rel_path.replace(os.sep, '/'), "Size": stat.st_size, "SHA1": sha1, "MTime": stat.st_mtime}
+
+    def _hash_file(self, path: str, progress_callback: Optional[Callable[[int], None]] = None) -> str:
+        sha1 = hashlib.sha1()
+        with open(path, "rb") as f:
+            while chunk := f.read(self.CHUNK_SIZE):
+                sha1.update(chunk)
+                if progress_callback:
+                    progress_callback(len(chunk))
+        return sha1.hexdigest()
+
+    def addFolder(self, name: str, source_dir: str, files: Optional[List[str]] = None,
+                  progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                  cancel_check: Optional[Callable[[], bool]] = None) -> Optional[str]:
+        """Store the files under source_dir (all of them unless files is given) as update name.
+
+        Every file is hashed first and only blobs the store does not hold yet are copied in.
+        Returns the manifest path, or None if canceled.
+        """
+        if files is None:
+            files = [os.path.join(root, file_name) for root, _, names in os.walk(source_dir) for file_name in names]
+        strategy = BackupStrategy(source_dir, self.objects, link=False)
+        bytes_total, bytes_done = sum(os.path.getsize(path) for path in files), 0
+        entries = []
+        for path in files:
+            if cancel_check and cancel_check():
+                return None
+            rel_path = os.path.relpath(path, source_dir)
+
+            def advance(size: int, name: str = rel_path):
+                nonlocal bytes_done
+                bytes_done += size
+                if progress_callback:
+                    progress_callback(bytes_done, bytes_total, name)
+
+            sha1 = self._hash_file(path, advance)
+            blob_path = self.getBlobPath(sha1)
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                temp_path = blob_path + ".tmp"
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                strategy.backupFile(path, temp_path)
+                os.replace(temp_path, blob_path)
+            entries.append(self._entry(rel_path, path, sha1))
+        return self._write_manifest(name, entries)
+
+    def addArchive(self, name: str, archive: ArchiveReader, include: Optional[Callable] = None, rename: Optional[Callable] = None,
+                   progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                   cancel_check: Optional[Callable[[], bool]] = None) -> Optional[str]:
+        """Store members of an archive as update name, hashed while they are extracted.
+
+        Members are extracted into the store's staging folder, on the same volume, so a new blob is
+        a rename and a known one is just deleted. Returns the manifest path, or None if canceled.
+        """
+        rename = rename or (lambda member: member.name)
+        shutil.rmtree(self.staging, ignore_errors=True)
+        os.makedirs(self.staging, exist_ok=True)
+        try:
+            written = archive.extract(
+                self.staging, include=include, rename=rename,
+                progress_callback=(lambda done, total, files_done, files_total, member_name: progress_callback(done, total, member_name))
+                if progress_callback else None,
+                cancel_check=cancel_check, workers=ArchiveReader.getWorkerCount(self.staging), digest=True)
+            if cancel_check and cancel_check():
+                return None
+            entries = []
+            for member in written:
+                rel_path = rename(member)
+                staged_path = ArchiveReader.getTargetPath(self.staging, rel_path)
+                entries.append(self._entry(rel_path, staged_path, member.sha1))
+                blob_path = self.getBlobPath(member.sha1)
+                if os.path.exists(blob_path):
+                    os.remove(staged_path)
+                else:
+                    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                    os.replace(staged_path, blob_path)
+            return self._write_manifest(name, entries)
+        except ArchiveCanceled:
+            return None
+        finally:
+            shutil.rmtree(self.staging, ignore_errors=True)
+
+    def install(self, manifest_path: str, dest_dir: str, progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                cancel_check: Optional[Callable[[], bool]] = None) -> bool:
+        """Write a stored update into dest_dir, replacing the files it lists; False if canceled."""
+        entries = self.readManifest(manifest_path)
+        strategy = BackupStrategy(self.objects, dest_dir, link=False)
+        bytes_total, bytes_done = sum(entry["Size"] for entry in entries), 0
+        for entry in entries:
+            if cancel_check and cancel_check():
+                return False
+            blob_path = self.getBlobPath(entry["SHA1"])
+            if not os.path.isfile(blob_path) or os.path.getsize(blob_path) != entry["Size"]:
+                raise FileNotFoundError(f"Content store is missing {entry['Path']} ({entry['SHA1']}) of {os.path.basename(manifest_path)}")
+            target = ArchiveReader.getTargetPath(dest_dir, entry["Path"])
+            if os.path.lexists(target):
+                os.remove(target)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            strategy.backupFile(blob_path, target)
+            os.utime(target, (entry["MTime"], entry["MTime"]))
+            bytes_done += entry["Size"]
+            if progress_callback:
+                progress_callback(bytes_done, bytes_total, entry["Path"])
+        return True
+
+    def remove(self, name: str) -> None:
+        """Drop a stored update and every blob no other stored update refers to."""
+        manifest_path = self.getManifestPath(name)
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+            logger.info(f"Removed {name} from the content store")
+        self.collectGarbage()
+
+    def collectGarbage(self) -> None:
+        if not os.path.isdir(self.objects):
+            return
+        referenced = set()
+        for file_name in os.listdir(self.profile_dir):
+            if self.isManifestFile(file_name):
+                try:
+                    referenced.update(entry["SHA1"] for entry in self.readManifest(os.path.join(self.profile_dir, file_name)))
+                except (OSError, ValueError, KeyError) as e:
+                    # A manifest that cannot be read may still refer to any blob, so keep them all
+                    logger.warning(f"Skipped content store cleanup, unreadable manifest {file_name}: {e}")
+                    return
+        freed = 0
+        for root, _, names in os.walk(self.objects):
+            for blob_name in names:
+                if blob_name not in referenced:
+                    blob_path = os.path.join(root, blob_name)
+                    freed += os.path.getsize(blob_path)
+                    os.remove(blob_path)
+        logger.info(f"Content store cleanup freed {freed / 1024 ** 2:.2f} MB")
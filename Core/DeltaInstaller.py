@@ -0,0 +1,193 @@
+import os
+import json
+import pickle
+import zlib
+import hashlib
+from typing import Optional, Dict, List, Set, Callable
+
+from Core.Logger import logger
+from Core.AppDataManager import AppDataManager
+from Core.MainDataManager import MainDataManager
+from Core.GameManager import GameManager
+from Core.ArchiveReader import ArchiveMember
+from Libraries.SteamDDLib.app.manifest_parser import ManifestFile
+
+class FingerprintCache:
+    """SHA1 of installed game files keyed by size and modified time, so a file that did not change is never read twice.
+
+    One JSON file per game folder, kept in the app data folder rather than next to the game files.
+    """
+    FOLDER = "Fingerprints"
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, game_path: str):
+        self.game_path = os.path.normcase(os.path.abspath(game_path))
+        self.path = os.path.join(AppDataManager.getDataFolder(), self.FOLDER,
+                                 f"{hashlib.sha1(self.game_path.encode('utf-8')).hexdigest()[:16]}.json")
+        self.files: Dict[str, list] = {}  # Relative path -> [size, mtime_ns, sha1]
+        self._dirty = False
+        try:
+            if os.path.isfile(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("GamePath") == self.game_path:
+                    self.files = data.get("Files", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable fingerprint cache {self.path}: {e}")
+
+    def getSHA1(self, rel_path: str, progress_callback: Optional[Callable[[int], None]] = None) -> str:
+        """SHA1 of an installed file, from the cache while its size and mtime are unchanged."""
+        full_path = os.path.join(self.game_path, rel_path)
+        stat = os.stat(full_path)
+        cached = self.files.get(rel_path.lower())
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            if progress_callback:
+                progress_callback(stat.st_size)
+            return cached[2]
+        sha1 = hashlib.sha1()
+        with open(full_path, "rb") as f:
+            while chunk := f.read(self.CHUNK_SIZE):
+                sha1.update(chunk)
+                if progress_callback:
+                    progress_callback(len(chunk))
+        self.files[rel_path.lower()] = [stat.st_size, stat.st_mtime_ns, sha1.hexdigest()]
+        self._dirty = True
+        return sha1.hexdigest()
+
+    def record(self, rel_path: str, sha1: str) -> None:
+        """Remember the SHA1 of a file that was just written, taken from the bytes written."""
+        try:
+            stat = os.stat(os.path.join(self.game_path, rel_path))
+        except OSError:
+            return
+        self.files[rel_path.lower()] = [stat.st_size, stat.st_mtime_ns, sha1]
+        self._dirty = True
+
+    def forget(self, rel_path: str) -> None:
+        if self.files.pop(rel_path.lower(), None):
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"GamePath": self.game_path, "Files": self.files}, f)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"Failed to save fingerprint cache {self.path}: {e}")
+
+class DeltaPlan:
+    """What a delta install changes: members to extract and installed files to delete, as paths relative to the game folder."""
+    def __init__(self):
+        self.extract: Set[str] = set()
+        self.delete: List[str] = []
+        self.unchanged = 0
+        self.unchanged_bytes = 0
+
+class DeltaInstaller:
+    """Compares a Title Update's depot manifests with the installed game, so only files that differ are touched."""
+
+    @staticmethod
+    def loadManifest(game_mgr: GameManager, game_id: str, update_name: str) -> Optional[Dict[str, ManifestFile]]:
+        """Files of the Title Update's Main and eng_us depots by lower-cased relative path; None if a manifest is unavailable."""
+        cache_file = os.path.join(AppDataManager.getDataFolder(), f"{game_id}.cache")
+        if not os.path.exists(cache_file):
+            cache_file = os.path.join(MainDataManager().getBaseCache(), f"{game_id}.cache")
+        try:
+            with open(cache_file, "rb") as f:
+                content = pickle.loads(zlib.decompress(f.read()))
+        except Exception as e:
+            logger.warning(f"Delta install unavailable, failed to load cache for {game_id}: {e}")
+            return None
+
+        title_updates = content.get(game_mgr.getProfileTypeTitleUpdate(), {})
+        update = next((u for u in title_updates.get(game_mgr.getContentKeyTitleUpdate(), [])
+                       if u.get(game_mgr.getTitleUpdateNameKey()) == update_name), None)
+        if not update:
+            logger.info(f"Delta install unavailable, {update_name} is not listed for {game_id}")
+            return None
+
+        files: Dict[str, ManifestFile] = {}
+        depots = (("Main", game_mgr.getTitleUpdateMainDepotIDKey(), game_mgr.getTitleUpdateMainManifestIDKey()),
+                  ("Language", game_mgr.getTitleUpdateEngUsDepotIDKey(), game_mgr.getTitleUpdateEngUsManifestIDKey()))
+        for depot_type, depot_key, manifest_key in depots:
+            depot_id, manifest_id = title_updates.get(depot_key), update.get(manifest_key)
+            if not depot_id or not manifest_id:
+                if depot_type == "Main":
+                    logger.info(f"Delta install unavailable, no Main manifest ID for {update_name}")
+                    return None
+                continue
+            manifest = game_mgr.fetchDepotManifest(game_id, depot_type, str(depot_id), str(manifest_id))
+            if not manifest:
+                logger.info(f"Delta install unavailable, failed to fetch the {depot_type} manifest of {update_name}")
+                return None
+            files.update({name.lower(): entry for name, entry in manifest.files.items()})
+        logger.info(f"Loaded depot manifests of {update_name}: {len(files)} files")
+        return files
+
+    @staticmethod
+    def plan(game_path: str, members: Dict[str, ArchiveMember], manifest: Dict[str, ManifestFile], fingerprints: FingerprintCache,
+             is_kept: Callable[[str], bool], delete_absent: bool = True,
+             progress_callback: Optional[Callable[[int, int, str], None]] = None,
+             cancel_check: Optional[Callable[[], bool]] = None) -> Optional[DeltaPlan]:
+        """Decide per archive member, keyed by its path in the game folder, whether the installed copy already matches.
+
+        A member is extracted when the manifest does not know it, disagrees with the archive on its size, or the
+        installed file is missing or differs in size or SHA1. Installed files neither the manifest nor the archive
+        list are deleted when delete_absent, unless is_kept(rel_path). Returns None if canceled.
+        """
+        plan = DeltaPlan()
+        to_hash = []
+        for rel_path, member in members.items():
+            entry = manifest.get(rel_path.lower())
+            full_path = os.path.join(game_path, rel_path)
+            if not entry or entry.size != member.size or not os.path.isfile(full_path) or os.path.getsize(full_path) != entry.size:
+                plan.extract.add(member.name)
+            else:
+                to_hash.append((rel_path, member, entry))
+
+        bytes_total = sum(entry.size for _, _, entry in to_hash)
+        bytes_done = 0
+        for rel_path, member, entry in to_hash:
+            if cancel_check and cancel_check():
+                return None
+
+            def advance(size: int, name: str = rel_path):
+                nonlocal bytes_done
+                bytes_done += size
+                if progress_callback:
+                    progress_callback(bytes_done, bytes_total, name)
+
+            if fingerprints.getSHA1(rel_path, advance) == entry.sha.lower():
+                plan.unchanged += 1
+                plan.unchanged_bytes += entry.size
+            else:
+                plan.extract.add(member.name)
+
+        if delete_absent:
+            known = set(manifest) | {rel_path.lower() for rel_path in members}
+            for root, _, names in os.walk(game_path):
+                for name in names:
+                    rel_path = os.path.relpath(os.path.join(root, name), game_path).replace(os.sep, '/')
+                    if rel_path.lower() not in known and not is_kept(rel_path):
+                        plan.delete.append(rel_path)
+
+        logger.info(f"Delta install: {len(plan.extract)} files to extract, {plan.unchanged} unchanged "
+                    f"({plan.unchanged_bytes / 1024 ** 2:.2f} MB skipped), {len(plan.delete)} to delete")
+        return plan
+
+    @staticmethod
+    def removeEmptyFolders(game_path: str, deleted: List[str]) -> None:
+        """Drop the folders that deleting files left empty, up to the game folder."""
+        game_path = os.path.abspath(game_path)
+        for folder in sorted({os.path.dirname(os.path.join(game_path, rel_path)) for rel_path in deleted}, key=len, reverse=True):
+            while os.path.abspath(folder) != game_path and os.path.isdir(folder) and not os.listdir(folder):
+                try:
+                    os.rmdir(folder)
+                    logger.debug(f"Removed empty folder: {folder}")
+                except OSError as e:
+                    logger.debug(f"Kept folder {folder}: {e}")
+                    break
+                folder = os.path.dirname(folder)
@@ -0,0 +1,165 @@
+import os
+import sys
+import shutil
+import ctypes
+from typing import Optional
+
+from Core.Logger import logger
+
+class DiskSpaceError(Exception):
+    """Raised when the volume a file is written to cannot hold it."""
+
+class DiskAllocator:
+    """Checks free space on the volume a file goes to and reserves the file's full size before it is written.
+
+    A file grown chunk by chunk, or by segments landing at scattered offsets, ends up in many small extents
+    on a busy drive. Reserving the final size up front lets the file system hand out one contiguous run,
+    and a drive that is too small fails right away instead of part way through a multi-GB write.
+    """
+    SAFETY_MARGIN = 64 * 1024 * 1024  # Left free so the system is not starved by a file that just fits
+    FILE_ALLOCATION_INFO = 5  # FILE_INFO_BY_HANDLE_CLASS.FileAllocationInfo
+    IOCTL_STORAGE_QUERY_PROPERTY = 0x2D1400
+    STORAGE_DEVICE_SEEK_PENALTY_PROPERTY = 7
+    _solid_state = {}  # Drive type per volume, it does not change while the tool runs
+
+    @staticmethod
+    def _existing_path(path: str) -> str:
+        """Nearest existing ancestor of path, which is on the same volume as path will be."""
+        path = os.path.abspath(path)
+        while not os.path.exists(path) and os.path.dirname(path) != path:
+            path = os.path.dirname(path)
+        return path
+
+    @staticmethod
+    def getVolume(path: str) -> str:
+        """Drive or mount point holding path, for messages."""
+        path = DiskAllocator._existing_path(path)
+        drive = os.path.splitdrive(path)[0]
+        if drive:
+            return drive + os.sep
+        while not os.path.ismount(path):
+            path = os.path.dirname(path)
+        return path
+
+    @staticmethod
+    def isSameVolume(first: str, second: str) -> bool:
+        try:
+            return os.stat(DiskAllocator._existing_path(first)).st_dev == os.stat(DiskAllocator._existing_path(second)).st_dev
+        except OSError:
+            return False
+
+    @staticmethod
+    def isSolidState(path: str) -> Optional[bool]:
+        """Whether the drive holding path has no seek penalty (SSD/NVMe); None when it cannot be told."""
+        volume = DiskAllocator.getVolume(path)
+        if volume not in DiskAllocator._solid_state:
+            try:
+                DiskAllocator._solid_state[volume] = (DiskAllocator._query_seek_penalty(volume) if sys.platform == "win32"
+                                                      else DiskAllocator._query_rotational(path))
+            except (OSError, ValueError) as e:
+                logger.debug(f"Could not tell the drive type of {volume}: {e}")
+                DiskAllocator._solid_state[volume] = None
+            logger.debug(f"Drive {volume} solid state: {DiskAllocator._solid_state[volume]}")
+        return DiskAllocator._solid_state[volume]
+
+    @staticmethod
+    def _query_seek_penalty(volume: str) -> Optional[bool]:
+        """Ask the storage driver of a Windows volume whether it incurs a seek penalty; needs no admin rights."""
+        from ctypes import wintypes
+
+        class STORAGE_PROPERTY_QUERY(ctypes.Structure):
+            _fields_ = [("PropertyId", wintypes.DWORD), ("QueryType", wintypes.DWORD), ("AdditionalParameters", ctypes.c_ubyte * 1)]
+
+        class DEVICE_SEEK_PENALTY_DESCRIPTOR(ctypes.Structure):
+            _fields_ = [("Version", wintypes.DWORD), ("Size", wintypes.DWORD), ("IncursSeekPenalty", wintypes.BOOLEAN)]
+
+        kernel32 = ctypes.windll.kernel32
+        kernel32.CreateFileW.restype = wintypes.HANDLE
+        handle = kernel32.CreateFileW(f"\\\\.\\{volume.rstrip(os.sep)}", 0, 0x1 | 0x2, None, 3, 0, None)  # FILE_SHARE_READ | WRITE, OPEN_EXISTING
+        if handle in (None, wintypes.HANDLE(-1).value):
+            return None
+        try:
+            query = STORAGE_PROPERTY_QUERY(DiskAllocator.STORAGE_DEVICE_SEEK_PENALTY_PROPERTY, 0)  # PropertyStandardQuery
+            descriptor = DEVICE_SEEK_PENALTY_DESCRIPTOR()
+            returned = wintypes.DWORD()
+            if not kernel32.DeviceIoControl(wintypes.HANDLE(handle), DiskAllocator.IOCTL_STORAGE_QUERY_PROPERTY, ctypes.byref(query), ctypes.sizeof(query),
+                                            ctypes.byref(descriptor), ctypes.sizeof(descriptor), ctypes.byref(returned), None):
+                return None
+            return not descriptor.IncursSeekPenalty
+        finally:
+            kernel32.CloseHandle(wintypes.HANDLE(handle))
+
+    @staticmethod
+    def _query_rotational(path: str) -> Optional[bool]:
+        """Read the rotational flag Linux keeps for the block device holding path."""
+        device = os.stat(DiskAllocator._existing_path(path)).st_dev
+        block = os.path.realpath(f"/sys/dev/block/{os.major(device)}:{os.minor(device)}")
+        # A partition keeps its queue settings on the parent disk
+        for folder in (block, os.path.dirname(block)):
+            flag = os.path.join(folder, "queue", "rotational")
+            if os.path.isfile(flag):
+                with open(flag, "r") as f:
+                    return f.read().strip() == "0"
+        return None
+
+    @staticmethod
+    def getFreeSpace(path: str) -> int:
+        return shutil.disk_usage(DiskAllocator._existing_path(path)).free
+
+    @staticmethod
+    def formatSize(size: int) -> str:
+        return f"{size / 1024 ** 3:.2f} GB" if size >= 1024 ** 3 else f"{size / 1024 ** 2:.2f} MB"
+
+    @staticmethod
+    def ensureFreeSpace(path: str, required: int, purpose: str) -> None:
+        """Raise DiskSpaceError if the volume of path has less than required bytes free."""
+        if required <= 0:
+            return
+        free = DiskAllocator.getFreeSpace(path)
+        if free - DiskAllocator.SAFETY_MARGIN < required:
+            raise DiskSpaceError(
+                f"Not enough free space on {DiskAllocator.getVolume(path)} for {purpose}: "
+                f"{DiskAllocator.formatSize(required)} needed, {DiskAllocator.formatSize(free)} free.\n"
+                f"Free up some space on that drive and try again."
+            )
+        logger.debug(f"Space check for {purpose}: {DiskAllocator.formatSize(required)} needed, "
+                     f"{DiskAllocator.formatSize(free)} free on {DiskAllocator.getVolume(path)}")
+
+    @staticmethod
+    def _reserve(f, size: int) -> bool:
+        """Ask the file system for size bytes of storage behind the open file f."""
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                allocation = ctypes.c_longlong(size)
+                return bool(ctypes.windll.kernel32.SetFileInformationByHandle(
+                    msvcrt.get_osfhandle(f.fileno()), DiskAllocator.FILE_ALLOCATION_INFO,
+                    ctypes.byref(allocation), ctypes.sizeof(allocation)
+                ))
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(f.fileno(), 0, size)
+                return True
+        except OSError as e:
+            logger.debug(f"Could not reserve {size} bytes for {f.name}: {e}")
+        return False
+
+    @staticmethod
+    def preallocate(path: str, size: int, purpose: Optional[str] = None) -> None:
+        """Create path at its final size with its storage reserved; existing content is discarded."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if purpose:
+            # An earlier copy of the file is discarded, so its space counts as free
+            DiskAllocator.ensureFreeSpace(path, size - (os.path.getsize(path) if os.path.isfile(path) else 0), purpose)
+        with open(path, "wb") as f:
+            if size:
+                DiskAllocator._reserve(f, size)
+                f.truncate(size)
+
+    @staticmethod
+    def openPreallocated(path: str, size: int):
+        """Open path for writing from the start into storage reserved for size bytes.
+
+        The caller writes the content and truncates at the final position, in case it turned out shorter.
+        """
+        DiskAllocator.preallocate(path, size)
+        return open(path, "r+b")
@@ -1,27 +1,30 @@
 import os
 import time
 import subprocess
-import cloudscraper
-import certifi
 import re
 import logging
 import shutil
 from datetime import datetime
-from lxml import html
-import base64
+from typing import Optional, Dict
 from PySide6.QtCore import QThread, Signal
 from Core.Logger import logger
 from Core.MainDataManager import MainDataManager
 from Core.ConfigManager import ConfigManager
 from Core.GameManager import GameManager
 from Core.AppDataManager import AppDataManager
-from Core.NotificationManager import NotificationHandler
 from Core.ErrorHandler import ErrorHandler
+from Core.DownloadEngine import NativeDownloadEngine, DownloadEngineError
+from Core.DownloadJournal import DownloadJournal
+from Core.IntegrityManager import IntegrityManager
+from Core.ProgressBus import ProgressChannel
+from Core.LinkResolver import LinkResolver
+from Core.SegmentTuner import SegmentTuner
+from Core.DiskAllocator import DiskAllocator, DiskSpaceError
+from Core.StreamInstaller import SquadStreamExtractor, StreamInstaller, StreamInstallError
 
 LOG_DIR, DOWNLOAD_LOG_DIR = "Logs", os.path.join("Logs", "DownloadLogs")
 
 class DownloadCore(QThread):
-    progress_signal = Signal(float, float, float, float, str, int, int)
     paused_signal = Signal()
     resumed_signal = Signal()
     cancel_status_signal = Signal(str)
@@ -29,19 +32,31 @@ class DownloadCore(QThread):
     download_started_signal = Signal()
     error_signal = Signal()
 
-    def __init__(self, url: str, game_profile: str, update_name: str, tab_key: str):
+    def __init__(self, url: str, game_profile: str, update_name: str, tab_key: str, expected_digests: Optional[Dict[str, str]] = None,
+                 max_connections: Optional[int] = None, size_bytes: int = 0, config_manager: Optional[ConfigManager] = None):
         super().__init__()
         self.url = url
+        self.source_url = url
         self.game_profile = game_profile
         self.update_name = update_name
         self.tab_key = tab_key
+        self.expected_digests = expected_digests or {}
+        self.max_connections = max_connections  # Share of the scheduler's connection budget, None for no cap
+        self.size_bytes = size_bytes  # Size from the content entry, 0 when unknown
         self.cancel_flag = False
         self.is_paused = False
         self.error_occurred = False
         self.stop_flag = False
         self.process = None
+        self.engine = None
+        self.page_url = url
+        self.from_link_cache = False
+        self.final_path = ""
+        self.stage_times: Dict[str, float] = {}  # Seconds spent resolving the link and downloading
+        self.staged_install = False  # Squad files were extracted during the download and wait in the staging folder
+        self.progress_channel = ProgressChannel()
         self.cleaned = False  # Flag to track if temp folder has been cleaned
-        self.config_manager = ConfigManager()
+        self.config_manager = config_manager or ConfigManager()
         self.game_manager = GameManager()
         self.use_idm = self.config_manager.getConfigKeyAutoUseIDM() and os.path.exists(self.config_manager.getConfigKeyIDMPath() or "")
         self.download_logger = self._setup_logger()
@@ -66,73 +81,68 @@ class DownloadCore(QThread):
         return dl_logger
 
     def _get_direct_url(self) -> str:
-        if "mediafire" not in self.url.lower():
-            return self.url
         try:
-            scraper = cloudscraper.create_scraper()
-            for _ in range(2):
-                response = scraper.get(self.url, headers={"User-Agent": "Mozilla/5.0"}, verify=certifi.where())
-                if response.status_code == 200:
-                    tree = html.fromstring(response.text)
-                    
-                    scrambled_link = tree.xpath('//a[@id="downloadButton"]/@data-scrambled-url')
-                    if scrambled_link and scrambled_link[0]:
-                        decoded_url = base64.b64decode(scrambled_link[0]).decode('utf-8')
-                        if decoded_url and not decoded_url.startswith('#') and not decoded_url.endswith('#'):
-                            return decoded_url
-                    
-                    direct_link = tree.xpath('//a[@id="downloadButton"]/@href')
-                    if direct_link and direct_link[0]:
-                        url = direct_link[0]
-                        if url.startswith("https://"):
-                            return url
-
-                time.sleep(1)
-            raise ValueError("Failed to retrieve direct download URL from MediaFire.")
+            self.from_link_cache = LinkResolver().getCached(self.page_url) is not None
+            return LinkResolver().resolve(self.page_url)
         except Exception as e:
             ErrorHandler.handleError(str(e))
             self.error_signal.emit()
             return ""
 
+    def _get_profile_folder(self) -> str:
+        """Profiles folder the finished download is stored in, empty if the tab has none."""
+        if self.tab_key == self.game_manager.getTabKeyTitleUpdates():
+            profile_subfolder = self.game_manager.getProfileTypeTitleUpdate()
+        else:
+            profile_subfolder = self.game_manager.getProfileTypeSquad()
+        if not profile_subfolder:
+            return ""
+
+        profile_folder = self.game_manager.getProfileDirectory(self.game_profile, profile_subfolder)
+
+        # Create specific sub-folders for Squads/FutSquads inside the main profile folder
+        if self.tab_key == self.game_manager.getTabKeySquadsUpdates():
+            profile_folder = os.path.join(profile_folder, self.game_manager.getContentKeySquad())
+        elif self.tab_key == self.game_manager.getTabKeyFutSquadsUpdates():
+            profile_folder = os.path.join(profile_folder, self.game_manager.getContentKeyFutSquad())
+        return profile_folder
+
+    def _get_source(self) -> str:
+        if self.use_idm:
+            return "idm"
+        return "aria2" if self.config_manager.getConfigKeyDownloadEngine() == "Aria2" else "native"
+
     def _get_download_config(self, source: str) -> tuple:
         try:
-            if self.tab_key == self.game_manager.getTabKeyTitleUpdates():
-                profile_subfolder = self.game_manager.getProfileTypeTitleUpdate()
-            else:
-                profile_subfolder = self.game_manager.getProfileTypeSquad()
-
-            if not profile_subfolder:
+            profile_folder = self._get_profile_folder()
+            if not profile_folder:
                 ErrorHandler.handleError("Invalid tab key for download configuration")
                 self.error_signal.emit()
                 return ([], "", "")
 
-            profile_folder = self.game_manager.getProfileDirectory(self.game_profile, profile_subfolder)
-            
-            # Create specific sub-folders for Squads/FutSquads inside the main profile folder
-            if self.tab_key == self.game_manager.getTabKeySquadsUpdates():
-                profile_folder = os.path.join(profile_folder, self.game_manager.getContentKeySquad())
-            elif self.tab_key == self.game_manager.getTabKeyFutSquadsUpdates():
-                profile_folder = os.path.join(profile_folder, self.game_manager.getContentKeyFutSquad())
-
             os.makedirs(profile_folder, exist_ok=True)
             filename = f"{self.update_name}.rar" if self.tab_key == self.game_manager.getTabKeyTitleUpdates() else self.update_name
             final_path = os.path.join(profile_folder, filename)
 
+            if source == "native":
+                return ([self.url], os.path.join(AppDataManager.getTempFolder(), self.update_name), final_path)
             if source == "aria2":
                 aria2c_path = MainDataManager().getAria2c() or ""
                 if not aria2c_path:
                     ErrorHandler.handleError("Aria2c executable not found")
                     self.error_signal.emit()
                     return ([], "", "")
-                segments = self.config_manager.getConfigKeySegments() or "8"
-                speed_limit = []
-                if self.config_manager.getConfigKeySpeedLimitEnabled():
-                    limit = self.config_manager.getConfigKeySpeedLimit()
-                    if isinstance(limit, (str, int)) and str(limit).isdigit():
-                        speed_limit = ["--max-overall-download-limit", f"{limit}K"]
+                segments = str(self._get_segments())
+                if self.config_manager.getConfigKeyAutoTuneSegments():
+                    host = SegmentTuner.getHostKey(self.url)
+                    if remembered := SegmentTuner.getRemembered(host, self._get_tuning_store()):
+                        segments = str(min(remembered, self.max_connections or SegmentTuner.MAX_CONNECTIONS))
+                        self.download_logger.info(f"Autotune: using {segments} connection(s) for {host}, remembered from earlier downloads")
+                limit = self._get_speed_limit()
+                speed_limit = ["--max-overall-download-limit", f"{limit}K"] if limit else []
                 return ([
                     aria2c_path, "--log-level=debug", "--dir", os.path.join(AppDataManager.getTempFolder(), self.update_name),
-                    "--continue=true", "--split", segments, "--max-connection-per-server=8", *speed_limit, self.url
+                    "--continue=true", "--file-allocation=falloc", "--split", segments, f"--max-connection-per-server={min(int(segments), SegmentTuner.MAX_CONNECTIONS)}", *speed_limit, self.url
                 ], os.path.join(AppDataManager.getTempFolder(), self.update_name), final_path)
             idm_path = self.config_manager.getConfigKeyIDMPath() or ""
             if not os.path.exists(idm_path):
@@ -145,14 +155,82 @@ class DownloadCore(QThread):
             self.error_signal.emit()
             return ([], "", "")
 
-    def _check_disk_space(self) -> bool:
+    def _get_segments(self) -> int:
+        segments = self.config_manager.getConfigKeySegments() or "8"
+        segments = int(segments) if str(segments).isdigit() else 8
+        return min(segments, self.max_connections) if self.max_connections else segments
+
+    def _get_tuning_store(self) -> str:
+        return os.path.join(AppDataManager.getDataFolder(), "SegmentTuning.json")
+
+    def _create_tuner(self) -> Optional[SegmentTuner]:
+        if not self.config_manager.getConfigKeyAutoTuneSegments():
+            return None
+        segments = self.config_manager.getConfigKeySegments() or "8"
+        return SegmentTuner(
+            SegmentTuner.getHostKey(self.url), int(segments) if str(segments).isdigit() else 8,
+            self.max_connections or SegmentTuner.MAX_CONNECTIONS, self._get_tuning_store(), self.download_logger
+        )
+
+    def _create_stream_extractor(self, final_path: str) -> Optional[SquadStreamExtractor]:
+        """Extractor that stages the squad files while they download, when that option is on for the selected game."""
+        if self.tab_key == self.game_manager.getTabKeyTitleUpdates() or not self.config_manager.getConfigKeyInstallSquadsWhileDownloading():
+            return None
+        game_path = self.config_manager.getConfigKeySelectedGame()
+        if not game_path or self.game_manager.getSelectedGameId(game_path) != self.game_profile:
+            return None
+        if not (settings_path := self.game_manager.getGameSettingsFolderPath(game_path)):
+            return None
+        try:
+            extractor = SquadStreamExtractor(StreamInstaller.getStagingFolder(settings_path, self.update_name), os.path.basename(final_path))
+            self.download_logger.info(f"Extracting {self.update_name} while downloading to {extractor.staging_folder}")
+            return extractor
+        except (StreamInstallError, OSError) as e:
+            logger.info(f"{self.update_name} will be installed after the download instead: {e}")
+            return None
+
+    def _stage_stream(self, extractor: Optional[SquadStreamExtractor], final_path: str, digests: Optional[Dict[str, str]]) -> None:
+        """Tie the files extracted during the download to the stored file, so installing it only moves them."""
+        if not extractor:
+            return
         try:
-            disk_usage = shutil.disk_usage(os.getenv("SystemDrive", "C:"))
-            if (free_space_gb := disk_usage.free / (1024 ** 3)) < 10:
-                msg = f"Low disk space detected! Only {free_space_gb:.2f} GB free."
-                NotificationHandler.showWarning(msg)
-                logger.warning(msg)
+            if not digests:
+                raise StreamInstallError("the download has no digest to match the staged files against")
+            files = extractor.finish(self.engine.total_size, os.path.basename(final_path))
+            StreamInstaller.saveManifest(extractor.staging_folder, final_path, digests, files)
+            self.staged_install = True
+            logger.info(f"Extracted {self.update_name} while downloading: {', '.join(files)}")
+        except (StreamInstallError, OSError) as e:
+            logger.warning(f"Discarding files extracted while downloading {self.update_name}: {e}")
+            extractor.abort()
+
+    def _get_speed_limit(self) -> int:
+        """Speed limit in KB/s, 0 when disabled."""
+        if self.config_manager.getConfigKeySpeedLimitEnabled():
+            limit = self.config_manager.getConfigKeySpeedLimit()
+            if isinstance(limit, (str, int)) and str(limit).isdigit():
+                return int(limit)
+        return 0
+
+    def _check_disk_space(self, check_path: str, final_path: str) -> bool:
+        """Fail early when the drive the download is written to, or the one it is moved to, cannot hold it."""
+        if not self.size_bytes:
             return True
+        try:
+            purpose = f"downloading {self.update_name}"
+            on_disk = 0
+            if not self.use_idm and os.path.isdir(check_path):
+                # A partial download is already allocated at its full size
+                on_disk = sum(entry.stat().st_size for entry in os.scandir(check_path)
+                              if entry.is_file() and not DownloadJournal.isJournalFile(entry.name))
+            DiskAllocator.ensureFreeSpace(check_path, self.size_bytes - on_disk, purpose)
+            if not DiskAllocator.isSameVolume(check_path, final_path):
+                DiskAllocator.ensureFreeSpace(final_path, self.size_bytes, f"storing {self.update_name} in Profiles")
+            return True
+        except DiskSpaceError as e:
+            ErrorHandler.handleError(str(e))
+            self.error_signal.emit()
+            return False
         except Exception as e:
             ErrorHandler.handleError(f"Error checking disk space: {str(e)}")
             self.error_signal.emit()
@@ -181,6 +259,8 @@ class DownloadCore(QThread):
     def _move_file(self, temp_folder: str, final_path: str) -> str:
         try:
             for file_name in os.listdir(temp_folder):
+                if DownloadJournal.isJournalFile(file_name) or file_name.endswith(".aria2"):
+                    continue
                 temp_path = os.path.join(temp_folder, file_name)
                 target_path = final_path
                 if os.path.exists(target_path):
@@ -199,8 +279,96 @@ class DownloadCore(QThread):
             self.error_signal.emit()
             return ""
 
+    def _process_native_download(self, temp_folder: str, final_path: str) -> bool:
+        temp_path = os.path.join(temp_folder, os.path.basename(final_path))
+        self.engine = NativeDownloadEngine(
+            self.url, temp_path, self._get_segments(), self._get_speed_limit(),
+            self.download_logger if self.config_manager.getConfigKeyEnableDownloadLogs() else None,
+            journal=DownloadJournal(temp_path), source_url=self.source_url, tuner=self._create_tuner(),
+            stream_consumer=self._create_stream_extractor(final_path)
+        )
+        if self.is_paused:
+            self.engine.pause()
+        if self.cancel_flag:
+            self.engine.dropStreamConsumer()
+            return False
+        self.download_started_signal.emit()
+        try:
+            completed = self.engine.run(self._emit_native_progress)
+        except DownloadEngineError as e:
+            self.engine.dropStreamConsumer()
+            if self.from_link_cache and not self.engine.downloaded and not self.cancel_flag:
+                # A cached direct link may have expired on the server; fetch a fresh one and retry once
+                logger.info(f"Cached direct link for {self.update_name} failed ({e}), resolving it again.")
+                LinkResolver().invalidate(self.page_url)
+                self.from_link_cache = False
+                self.url = self._get_direct_url()
+                if not self.url:
+                    return False
+                return self._process_native_download(temp_folder, final_path)
+            LinkResolver().invalidate(self.page_url)
+            self.error_occurred = True
+            if self.config_manager.getConfigKeyEnableDownloadLogs():
+                self.download_logger.error(f"Native engine error: {str(e)}")
+            ErrorHandler.handleError(str(e))
+            self.error_signal.emit()
+            if self.engine.accepts_ranges and self.engine.downloaded > 0:
+                logger.info(f"Keeping {self.engine.downloaded} downloaded bytes of {self.update_name} to resume later.")
+            elif not self.cleaned and os.path.exists(temp_folder):
+                AppDataManager.manageTempFolder(clean=True, subfolder=self.update_name)
+                self.cleaned = True
+            return False
+        extractor = self.engine.stream_consumer
+        if not completed or self.cancel_flag:
+            self.engine.dropStreamConsumer()
+            return False
+
+        digests = self.engine.getDigests()
+        if digests and (mismatch := IntegrityManager.findMismatch(digests, self.expected_digests)):
+            self.engine.dropStreamConsumer()
+            self.error_occurred = True
+            ErrorHandler.handleError(
+                f"The downloaded file failed the integrity check ({mismatch} mismatch).\n"
+                f"Expected: {self.expected_digests.get(mismatch)}\nGot: {digests[mismatch]}"
+            )
+            self.error_signal.emit()
+            AppDataManager.manageTempFolder(clean=True, subfolder=self.update_name)
+            self.cleaned = True
+            return False
+
+        final_path = self._move_file(temp_folder, final_path)
+        if not final_path:
+            self.engine.dropStreamConsumer()
+            return False
+        if digests:
+            IntegrityManager.saveDigest(final_path, digests)
+            if self.config_manager.getConfigKeyEnableDownloadLogs():
+                self.download_logger.info(f"Digests of {os.path.basename(final_path)}: {digests}")
+        self._stage_stream(extractor, final_path, digests)
+        self.final_path = final_path
+        logger.info(f"Download completed. File moved to: {final_path}")
+        self.download_completed_signal.emit()
+        return True
+
+    def _emit_native_progress(self, engine: NativeDownloadEngine) -> None:
+        rate = engine.getRate()
+        if self.config_manager.getConfigKeyEnableDownloadLogs() and self.config_manager.getConfigKeyLogDownloadProgress():
+            percentage = engine.downloaded / engine.total_size * 100 if engine.total_size else 0.0
+            eta_seconds = engine.getETA()
+            self.download_logger.debug(
+                f"Native progress: {engine.downloaded / 1024 ** 2:.2f}/{engine.total_size / 1024 ** 2:.2f} MB ({percentage:.1f}%) "
+                f"{rate / 1024 ** 2:.2f} MB/s ETA:{'N/A' if eta_seconds is None else f'{int(eta_seconds)}s'} CN:{engine.active_connections}"
+            )
+        self.progress_channel.publish(
+            bytes_done=engine.downloaded, bytes_total=engine.total_size, rate=rate,
+            connections=engine.active_connections, splits=len(engine.segments)
+        )
+
     def _process_download(self, source: str, command: list, check_path: str, final_path: str) -> bool:
         try:
+            if source == "native":
+                return self._process_native_download(check_path, final_path)
+
             if self.config_manager.getConfigKeyEnableDownloadLogs():
                 self.download_logger.debug(f"Executing {source.upper()} command: {' '.join(command)}")
 
@@ -220,13 +388,11 @@ class DownloadCore(QThread):
                             r'(\d+\.?\d*[KMG]?i?B)/(\d+\.?\d*[KMG]?i?B)',
                             r'\((\d+)%\)',
                             r'DL:(\d+\.?\d*[KMG]?i?B)',
-                            r'ETA:(\d+[hm]?\d*[ms]?)',
                             r'CN:(\d+)'
                         ]
                         matches = [re.search(p, line) for p in patterns]
                         downloaded_mb = total_mb = percentage = rate_mb = 0.0
-                        eta, connections = "N/A", 0
-                        splits = int(self.config_manager.getConfigKeySegments() or 8)
+                        connections = 0
                         if matches[0] and matches[0].groups():
                             downloaded, total = matches[0].groups()
                             downloaded_mb = self._convert_to_mb(downloaded)
@@ -236,10 +402,13 @@ class DownloadCore(QThread):
                         if matches[2]:
                             rate_mb = self._convert_to_mb(matches[2].group(1))
                         if matches[3]:
-                            eta = matches[3].group(1)
-                        if matches[4]:
-                            connections = int(matches[4].group(1))
-                        self.progress_signal.emit(downloaded_mb, total_mb, percentage, rate_mb, eta, connections, splits)
+                            connections = int(matches[3].group(1))
+                        # Only counters are stored here; the UI samples them at its own frame rate
+                        self.progress_channel.publish(
+                            bytes_done=int(downloaded_mb * 1024 ** 2), bytes_total=int(total_mb * 1024 ** 2),
+                            percentage=percentage, rate=rate_mb * 1024 ** 2,
+                            connections=connections, splits=self._get_segments()
+                        )
 
                 if self.cancel_flag:
                     return False
@@ -292,6 +461,7 @@ class DownloadCore(QThread):
                 final_path = self._move_file(check_path, final_path)
                 if not final_path:
                     return False
+                self.final_path = final_path
                 logger.info(f"Download completed. File moved to: {final_path}")
                 self.download_completed_signal.emit()
                 return True
@@ -306,12 +476,14 @@ class DownloadCore(QThread):
                 while not self.stop_flag:
                     if os.path.exists(final_path):
                         if initial_mod_time == -1:
+                            self.final_path = final_path
                             logger.info(f"New file detected in profile: {self.update_name}")
                             self.download_completed_signal.emit()
                             return True
                         
                         current_mod_time = os.path.getmtime(final_path)
                         if current_mod_time > initial_mod_time:
+                            self.final_path = final_path
                             logger.info(f"File modification detected. Assuming download complete for: {self.update_name}")
                             self.download_completed_signal.emit()
                             return True
@@ -341,7 +513,8 @@ class DownloadCore(QThread):
             return 0.0
 
     def run(self):
-        source = "idm" if self.use_idm else "aria2"
+        started = time.monotonic()
+        source = self._get_source()
         logger.info(f"Starting download: {self.update_name} with {source.upper()}")
         
         if self.tab_key in [self.game_manager.getTabKeySquadsUpdates(), self.game_manager.getTabKeyFutSquadsUpdates()]:
@@ -353,31 +526,51 @@ class DownloadCore(QThread):
             self.url = squad_url
             logger.info(f"Using SquadFilePath URL: {self.url}")
         
+        self.page_url = self.url
         self.url = self._get_direct_url()
+        self.stage_times["Resolve"] = time.monotonic() - started
         if not self.url:
             return
         
         command, check_path, final_path = self._get_download_config(source)
         if not command:
             return
-        if not self._check_disk_space():
+        if not self._check_disk_space(check_path, final_path):
             return
-        self._process_download(source, command, check_path, final_path)
+        started = time.monotonic()
+        try:
+            self._process_download(source, command, check_path, final_path)
+        finally:
+            self.stage_times["Download"] = time.monotonic() - started
+
+    def setMaxConnections(self, max_connections: int):
+        """Change this download's share of the connection budget; only the native engine follows it while running."""
+        self.max_connections = max_connections
+        if self.engine:
+            self.engine.setConnectionLimit(max_connections)
 
     def pause(self):
         if not self.use_idm:
             self.is_paused = True
+            if self.engine:
+                self.engine.pause()
             self.paused_signal.emit()
 
     def resume(self):
         if not self.use_idm:
             self.is_paused = False
+            if self.engine:
+                self.engine.resume()
             self.resumed_signal.emit()
 
-    def cancel(self):
+    def cancel(self, keep_partial: bool = False):
+        """Stop the download. With keep_partial the temp data and journal stay so it can resume later."""
         if not self.use_idm:
             self.cancel_flag = True
             self.cancel_status_signal.emit("canceling")
+            if self.engine:
+                self.engine.cancel()
+                self.wait(3000)
             if self.process:
                 try:
                     if self.process.poll() is None:
@@ -386,7 +579,9 @@ class DownloadCore(QThread):
                 except Exception:
                     pass
             subfolder_path = os.path.join(AppDataManager.getTempFolder(), self.update_name)
-            if not self.cleaned and os.path.exists(subfolder_path):
+            if keep_partial and os.path.isdir(subfolder_path) and os.listdir(subfolder_path):
+                logger.info(f"Partial download kept for resuming: {subfolder_path}")
+            elif not self.cleaned and os.path.exists(subfolder_path):
                 AppDataManager.manageTempFolder(clean=True, subfolder=self.update_name)
                 self.cleaned = True
             self.cancel_status_signal.emit("canceled")
@@ -0,0 +1,494 @@
+import os
+import time
+import threading
+from collections import deque
+from typing import Optional, Callable, List, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from Core.Logger import logger
+from Core.DownloadJournal import DownloadJournal
+from Core.IntegrityManager import StreamHasher
+from Core.SegmentTuner import SegmentTuner
+from Core.DiskAllocator import DiskAllocator, DiskSpaceError
+
+class DownloadEngineError(Exception):
+    """Raised when the native engine cannot complete a download."""
+
+class Segment:
+    """A byte range of the output file downloaded over one connection."""
+    def __init__(self, start: int, end: int, position: Optional[int] = None):
+        self.start = start
+        self.end = end  # Inclusive, -1 while the total size is unknown
+        self.position = start if position is None else position
+        self.active = False  # A worker is downloading it
+
+    @property
+    def remaining(self) -> int:
+        return max(self.end - self.position + 1, 0) if self.end >= 0 else -1
+
+    @property
+    def done(self) -> bool:
+        return self.end >= 0 and self.position > self.end
+
+class NativeDownloadEngine:
+    """In-process multi-connection HTTP downloader writing into a single preallocated file."""
+    CHUNK_SIZE = 256 * 1024
+    MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+    MIN_SPLIT_SIZE = 2 * 1024 * 1024  # Smallest half a running segment is split into for an idle worker
+    CONNECT_TIMEOUT = 10
+    READ_TIMEOUT = 30
+    MAX_RETRIES = 5
+    RETRY_WAIT = 2
+    PROGRESS_INTERVAL = 0.25
+    RATE_WINDOW = 5.0
+    JOURNAL_INTERVAL = 2.0
+    HASH_CHUNK_SIZE = 1024 * 1024
+    USER_AGENT = "Mozilla/5.0"
+
+    def __init__(self, url: str, output_path: str, segments: int = 8, speed_limit_kb: Optional[int] = None,
+                 download_logger=None, journal: Optional[DownloadJournal] = None, source_url: Optional[str] = None,
+                 hash_data: bool = True, tuner: Optional[SegmentTuner] = None, stream_consumer=None):
+        self.url = url
+        self.source_url = source_url or url
+        self.journal = journal
+        self.resumed_bytes = 0
+        self.output_path = output_path
+        self.max_segments = max(int(segments), 1)
+        self.tuner = tuner
+        self.target_connections = tuner.connections if tuner else self.max_segments
+        if tuner:
+            self.max_segments = max(self.max_segments, tuner.maximum)
+        self.speed_limit = int(speed_limit_kb) * 1024 if speed_limit_kb else 0
+        self.log = download_logger or logger
+        self.session = self._create_session(self.max_segments)
+        self.total_size = 0
+        self.downloaded = 0
+        self.accepts_ranges = False
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.segments: List[Segment] = []
+        self.active_connections = 0
+        self.canceled = False
+        self._lock = threading.Lock()
+        self._throttle_lock = threading.Lock()
+        self._allowance = float(self.speed_limit)
+        self._last_throttle = time.monotonic()
+        self._cancel_event = threading.Event()
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._errors: List[Exception] = []
+        self._workers: List[threading.Thread] = []
+        self._retire_requests = 0
+        self.connection_limit: Optional[int] = None  # Set while other downloads share the connection budget
+        self._samples = deque()
+        self.hasher: Optional[StreamHasher] = StreamHasher() if hash_data else None
+        self.stream_consumer = stream_consumer  # Gets every byte in file order through feed(), e.g. to extract while downloading
+        self._prefix_size = 0
+        self._workers_done = threading.Event()
+
+    # region Public API
+    def run(self, progress_callback: Optional[Callable[["NativeDownloadEngine"], None]] = None) -> bool:
+        """Download the file, blocking until it completes. Returns False if canceled."""
+        self._probe()
+        if not self._restore_journal():
+            self._plan_segments()
+            self._preallocate()
+        self.log.debug(f"Native engine: size={self.total_size} ranges={self.accepts_ranges} segments={len(self.segments)} url={self.url}")
+
+        if self.tuner and not (self.accepts_ranges and self.total_size and not self.speed_limit):
+            self.log.info("Autotune: off for this download (no byte ranges, unknown size or speed limit active)")
+            self.tuner = None
+        self._add_workers(self.target_connections if self.accepts_ranges else 1)
+        prefix_thread = None
+        if self.hasher or self.stream_consumer:
+            prefix_thread = threading.Thread(target=self._read_prefix, daemon=True)
+            prefix_thread.start()
+        last_journal = time.monotonic()
+        while any(worker.is_alive() for worker in self._workers) or self._revive_worker():
+            time.sleep(self.PROGRESS_INTERVAL)
+            self._record_sample()
+            if self.accepts_ranges and not self._cancel_event.is_set():
+                limit = self.connection_limit
+                if self.tuner:
+                    if limit:
+                        self.tuner.setMaximum(limit)
+                    self._apply_target(self.tuner.observe(time.monotonic(), self.downloaded))
+                else:
+                    self._apply_target(min(self.max_segments, limit) if limit else self.max_segments)
+            if progress_callback:
+                progress_callback(self)
+            if time.monotonic() - last_journal >= self.JOURNAL_INTERVAL:
+                self._save_journal()
+                last_journal = time.monotonic()
+        self._workers_done.set()
+        if self.tuner:
+            self.tuner.finish()
+        if prefix_thread:
+            prefix_thread.join()
+        self._record_sample()
+        if progress_callback:
+            progress_callback(self)
+        self.session.close()
+
+        complete = not self._errors and not self._cancel_event.is_set() and (not self.total_size or self.downloaded >= self.total_size)
+        if complete:
+            if self.journal:
+                self.journal.delete()
+            return True
+        self._save_journal()
+        if self._errors:
+            raise self._errors[0]
+        if self._cancel_event.is_set():
+            self.canceled = True
+            return False
+        raise DownloadEngineError(f"Download incomplete: {self.downloaded} of {self.total_size} bytes received.")
+
+    def pause(self) -> None:
+        self._resume_event.clear()
+
+    def resume(self) -> None:
+        self._resume_event.set()
+
+    def setConnectionLimit(self, limit: int) -> None:
+        """Cap the connections from the next progress tick on; the tuner only tries counts up to the cap."""
+        self.connection_limit = max(int(limit), 1)
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+        self._resume_event.set()
+
+    def dropStreamConsumer(self) -> None:
+        """Stop feeding the stream consumer and let it discard what it produced."""
+        if self.stream_consumer:
+            try:
+                self.stream_consumer.abort()
+            except Exception as e:
+                self.log.warning(f"Failed to abort stream consumer: {e}")
+            self.stream_consumer = None
+
+    def getDigests(self) -> Optional[Dict[str, str]]:
+        """Digests of the finished file, or None if hashing was off or could not cover every byte."""
+        if not self.hasher or self._prefix_size != self.total_size:
+            return None
+        return self.hasher.hexdigests()
+
+    def getRate(self) -> float:
+        """Bytes per second over the last few seconds."""
+        with self._lock:
+            if len(self._samples) < 2:
+                return 0.0
+            (start_time, start_bytes), (end_time, end_bytes) = self._samples[0], self._samples[-1]
+        elapsed = end_time - start_time
+        return (end_bytes - start_bytes) / elapsed if elapsed > 0 else 0.0
+
+    def getETA(self) -> Optional[float]:
+        rate = self.getRate()
+        if not self.total_size or rate <= 0:
+            return None
+        return max(self.total_size - self.downloaded, 0) / rate
+    # endregion
+
+    # region Setup
+    def _create_session(self, pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 1), max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"User-Agent": self.USER_AGENT, "Accept-Encoding": "identity"})
+        return session
+
+    def _probe(self) -> None:
+        """Resolve redirects and find out the size and whether byte ranges are supported."""
+        last_error = None
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                with self.session.get(self.url, headers={"Range": "bytes=0-0"}, stream=True,
+                                      timeout=(self.CONNECT_TIMEOUT, self.READ_TIMEOUT)) as response:
+                    if response.status_code >= 400:
+                        raise DownloadEngineError(f"Server responded with HTTP {response.status_code}.")
+                    self.url = response.url
+                    self.etag = response.headers.get("ETag")
+                    self.last_modified = response.headers.get("Last-Modified")
+                    content_range = response.headers.get("Content-Range", "")
+                    if response.status_code == 206 and "/" in content_range and not content_range.endswith("/*"):
+                        self.accepts_ranges = True
+                        self.total_size = int(content_range.rsplit("/", 1)[1])
+                    else:
+                        self.accepts_ranges = False
+                        self.total_size = int(response.headers.get("Content-Length") or 0)
+                return
+            except DownloadEngineError:
+                raise
+            except (requests.RequestException, ValueError) as e:
+                last_error = e
+                self.log.warning(f"Probe attempt {attempt + 1} failed: {e}")
+                time.sleep(self.RETRY_WAIT)
+        raise DownloadEngineError(f"Could not reach download server: {last_error}")
+
+    def _plan_segments(self) -> None:
+        if not self.total_size:
+            self.segments = [Segment(0, -1)]
+            return
+        if not self.accepts_ranges:
+            self.segments = [Segment(0, self.total_size - 1)]
+            return
+        count = max(min(self.target_connections, self.total_size // self.MIN_SEGMENT_SIZE), 1)
+        size = self.total_size // count
+        self.segments = [Segment(i * size, self.total_size - 1 if i == count - 1 else (i + 1) * size - 1) for i in range(count)]
+
+    def _restore_journal(self) -> bool:
+        """Pick up the completed ranges of an earlier attempt, if the server still offers the same file."""
+        if not self.journal or not self.accepts_ranges:
+            return False
+        data = self.journal.load()
+        if not data:
+            return False
+        if not DownloadJournal.matches(data, self.source_url, self.total_size, self.etag, self.last_modified) \
+                or os.path.getsize(self.output_path) != self.total_size:
+            self.log.info("Download journal does not match the remote file, starting over.")
+            self.journal.delete()
+            return False
+        try:
+            self.segments = [Segment(int(start), int(end), int(position)) for start, end, position in data["Segments"]]
+        except (KeyError, TypeError, ValueError):
+            self.journal.delete()
+            return False
+        self.downloaded = self.resumed_bytes = sum(segment.position - segment.start for segment in self.segments)
+        self.log.info(f"Resuming download from journal: {self.downloaded} of {self.total_size} bytes already on disk.")
+        return True
+
+    def _save_journal(self) -> None:
+        if not self.journal or not self.accepts_ranges or not self.total_size or not os.path.exists(self.output_path):
+            return
+        try:
+            # Flush written data before the journal claims it
+            with open(self.output_path, "rb+") as f:
+                os.fsync(f.fileno())
+            with self._lock:
+                segments = [[segment.start, segment.end, segment.position] for segment in self.segments]
+            self.journal.save(self.source_url, self.url, self.total_size, self.etag, self.last_modified, segments)
+        except OSError as e:
+            self.log.warning(f"Failed to update download journal: {e}")
+
+    def _preallocate(self) -> None:
+        """Reserve the whole file before the segments start writing into it at their own offsets."""
+        try:
+            DiskAllocator.preallocate(self.output_path, self.total_size, f"downloading {os.path.basename(self.output_path)}")
+        except DiskSpaceError as e:
+            raise DownloadEngineError(str(e)) from e
+    # endregion
+
+    # region Workers
+    def _add_workers(self, count: int) -> None:
+        for _ in range(count):
+            worker = threading.Thread(target=self._run_worker, daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _apply_target(self, target: int) -> None:
+        """Start or retire workers so the number of connections follows the tuner."""
+        if target == self.target_connections:
+            return
+        self.target_connections = target
+        with self._lock:
+            running = sum(worker.is_alive() for worker in self._workers) - self._retire_requests
+            if target < running:
+                self._retire_requests += running - target
+                self.log.info(f"{'Autotune' if self.tuner else 'Connection share'}: reducing connections from {running} to {target}")
+        if target > running:
+            self.log.info(f"{'Autotune' if self.tuner else 'Connection share'}: increasing connections from {running} to {target}")
+            self._add_workers(target - running)
+
+    def _revive_worker(self) -> bool:
+        """Start a worker again if every one has left while part of the file has no owner; True if one was started."""
+        if self._cancel_event.is_set() or self._errors:
+            return False
+        with self._lock:
+            if all(segment.done for segment in self.segments):
+                return False
+        self.log.warning("All connections left with segments unfinished, starting one again")
+        self._add_workers(1)
+        return True
+
+    def _next_segment(self) -> Optional[Segment]:
+        """Claim an unowned segment, or split the largest running one so no connection sits idle."""
+        with self._lock:
+            for segment in self.segments:
+                if not segment.active and not segment.done:
+                    segment.active = True
+                    return segment
+            if not self.accepts_ranges:
+                return None
+            victim = max((segment for segment in self.segments if segment.active and segment.end >= 0),
+                         key=lambda segment: segment.remaining, default=None)
+            if not victim or victim.remaining < 2 * self.MIN_SPLIT_SIZE:
+                return None
+            middle = victim.position + victim.remaining // 2
+            segment = Segment(middle, victim.end)
+            segment.active = True
+            victim.end = middle - 1
+            self.segments.append(segment)
+            return segment
+
+    def _run_worker(self) -> None:
+        with self._lock:
+            self.active_connections += 1
+        segment = None
+        try:
+            while not self._cancel_event.is_set() and (segment := self._next_segment()):
+                if not self._download_segment(segment):
+                    break
+                segment.active = False
+        except Exception as e:
+            self.log.error(f"Segment {f'{segment.start}-{segment.end}' if segment else ''} failed: {e}")
+            self._errors.append(e if isinstance(e, DownloadEngineError) else DownloadEngineError(str(e)))
+            self._cancel_event.set()
+            self._resume_event.set()
+        finally:
+            with self._lock:
+                if segment:
+                    segment.active = False
+                elif self._retire_requests > 0:
+                    # Left on its own with nothing to claim or split, which serves a pending reduction just as well
+                    self._retire_requests -= 1
+                self.active_connections -= 1
+
+    def _should_retire(self) -> bool:
+        with self._lock:
+            if self._retire_requests <= 0:
+                return False
+            if self.active_connections <= 1:
+                # The last worker owns what is left to download, a request still pending here is stale
+                self._retire_requests = 0
+                return False
+            self._retire_requests -= 1
+            return True
+
+    def _download_segment(self, segment: Segment) -> bool:
+        """Download the segment's remaining bytes. Returns False if the worker should stop instead."""
+        retries = 0
+        with open(self.output_path, "r+b", buffering=0) as f:
+            while not segment.done and not self._cancel_event.is_set():
+                headers = {}
+                if self.accepts_ranges:
+                    headers["Range"] = f"bytes={segment.position}-{segment.end}"
+                elif segment.position != segment.start:
+                    # No range support: a retry has to start over
+                    with self._lock:
+                        self.downloaded -= segment.position - segment.start
+                        segment.position = segment.start
+                try:
+                    with self.session.get(self.url, headers=headers, stream=True,
+                                          timeout=(self.CONNECT_TIMEOUT, self.READ_TIMEOUT)) as response:
+                        if response.status_code in (408, 429) or response.status_code >= 500:
+                            raise requests.HTTPError(f"HTTP {response.status_code}")
+                        if response.status_code >= 400:
+                            raise DownloadEngineError(f"Server responded with HTTP {response.status_code}.")
+                        if self.accepts_ranges and response.status_code != 206:
+                            raise DownloadEngineError("Server stopped honouring range requests.")
+                        f.seek(segment.position)
+                        for chunk in response.iter_content(self.CHUNK_SIZE):
+                            if self._cancel_event.is_set():
+                                return False
+                            if self._should_retire():
+                                # Leave the rest of the segment to the other workers
+                                return False
+                            self._resume_event.wait()
+                            if not chunk:
+                                continue
+                            if segment.end >= 0:
+                                # The end may shrink when another worker splits this segment
+                                with self._lock:
+                                    chunk = chunk[:segment.remaining]
+                                if not chunk:
+                                    break
+                            self._throttle(len(chunk))
+                            f.write(chunk)
+                            with self._lock:
+                                segment.position += len(chunk)
+                                self.downloaded += len(chunk)
+                            retries = 0
+                            if segment.done:
+                                break
+                    if segment.end < 0 and not self._cancel_event.is_set():
+                        segment.end = segment.position - 1
+                        self.total_size = segment.position
+                except requests.RequestException as e:
+                    retries += 1
+                    if retries > self.MAX_RETRIES:
+                        raise DownloadEngineError(f"Connection lost after {self.MAX_RETRIES} retries: {e}")
+                    self.log.warning(f"Segment {segment.start}-{segment.end} interrupted at {segment.position} ({e}), retry {retries}/{self.MAX_RETRIES}")
+                    self._cancel_event.wait(self.RETRY_WAIT)
+        return not self._cancel_event.is_set()
+
+    def _contiguous_end(self) -> int:
+        """End of the leading run of bytes that are already on disk."""
+        end = 0
+        with self._lock:
+            for segment in sorted(self.segments, key=lambda seg: seg.start):
+                if segment.start != end:
+                    break
+                end = segment.end + 1 if segment.done else segment.position
+                if not segment.done:
+                    break
+        return end
+
+    def _read_prefix(self) -> None:
+        """Hash the file in order as the downloaded prefix grows, so only the tail is left when the last byte lands.
+
+        Segments finish out of order, so the reader trails the contiguous prefix and reads those
+        freshly written bytes back while they are still in the OS cache instead of re-reading the whole file later.
+        The stream consumer, if any, gets the same bytes in the same order.
+        """
+        try:
+            with open(self.output_path, "rb") as f:
+                while not self._cancel_event.is_set() and (self.hasher or self.stream_consumer):
+                    end = self._contiguous_end()
+                    if self._prefix_size >= end:
+                        if self._workers_done.is_set():
+                            return
+                        self._workers_done.wait(self.PROGRESS_INTERVAL)
+                        continue
+                    f.seek(self._prefix_size)
+                    chunk = f.read(min(self.HASH_CHUNK_SIZE, end - self._prefix_size))
+                    if not chunk:
+                        return
+                    self._prefix_size += len(chunk)
+                    if self.hasher:
+                        self.hasher.update(chunk)
+                    if self.stream_consumer:
+                        self._feed_consumer(chunk)
+        except OSError as e:
+            self.log.warning(f"Reading the downloaded prefix stopped: {e}")
+            self.hasher = None
+            self.dropStreamConsumer()
+
+    def _feed_consumer(self, chunk: bytes) -> None:
+        try:
+            self.stream_consumer.feed(chunk)
+        except Exception as e:
+            # The download itself is fine; only the on-the-fly consumer gives up
+            self.log.warning(f"Stream consumer stopped at byte {self._prefix_size - len(chunk)}: {e}")
+            self.dropStreamConsumer()
+
+    def _throttle(self, size: int) -> None:
+        if not self.speed_limit:
+            return
+        with self._throttle_lock:
+            now = time.monotonic()
+            self._allowance = min(self.speed_limit, self._allowance + (now - self._last_throttle) * self.speed_limit)
+            self._last_throttle = now
+            self._allowance -= size
+            wait = -self._allowance / self.speed_limit if self._allowance < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+    def _record_sample(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._samples.append((now, self.downloaded))
+            while len(self._samples) > 2 and now - self._samples[0][0] > self.RATE_WINDOW:
+                self._samples.popleft()
+    # endregion
@@ -0,0 +1,74 @@
+import os
+import json
+import time
+from typing import Optional, Dict, Any, List
+
+from Core.Logger import logger
+
+class DownloadJournal:
+    """Crash-safe record of the byte ranges already written to a partial download."""
+    EXTENSION = ".journal"
+    VERSION = 1
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.path = output_path + self.EXTENSION
+
+    @staticmethod
+    def isJournalFile(file_name: str) -> bool:
+        return file_name.endswith(DownloadJournal.EXTENSION)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not self.exists() or not os.path.exists(self.output_path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("Version") != self.VERSION:
+                return None
+            return data
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable download journal {self.path}: {e}")
+            return None
+
+    def save(self, source_url: str, url: str, total_size: int, etag: Optional[str], last_modified: Optional[str],
+             segments: List[List[int]]) -> None:
+        """Atomically replace the journal so a crash never leaves a half-written file behind."""
+        data = {
+            "Version": self.VERSION,
+            "SourceURL": source_url,
+            "URL": url,
+            "TotalSize": total_size,
+            "ETag": etag,
+            "LastModified": last_modified,
+            "Segments": segments,
+            "Updated": time.time()
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def delete(self) -> None:
+        for path in (self.path, self.path + ".tmp"):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                logger.warning(f"Failed to remove download journal {path}: {e}")
+
+    @staticmethod
+    def matches(data: Dict[str, Any], source_url: str, total_size: int, etag: Optional[str], last_modified: Optional[str]) -> bool:
+        """Whether a stored journal still describes the file the server is offering now."""
+        if data.get("SourceURL") != source_url or data.get("TotalSize") != total_size or not total_size:
+            return False
+        if etag and data.get("ETag") and etag != data.get("ETag"):
+            return False
+        if last_modified and data.get("LastModified") and last_modified != data.get("LastModified"):
+            return False
+        return True
@@ -0,0 +1,323 @@
+import os
+import json
+import time
+import uuid
+from collections import Counter
+from typing import Optional, Dict, List, Any
+from urllib.parse import urlparse
+
+from PySide6.QtCore import QObject, Signal
+
+from Core.Logger import logger
+from Core.ConfigManager import ConfigManager
+from Core.AppDataManager import AppDataManager
+from Core.DownloadCore import DownloadCore
+from Core.SegmentTuner import SegmentTuner
+from Core.ProgressBus import ProgressBus, ProgressFrame
+
+class DownloadJob:
+    """A queued download of one update, identified by (game, tab_key, update_name)."""
+    STATE_QUEUED = "Queued"
+    STATE_RUNNING = "Running"
+    STATE_SUSPENDED = "Suspended"  # Its window was closed, kept for the next session
+
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 1
+    PRIORITY_LOW = 2
+
+    def __init__(self, game_id: str, tab_key: str, update_name: str, url: str, size_bytes: int = 0,
+                 priority: int = PRIORITY_NORMAL, expected_digests: Optional[Dict[str, str]] = None,
+                 job_id: Optional[str] = None, added: Optional[float] = None):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.game_id = game_id
+        self.tab_key = tab_key
+        self.update_name = update_name
+        self.url = url
+        self.size_bytes = size_bytes
+        self.priority = priority
+        self.expected_digests = expected_digests or {}
+        self.added = added or time.time()
+        self.state = self.STATE_QUEUED
+        # Runtime only
+        self.thread: Optional[DownloadCore] = None
+        self.connections = 0
+        self.progress_callback = None
+        self.downloaded_bytes = 0
+        self.total_bytes = 0
+        self.rate_bytes = 0.0
+        self.result: Optional[str] = None
+        # Taken from the thread when it finishes
+        self.final_path = ""
+        self.staged_install = False
+        self.stage_times: Dict[str, float] = {}
+
+    @property
+    def key(self) -> tuple: return (self.game_id, self.tab_key, self.update_name)
+
+    @property
+    def host(self) -> str: return (urlparse(self.url).hostname or "").lower()
+
+    @property
+    def remaining_bytes(self) -> int: return max((self.total_bytes or self.size_bytes) - self.downloaded_bytes, 0)
+
+    def toDict(self) -> Dict[str, Any]:
+        return {
+            "JobID": self.job_id, "GameID": self.game_id, "TabKey": self.tab_key, "UpdateName": self.update_name,
+            "URL": self.url, "Size": self.size_bytes, "Priority": self.priority,
+            "ExpectedDigests": self.expected_digests, "Added": self.added
+        }
+
+    @classmethod
+    def fromDict(cls, data: Dict[str, Any]) -> "DownloadJob":
+        return cls(data["GameID"], data["TabKey"], data["UpdateName"], data["URL"], data.get("Size", 0),
+                   data.get("Priority", cls.PRIORITY_NORMAL), data.get("ExpectedDigests"), data.get("JobID"), data.get("Added"))
+
+class DownloadScheduler(QObject):
+    """Runs queued downloads within a global connection budget and per-host limits.
+
+    Pending jobs are ordered by priority, then by size, so small squad files overtake a
+    large Title Update that keeps streaming on the connections left over.
+    """
+    job_started = Signal(object)
+    job_finished = Signal(object)
+    queue_changed = Signal()
+    queue_progress = Signal(float, float, float, str)  # downloaded MB, total MB, rate MB/s, ETA
+
+    RESULT_COMPLETED = "Completed"
+    RESULT_FAILED = "Failed"
+    RESULT_CANCELED = "Canceled"
+    RESULT_SUSPENDED = "Suspended"
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(DownloadScheduler, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        super().__init__()
+        self.QUEUE_FILE = os.path.join(AppDataManager.getDataFolder(), "DownloadQueue.json")
+        self.config_manager = ConfigManager()
+        self.progress_bus = ProgressBus()
+        self.jobs: List[DownloadJob] = []
+        self.restored = False
+        self._load_queue()
+        self._initialized = True
+
+    # region Persistence
+    def _load_queue(self) -> None:
+        if not os.path.exists(self.QUEUE_FILE):
+            return
+        try:
+            with open(self.QUEUE_FILE, "r", encoding="utf-8") as f:
+                self.jobs = [DownloadJob.fromDict(data) for data in json.load(f)]
+            logger.info(f"Loaded {len(self.jobs)} queued download(s)")
+        except Exception as e:
+            logger.error(f"Failed to load download queue: {e}")
+            self.jobs = []
+
+    def _save_queue(self) -> None:
+        try:
+            temp_file = self.QUEUE_FILE + ".tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump([job.toDict() for job in self.jobs], f, indent=4)
+            os.replace(temp_file, self.QUEUE_FILE)
+        except Exception as e:
+            logger.error(f"Failed to save download queue: {e}")
+    # endregion
+
+    # region Queue
+    def getJobs(self) -> List[DownloadJob]: return list(self.jobs)
+
+    def getPendingRestoredJobs(self) -> List[DownloadJob]:
+        """Jobs left in the queue by a previous session, returned once per session."""
+        if self.restored:
+            return []
+        self.restored = True
+        return [job for job in self.jobs if job.state == DownloadJob.STATE_QUEUED and not job.thread]
+
+    def clear(self) -> None:
+        """Drop every job that is not running, along with its partial data."""
+        for job in [job for job in self.jobs if not job.thread]:
+            self.cancel(job)
+
+    def findJob(self, game_id: str, tab_key: str, update_name: str) -> Optional[DownloadJob]:
+        return next((job for job in self.jobs if job.key == (game_id, tab_key, update_name)), None)
+
+    def enqueue(self, game_id: str, tab_key: str, update_name: str, url: str, size_bytes: int = 0,
+                expected_digests: Optional[Dict[str, str]] = None, priority: int = DownloadJob.PRIORITY_NORMAL) -> DownloadJob:
+        """Add a job, or return the existing one for the same update."""
+        self.restored = True
+        job = self.findJob(game_id, tab_key, update_name)
+        if job and job.state == DownloadJob.STATE_SUSPENDED:
+            job.state = DownloadJob.STATE_QUEUED
+        elif job is None:
+            job = DownloadJob(game_id, tab_key, update_name, url, size_bytes, priority, expected_digests)
+            self.jobs.append(job)
+            logger.info(f"Queued download: {update_name} ({tab_key}, {size_bytes} bytes, priority {priority})")
+            self._save_queue()
+            self.queue_changed.emit()
+        return job
+
+    def schedule(self) -> None:
+        """Start as many queued jobs as the connection budget allows, sharing it among the jobs on each host.
+
+        Every running or queued job gets an even share of its host's limit and of the total budget, so one big
+        download does not hold every connection while small ones wait behind it. Running jobs are capped to
+        their share, which frees connections for the jobs started next, and get more again as others finish.
+        """
+        max_connections, host_limit = self.getMaxConnections(), self.getMaxConnectionsPerHost()
+        jobs = [job for job in self.getQueueOrder() if job.thread or job.state == DownloadJob.STATE_QUEUED]
+        hosts = Counter(job.host for job in jobs)
+        # Jobs past the limits wait for a connection, so they do not shrink the shares of those that can run
+        shares = {job.job_id: max(min(host_limit // min(hosts[job.host], host_limit),
+                                      max_connections // min(len(jobs), max_connections)), 1) for job in jobs}
+        for job in jobs:
+            if job.thread and (connections := min(self._get_wanted_connections(), shares[job.job_id])) != job.connections:
+                logger.info(f"Connection share of {job.update_name} on {job.host}: {job.connections} -> {connections}")
+                job.connections = connections
+                job.thread.setMaxConnections(connections)
+        budget = max_connections - sum(job.connections for job in jobs if job.thread)
+        for job in jobs:
+            if job.thread or budget <= 0:
+                continue
+            host_used = sum(other.connections for other in jobs if other.thread and other.host == job.host)
+            available = min(budget, host_limit - host_used, shares[job.job_id])
+            if available <= 0:
+                continue
+            self._start_job(job, available)
+            budget -= job.connections
+
+    def getQueueOrder(self) -> List[DownloadJob]:
+        return sorted(self.jobs, key=lambda job: (job.priority, job.size_bytes or float("inf"), job.added))
+
+    def getQueuePosition(self, job: DownloadJob) -> int:
+        """Number of queued jobs that will start before this one."""
+        queued = [other for other in self.getQueueOrder() if other.state == DownloadJob.STATE_QUEUED]
+        return queued.index(job) if job in queued else 0
+
+    def setPriority(self, job: DownloadJob, priority: int) -> None:
+        job.priority = priority
+        self._save_queue()
+        self.queue_changed.emit()
+        self.schedule()
+
+    def cancel(self, job: DownloadJob, keep_partial: bool = False) -> None:
+        """Remove a job from the queue, stopping it if it is running."""
+        job.result = self.RESULT_CANCELED
+        if job.thread:
+            job.thread.cancel(keep_partial=keep_partial)
+        else:
+            self._remove_job(job)
+            if not keep_partial:
+                AppDataManager.manageTempFolder(clean=True, subfolder=job.update_name)
+            self.schedule()
+
+    def suspend(self, job: DownloadJob) -> None:
+        """Stop a job but keep it queued, with its partial data, for the next session."""
+        if job not in self.jobs or job.result in (self.RESULT_COMPLETED, self.RESULT_FAILED, self.RESULT_CANCELED):
+            return
+        job.state = DownloadJob.STATE_SUSPENDED
+        if job.thread:
+            job.result = self.RESULT_SUSPENDED
+            job.thread.cancel(keep_partial=True)
+        else:
+            self.queue_changed.emit()
+
+    def getMaxConnections(self) -> int:
+        value = self.config_manager.getConfigKeyMaxConnections()
+        return int(value) if str(value).isdigit() and int(value) > 0 else 16
+
+    def getMaxConnectionsPerHost(self) -> int:
+        value = self.config_manager.getConfigKeyMaxConnectionsPerHost()
+        return int(value) if str(value).isdigit() and int(value) > 0 else 8
+    # endregion
+
+    # region Running jobs
+    def _get_wanted_connections(self) -> int:
+        if self.config_manager.getConfigKeyAutoTuneSegments():
+            # The tuner may grow past the configured segments into whatever share it gets
+            return SegmentTuner.MAX_CONNECTIONS
+        segments = self.config_manager.getConfigKeySegments() or "8"
+        return int(segments) if str(segments).isdigit() else 8
+
+    def _start_job(self, job: DownloadJob, available: int) -> None:
+        job.connections = max(min(self._get_wanted_connections(), available), 1)
+        job.state = DownloadJob.STATE_RUNNING
+        job.result = None
+        job.thread = DownloadCore(job.url, job.game_id, job.update_name, job.tab_key, job.expected_digests,
+                                  max_connections=job.connections, size_bytes=job.size_bytes)
+        job.progress_callback = lambda frame, job=job: self._on_job_progress(job, frame)
+        self.progress_bus.subscribe(job.thread.progress_channel, job.progress_callback)
+        job.thread.download_completed_signal.connect(self._on_job_completed)
+        job.thread.error_signal.connect(self._on_job_error)
+        job.thread.finished.connect(self._on_job_thread_finished)
+        logger.info(f"Starting queued download: {job.update_name} with {job.connections} connection(s) to {job.host}")
+        # Listeners connect to the thread's signals before it starts
+        self.job_started.emit(job)
+        job.thread.start()
+        self.queue_changed.emit()
+
+    def _job_for_sender(self) -> Optional[DownloadJob]:
+        sender = self.sender()
+        return next((job for job in self.jobs if job.thread is sender), None)
+
+    def _on_job_progress(self, job: DownloadJob, frame: ProgressFrame) -> None:
+        job.downloaded_bytes = frame.bytes_done
+        job.total_bytes = frame.bytes_total
+        job.rate_bytes = frame.rate
+        self._emit_queue_progress()
+
+    def _on_job_completed(self) -> None:
+        if job := self._job_for_sender():
+            job.result = self.RESULT_COMPLETED
+
+    def _on_job_error(self) -> None:
+        if (job := self._job_for_sender()) and job.result is None:
+            job.result = self.RESULT_FAILED
+
+    def _on_job_thread_finished(self) -> None:
+        if not (job := self._job_for_sender()):
+            return
+        self.progress_bus.flush(job.thread.progress_channel)
+        self.progress_bus.unsubscribe(job.thread.progress_channel, job.progress_callback)
+        job.final_path, job.staged_install = job.thread.final_path, job.thread.staged_install
+        job.stage_times = dict(job.thread.stage_times)
+        job.thread = None
+        job.connections = 0
+        job.rate_bytes = 0.0
+        if job.result != self.RESULT_SUSPENDED:
+            job.result = job.result or self.RESULT_CANCELED
+            self._remove_job(job)
+        logger.info(f"Queued download finished: {job.update_name} ({job.result})")
+        self.job_finished.emit(job)
+        self._emit_queue_progress()
+        self.schedule()
+
+    def _remove_job(self, job: DownloadJob) -> None:
+        if job in self.jobs:
+            self.jobs.remove(job)
+            self._save_queue()
+            self.queue_changed.emit()
+
+    def getActiveJobs(self) -> List[DownloadJob]:
+        return [job for job in self.jobs if job.state != DownloadJob.STATE_SUSPENDED]
+
+    def _emit_queue_progress(self) -> None:
+        jobs = self.getActiveJobs()
+        total = sum(job.total_bytes or job.size_bytes for job in jobs)
+        downloaded = sum(job.downloaded_bytes for job in jobs)
+        rate = sum(job.rate_bytes for job in jobs if job.thread)
+        remaining = sum(job.remaining_bytes for job in jobs)
+        if rate > 0:
+            hours, rest = divmod(int(remaining / rate), 3600)
+            minutes, seconds = divmod(rest, 60)
+            eta = f"{hours}h{minutes}m{seconds}s" if hours else f"{minutes}m{seconds}s" if minutes else f"{seconds}s"
+        else:
+            eta = "N/A"
+        self.queue_progress.emit(downloaded / 1024 ** 2, total / 1024 ** 2, rate / 1024 ** 2, eta)
+    # endregion
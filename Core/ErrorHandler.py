@@ -4,8 +4,10 @@ from Core.Logger import logger
 
 class ErrorHandler:
     ERR_TITLE = "FC Rollback Tool - Error"
+    show_dialogs = True  # Off for headless runs such as the download benchmark; errors are still logged
 
     @staticmethod
     def handleError(message: str) -> None:
         logger.error(message)
-        win32api.MessageBox(0, message, ErrorHandler.ERR_TITLE, win32con.MB_OK | win32con.MB_ICONERROR)
\ No newline at end of file
+        if ErrorHandler.show_dialogs:
+            win32api.MessageBox(0, message, ErrorHandler.ERR_TITLE, win32con.MB_OK | win32con.MB_ICONERROR)
\ No newline at end of file
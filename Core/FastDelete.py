@@ -0,0 +1,201 @@
+import os
+import sys
+import stat
+import uuid
+import threading
+from typing import Optional, List, Callable
+
+from Core.Logger import logger
+from Core.DiskAllocator import DiskAllocator
+
+class FastDelete:
+    """Deletes folder trees with parallel workers, or moves them out of the way and deletes them in the background.
+
+    The tree is listed with os.scandir, without following symlinks or junctions, then its files and links are
+    removed by several threads, since each removal is a round trip to the file system that does not depend
+    on the others, and the emptied folders are removed deepest first. A tree can instead be renamed to a hidden trash entry next to it, which is one
+    rename on the same volume, so the path is free at once while the files go away off the critical path.
+    Trash left by a background delete cut short by exit is picked up by the next delete in the same folder.
+    """
+    TRASH_SUFFIX = ".FCTrash"
+    MAX_WORKERS = 8
+    _deleting = set()  # Trash paths a background thread is working on
+    _lock = threading.Lock()
+
+    @staticmethod
+    def getWorkerCount(path: str) -> int:
+        """Threads worth deleting with: up to one per core on SSD/NVMe, one on a spinning disk."""
+        if DiskAllocator.isSolidState(path) is False:
+            return 1
+        return max(1, min(os.cpu_count() or 1, FastDelete.MAX_WORKERS))
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except PermissionError:
+            # Read-only files cannot be deleted on Windows until the attribute is cleared
+            if sys.platform != "win32":
+                raise
+            os.chmod(path, stat.S_IWRITE)
+            os.remove(path)
+
+    @staticmethod
+    def _is_link(st: os.stat_result) -> bool:
+        """Symlinks, and on Windows junctions and other reparse points: removed themselves, never followed, as by shutil.rmtree."""
+        return stat.S_ISLNK(st.st_mode) or bool(getattr(st, "st_file_attributes", 0) & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+
+    @staticmethod
+    def _scan(path: str, files: List[str], folders: List[str], errors: List[OSError]) -> None:
+        """List every file and folder under path; folders come before the folders inside them."""
+        pending = [path]
+        while pending:
+            folder = pending.pop()
+            folders.append(folder)
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        st = entry.stat(follow_symlinks=False)
+                        if stat.S_ISDIR(st.st_mode) and not FastDelete._is_link(st):
+                            pending.append(entry.path)
+                        else:
+                            files.append(entry.path)
+            except OSError as e:
+                errors.append(e)
+
+    @staticmethod
+    def deleteTree(path: str, progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                   cancel_check: Optional[Callable[[], bool]] = None, ignore_errors: bool = False,
+                   workers: Optional[int] = None) -> bool:
+        """Delete a file or a folder and everything in it; False if canceled.
+
+        progress_callback receives (files deleted, files total, path). Unless ignore_errors is set, the first
+        error is raised once the workers have stopped, as shutil.rmtree would.
+        """
+        try:
+            st = os.lstat(path)
+        except FileNotFoundError:
+            return True
+        if FastDelete._is_link(st) or not stat.S_ISDIR(st.st_mode):
+            try:
+                FastDelete._remove_file(path)
+            except OSError:
+                if not ignore_errors:
+                    raise
+            return True
+
+        files, folders, errors = [], [], []
+        FastDelete._scan(path, files, folders, errors)
+        total, done = len(files), 0
+        lock = threading.Lock()
+        canceled = threading.Event()
+        workers = min(workers or FastDelete.getWorkerCount(path), len(files)) or 1
+
+        def next_file() -> Optional[str]:
+            with lock:
+                return files.pop() if files and not canceled.is_set() else None
+
+        def run_worker():
+            nonlocal done
+            while file_path := next_file():
+                if cancel_check and cancel_check():
+                    canceled.set()
+                    return
+                try:
+                    FastDelete._remove_file(file_path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    with lock:
+                        errors.append(e)
+                with lock:
+                    done += 1
+                    files_done = done
+                if progress_callback:
+                    progress_callback(files_done, total, file_path)
+
+        if workers > 1:
+            threads = [threading.Thread(target=run_worker, daemon=True) for _ in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        else:
+            run_worker()
+        if canceled.is_set():
+            logger.info(f"Delete of {path} canceled after {done} of {total} files")
+            return False
+
+        for folder in reversed(folders):
+            try:
+                os.rmdir(folder)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                errors.append(e)
+        if errors:
+            if not ignore_errors:
+                raise errors[0]
+            logger.warning(f"Deleted {path} with {len(errors)} errors, first: {errors[0]}")
+        logger.debug(f"Deleted {path}: {total} files, {len(folders)} folders, {workers} workers")
+        return True
+
+    @staticmethod
+    def isTrash(path: str) -> bool:
+        return path.endswith(FastDelete.TRASH_SUFFIX)
+
+    @staticmethod
+    def moveToTrash(path: str) -> str:
+        """Rename path to a hidden trash entry in the same folder, so the path is free at once; returns the new path."""
+        parent = os.path.dirname(os.path.abspath(path))
+        trash_path = os.path.join(parent, f".{os.path.basename(path)}.{uuid.uuid4().hex[:8]}{FastDelete.TRASH_SUFFIX}")
+        os.rename(path, trash_path)
+        return trash_path
+
+    @staticmethod
+    def deleteInBackground(path: str, ignore_errors: bool = False) -> None:
+        """Move path to the trash and delete it on a background thread, along with trash left in the same folder.
+
+        Where path cannot be renamed, it is deleted right away instead, with errors handled as by deleteTree.
+        """
+        if not os.path.lexists(path):
+            return
+        try:
+            trash = [FastDelete.moveToTrash(path)]
+        except OSError as e:
+            logger.debug(f"Could not move {path} to the trash, deleting it in place: {e}")
+            FastDelete.deleteTree(path, ignore_errors=ignore_errors)
+            return
+        FastDelete._start(trash + FastDelete._get_trash(os.path.dirname(trash[0])))
+
+    @staticmethod
+    def purgeTrash(folder: str) -> None:
+        """Delete in the background the trash that background deletes in folder left behind."""
+        FastDelete._start(FastDelete._get_trash(folder))
+
+    @staticmethod
+    def _get_trash(folder: str) -> List[str]:
+        try:
+            with os.scandir(folder) as entries:
+                return [entry.path for entry in entries if FastDelete.isTrash(entry.name)]
+        except OSError:
+            return []
+
+    @staticmethod
+    def _start(paths: List[str]) -> None:
+        with FastDelete._lock:
+            paths = list(dict.fromkeys(path for path in paths if path not in FastDelete._deleting))
+            FastDelete._deleting.update(paths)
+        if not paths:
+            return
+
+        def run():
+            for trash_path in paths:
+                try:
+                    FastDelete.deleteTree(trash_path, ignore_errors=True)
+                finally:
+                    with FastDelete._lock:
+                        FastDelete._deleting.discard(trash_path)
+
+        threading.Thread(target=run, daemon=True).start()
+        logger.info(f"Deleting in the background: {', '.join(paths)}")
@@ -1,8 +1,6 @@
 import os
 import subprocess
-import time
 import threading
-import psutil
 import winreg
 
 from Core.Logger import logger
@@ -10,6 +8,7 @@ from Core.ConfigManager import ConfigManager
 from Core.GameManager import GameManager
 from Core.NotificationManager import NotificationHandler
 from Core.ErrorHandler import ErrorHandler
+from Core.ProcessMonitor import ProcessMonitor
 
 STOP_EVENT = threading.Event()
 
@@ -19,25 +18,15 @@ class GameLauncher:
         self.game_mgr = game_manager or GameManager()
 
     def is_game_running(self, game_exe: str) -> bool:
-        for proc in psutil.process_iter(['name']):
-            try:
-                if proc.info['name'] and os.path.basename(game_exe).lower() in proc.info['name'].lower():
-                    logger.debug(f"Game process {proc.info['name']} is running.")
-                    return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
+        if ProcessMonitor().isRunning(os.path.basename(game_exe)):
+            logger.debug(f"Game process {os.path.basename(game_exe)} is running.")
+            return True
         return False
 
     def terminate_game_process(self, game_exe: str) -> None:
-        for proc in psutil.process_iter(['name']):
-            try:
-                if proc.info['name'] and os.path.basename(game_exe).lower() in proc.info['name'].lower():
-                    proc.terminate()
-                    logger.info(f"Terminated game process: {proc.info['name']}")
-                    time.sleep(2)
-                    return
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
+        # Returns once the game has exited, so the relaunch does not find it still running
+        for proc in ProcessMonitor().find(os.path.basename(game_exe)):
+            proc.terminate(timeout=10)
 
     def get_steam_path(self) -> str:
         try:
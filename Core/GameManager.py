@@ -17,6 +17,8 @@ from Core.ConfigManager import ConfigManager
 from Core.AppDataManager import AppDataManager
 from Core.NotificationManager import NotificationHandler
 from Core.ErrorHandler import ErrorHandler
+from Core.HttpClient import HttpClient
+from Core.CircuitBreaker import CircuitBreaker
 from Core.GameProfile import GameProfileManager, GameProfile
 
 try:
@@ -44,7 +46,7 @@ class GameManager:
         
         self._content_cache = {}
         self._profile_dir_cache = {}
-        self.is_offline = False
+        self._lists_failed = False
         self.app_data_manager = AppDataManager()
         self.main_data_manager = MainDataManager()
         os.makedirs(self.app_data_manager.getDataFolder(), exist_ok=True)
@@ -54,6 +56,11 @@ class GameManager:
         self._depot_manifest_cache = {}
         self._depot_changelog_cache = {}
 
+    @property
+    def is_offline(self) -> bool:
+        """Whether the content lists are served from cache: the last check failed or their host is unreachable."""
+        return self._lists_failed or CircuitBreaker().isOpen(self.profiles_base_url)
+
     # region Getters for Keys and Constants
     def getTitleUpdateSHA1Key(self) -> str: return "SHA1"
     def getTitleUpdateContentVersionKey(self) -> str: return "ContentVersion"
@@ -71,6 +78,10 @@ class GameManager:
     def getTitleUpdateMainManifestIDKey(self) -> str: return "MainManifestID"
     def getTitleUpdateEngUsManifestIDKey(self) -> str: return "eng_usManifestID"
     def getTitleUpdatePatchNotesKey(self) -> str: return "PatchNotes"
+    def getArchiveDigestKeys(self) -> Dict[str, str]: return {"SHA1": "ArchiveSHA1", "SHA256": "ArchiveSHA256", "CRC32": "ArchiveCRC32"}
+    def getExpectedArchiveDigests(self, update: Dict[str, Any]) -> Dict[str, str]:
+        """Trusted archive digests published with a content entry, keyed by algorithm."""
+        return {algorithm: update[key] for algorithm, key in self.getArchiveDigestKeys().items() if update.get(key)}
     def getSquadsContentVersionKey(self) -> str: return "SquadsContentVersion"
     def getSquadsContentVersionDateKey(self) -> str: return "SquadsContentVersionDate"
     def getSquadsNameKey(self) -> str: return "Name"
@@ -202,6 +213,14 @@ class GameManager:
     def getSelectedGameId(self, game_root_path: str) -> str:
         profile = self._get_profile(game_root_path)
         return profile.id if profile else ""
+
+    def getGamePathById(self, game_id: str) -> str:
+        """Root folder of the installed game with the given profile ID: the selected game if it is that one, else a detected one."""
+        selected_game = ConfigManager().getConfigKeySelectedGame()
+        if selected_game and self.getSelectedGameId(selected_game) == game_id:
+            return selected_game
+        profile = self.profile_manager.get_profile(game_id)
+        return self.getGamesFromRegistry().get(profile.exe_name, "") if profile else ""
     
     def getGameSettingsFolderPath(self, game_root_path: str) -> str:
         profile = self._get_profile(game_root_path)
@@ -261,18 +280,11 @@ class GameManager:
             return {pt: self._content_cache[f"{game_id}_{pt}"] for pt in all_profile_types}
 
         content = self._load_local_cache(local_file, emit_status)
-        if not content and os.path.exists(local_file):
-            updated_content = self._fetch_updates(game_id, all_profile_types, emit_status)
-            if updated_content: content = self._update_cache(local_file, {}, updated_content, emit_status)
-            else: content = self._load_base_cache(base_cache_file, game_id, emit_status)
-        elif not content and not os.path.exists(local_file):
-            updated_content = self._fetch_updates(game_id, all_profile_types, emit_status)
-            if updated_content: content = self._update_cache(local_file, {}, updated_content, emit_status)
-            else: content = self._load_base_cache(base_cache_file, game_id, emit_status)
-        elif content:
-            updated_content = self._fetch_updates(game_id, all_profile_types, emit_status)
-            if updated_content: content = self._update_cache(local_file, content, updated_content, emit_status)
-            elif emit_status: emit_status([("Loading locally cached content ", "white"), ("(Offline mode)", "red")])
+        validators = self._load_cache_validators(local_file) if content else {}
+        updated_content = self._fetch_updates(game_id, all_profile_types, content, validators, emit_status)
+        if updated_content is not None: content = self._update_cache(local_file, content, updated_content, validators, emit_status)
+        elif not content: content = self._load_base_cache(base_cache_file, game_id, emit_status)
+        elif emit_status: emit_status([("Loading locally cached content ", "white"), ("(Offline mode)", "red")])
         
         if not content:
             ErrorHandler.handleError(f"Failed to load game content for {game_id} despite all fallback attempts.\nPlease check your internet connection to retrieve the latest updates and try again.")
@@ -310,27 +322,68 @@ class GameManager:
         
         return content
     
-    def _fetch_updates(self, game_id: str, profile_types: List[str], emit_status: Optional[Callable[[str], None]]) -> Dict[str, Any]:
+    def _get_validators_file(self, local_file: str) -> str:
+        return os.path.splitext(local_file)[0] + ".validators.json"
+
+    def _load_cache_validators(self, local_file: str) -> Dict[str, Dict[str, str]]:
+        """ETag/Last-Modified each list of the local cache was fetched with, by profile type."""
+        validators_file = self._get_validators_file(local_file)
+        if not os.path.exists(validators_file):
+            return {}
+        try:
+            with open(validators_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache validators {validators_file}: {e}")
+            return {}
+
+    def _save_cache_validators(self, local_file: str, validators: Dict[str, Dict[str, str]]) -> None:
+        # Written after the cache itself, so the validators never describe content the cache does not hold
+        validators_file = self._get_validators_file(local_file)
+        try:
+            temp_file = validators_file + ".tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(validators, f, indent=4)
+            os.replace(temp_file, validators_file)
+        except OSError as e:
+            logger.error(f"Failed to save cache validators {validators_file}: {e}")
+
+    def _fetch_updates(self, game_id: str, profile_types: List[str], content: Dict[str, Any], validators: Dict[str, Dict[str, str]],
+                       emit_status: Optional[Callable[[str], None]]) -> Optional[Dict[str, Any]]:
+        """Fetch the lists that changed since the local cache; None if any of them could not be checked.
+
+        All lists are requested at once through the shared HttpClient under one TIMEOUT deadline, so an unreachable
+        host costs one timeout rather than one per list and attempt. A list the cache holds is requested with the
+        ETag/Last-Modified it was fetched with, so an unchanged list answers 304 with no body and is left out of
+        the result. validators gets the ones of every list fetched.
+        """
         if emit_status: emit_status([("Checking for new updates...", "white")])
-        updated_content = {}
-        fetch_failed = False
+        batch = {}
         for p_type in profile_types:
-            manifest_url = f"{self.profiles_base_url}{game_id}/{p_type}.json"
-            for attempt in range(self.MAX_RETRIES):
-                try:
-                    response = requests.get(manifest_url, timeout=self.TIMEOUT)
-                    response.raise_for_status()
-                    updated_content[p_type] = response.json()
-                    logger.debug(f"Fetched content for {game_id}_{p_type}")
-                    break
-                except requests.RequestException as e:
-                    logger.error(f"Attempt {attempt + 1} failed for {manifest_url}: {e}")
-                    if attempt == self.MAX_RETRIES - 1:
-                        logger.error(f"Failed to fetch {manifest_url} after {self.MAX_RETRIES} attempts")
-                        fetch_failed = True
-                        break
-        self.is_offline = fetch_failed
-        return updated_content if not fetch_failed else {}
+            cached = validators.get(p_type, {}) if p_type in content else {}
+            headers = {}
+            if cached.get("ETag"): headers["If-None-Match"] = cached["ETag"]
+            if cached.get("Last-Modified"): headers["If-Modified-Since"] = cached["Last-Modified"]
+            batch[p_type] = (f"{self.profiles_base_url}{game_id}/{p_type}.json", headers)
+        updated_content = {}
+        not_modified = []
+        try:
+            for p_type, response in HttpClient().getAll(batch, self.TIMEOUT, self.MAX_RETRIES).items():
+                if response.status_code == 304:
+                    not_modified.append(p_type)
+                    continue
+                response.raise_for_status()
+                updated_content[p_type] = response.json()
+                validators[p_type] = {key: response.headers[key] for key in ("ETag", "Last-Modified") if key in response.headers}
+                logger.debug(f"Fetched content for {game_id}_{p_type}")
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch content lists for {game_id}: {e}")
+            self._lists_failed = True
+            return None
+        self._lists_failed = False
+        if not_modified:
+            logger.info(f"Not modified since the local cache: {', '.join(f'{game_id}_{p_type}' for p_type in not_modified)}")
+        return updated_content
 
     def _get_content_version(self, updated_content: Dict[str, Any], content: Dict[str, Any], tab_key: str) -> str:
         """Get the content version for a given tab based on display settings."""
@@ -344,35 +397,34 @@ class GameManager:
         profile_type = self.getProfileTypeTitleUpdate() if tab_key == self.getTabKeyTitleUpdates() else self.getProfileTypeSquad()
         return (updated_content or content).get(profile_type, {}).get(version_key, 'N/A')
 
-    def _update_cache(self, local_file: str, content: Dict[str, Any], updated_content: Dict[str, Any], emit_status: Optional[Callable[[str], None]]) -> Dict[str, Any]:
-        if updated_content:
-            local_bytes = zlib.compress(pickle.dumps(content))
-            updated_bytes = zlib.compress(pickle.dumps(updated_content))
-            if os.path.exists(local_file):
-                if self.calculateSHA1(local_bytes, is_file=False) != self.calculateSHA1(updated_bytes, is_file=False):
-                    if emit_status: emit_status([("New Update Detected", "#00FF00"), ("<br>Re-Building local cache...", "white")])
-                    content = updated_content
-                    with open(local_file, "wb") as f: f.write(updated_bytes)
-                    self._content_cache.update({f"{os.path.splitext(os.path.basename(local_file))[0]}_{k}": v for k, v in content.items()})
-                    logger.info(f"Updated local cache file at {local_file}")
-                else:
-                    logger.info(f"Lists are up to date. TitleUpdatesContentVersion: {self._get_content_version(updated_content, content, 'TitleUpdates')}, "
-                                f"SquadsContentVersion: {self._get_content_version(updated_content, content, 'SquadsUpdates')}, "
-                                f"FutSquadsContentVersion: {self._get_content_version(updated_content, content, 'FutSquadsUpdates')}")
-                    if emit_status: emit_status([("Loading locally cached content ", "white"), ("(Up to date)", "#00FF00")])
-            else:
-                if emit_status: emit_status([("Building local cache...", "white")])
-                content = updated_content
-                with open(local_file, "wb") as f: f.write(updated_bytes)
-                self._content_cache.update({f"{os.path.splitext(os.path.basename(local_file))[0]}_{k}": v for k, v in content.items()})
-                logger.info(f"Created local cache file at {local_file}")
-        elif content:
-            if emit_status: emit_status([("Loading locally cached content ", "white"), ("(Offline mode)", "red")])
-            logger.warning(f"Using local cache in Offline mode for {os.path.splitext(os.path.basename(local_file))[0]}")
-            NotificationHandler.showWarning("The tool couldn’t verify content updates or failed to check for content updates.\n\nWe’ll use the last updated local cache, which might be out of date! Please check your internet connection to retrieve the latest updates when possible.\n\nClick OK to continue.")
+    def _update_cache(self, local_file: str, content: Dict[str, Any], updated_content: Dict[str, Any], validators: Dict[str, Dict[str, str]],
+                      emit_status: Optional[Callable[[str], None]]) -> Dict[str, Any]:
+        """Merge the lists fetched by _fetch_updates into the local cache; lists that answered 304 are not in updated_content."""
+        game_id = os.path.splitext(os.path.basename(local_file))[0]
+        changed = {p_type: data for p_type, data in updated_content.items() if content.get(p_type) != data}
+        if not content:
+            if not updated_content:
+                logger.error(f"Failed to fetch updates and no valid local cache available for {game_id}")
+                return {}
+            if emit_status: emit_status([("New Update Detected", "#00FF00"), ("<br>Re-Building local cache...", "white")] if os.path.exists(local_file)
+                                        else [("Building local cache...", "white")])
+        elif changed:
+            if emit_status: emit_status([("New Update Detected", "#00FF00"), ("<br>Re-Building local cache...", "white")])
         else:
-            logger.error(f"Failed to fetch updates and no valid local cache available for {os.path.splitext(os.path.basename(local_file))[0]}")
-            return {}
+            logger.info(f"Lists are up to date. TitleUpdatesContentVersion: {self._get_content_version({}, content, 'TitleUpdates')}, "
+                        f"SquadsContentVersion: {self._get_content_version({}, content, 'SquadsUpdates')}, "
+                        f"FutSquadsContentVersion: {self._get_content_version({}, content, 'FutSquadsUpdates')}")
+            if emit_status: emit_status([("Loading locally cached content ", "white"), ("(Up to date)", "#00FF00")])
+            # Fetched again with new validators but the same content, only the validators need saving
+            if updated_content: self._save_cache_validators(local_file, validators)
+            return content
+
+        existed = os.path.exists(local_file)
+        content = {**content, **changed}
+        with open(local_file, "wb") as f: f.write(zlib.compress(pickle.dumps(content)))
+        self._save_cache_validators(local_file, validators)
+        self._content_cache.update({f"{game_id}_{k}": v for k, v in content.items()})
+        logger.info(f"{'Updated' if existed else 'Created'} local cache file at {local_file} ({', '.join(changed)})")
         return content
     
     def fetchIndexData(self, index_url: str) -> Optional[Dict]:
@@ -381,7 +433,7 @@ class GameManager:
             return self._index_cache[index_url]
         
         try:
-            response = requests.get(index_url, timeout=self.TIMEOUT)
+            response = HttpClient().get(index_url, timeout=self.TIMEOUT)
             response.raise_for_status()
             index_data = response.json()
             self._index_cache[index_url] = index_data
@@ -603,6 +655,16 @@ class GameManager:
             logger.error(f"Failed to parse date {date_str}: {e}")
             return "Invalid Date"
     
+    def parseSizeToBytes(self, size_str: str) -> int:
+        """Convert a content entry Size such as "3.50GB" or "9.93MB" to bytes, 0 if unknown."""
+        match = re.match(r"^\s*([\d.]+)\s*([KMGT]?)i?B\s*$", str(size_str or ""), re.IGNORECASE)
+        if not match:
+            return 0
+        try:
+            return int(float(match.group(1)) * 1024 ** "BKMGT".index(match.group(2).upper() or "B"))
+        except ValueError:
+            return 0
+
     def calculateSHA1(self, input_data: str, is_file: bool = True) -> Optional[str]:
         try:
             sha1 = hashlib.sha1()
@@ -965,7 +1027,7 @@ class GameManager:
         if not patch_notes_url:
             return None
         try:
-            response = requests.get(patch_notes_url, timeout=self.TIMEOUT)
+            response = HttpClient().get(patch_notes_url, timeout=self.TIMEOUT)
             response.raise_for_status()
             data = response.json()
             
@@ -1004,7 +1066,7 @@ class GameManager:
         if url in self._live_editor_versions_cache:
             return self._live_editor_versions_cache[url]
         try:
-            r = requests.get(url, timeout=self.TIMEOUT)
+            r = HttpClient().get(url, timeout=self.TIMEOUT)
             r.raise_for_status()
             self._live_editor_versions_cache[url] = data = r.json()
             return data
@@ -1027,7 +1089,7 @@ class GameManager:
             return self._depot_manifest_cache[url]
 
         try:
-            response = requests.get(url, timeout=self.TIMEOUT)
+            response = HttpClient().get(url, timeout=self.TIMEOUT)
             response.raise_for_status()
             manifest_content = response.text
 
@@ -1053,7 +1115,7 @@ class GameManager:
             return self._depot_changelog_cache[url]
 
         try:
-            response = requests.get(url, timeout=self.TIMEOUT)
+            response = HttpClient().get(url, timeout=self.TIMEOUT)
             response.raise_for_status()
             data = response.json()
             self._depot_changelog_cache[url] = data
@@ -0,0 +1,114 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_EXCEPTION
+from typing import Optional, Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from Core.Logger import logger
+from Core.CircuitBreaker import CircuitBreaker, CircuitOpenError
+
+class HttpClient:
+    """One pooled HTTP session for the small JSON requests of the tool.
+
+    Connections are kept alive and reused between requests to the same host, so a request after the first
+    costs one round-trip instead of a new TCP and TLS handshake. getAll issues a batch of requests at once
+    on a shared worker pool under one overall deadline for getting an answer: a request that fails is retried
+    while time is left, and as soon as one request of the batch has failed for good or got no answer by the
+    deadline, the requests not started yet are dropped and the batch fails, without waiting for the others.
+    A host that answers in time but sends slowly is waited for.
+
+    Every request goes through the CircuitBreaker of its host: requests to a host known to be unreachable
+    fail with CircuitOpenError at once, and a request of a batch that got no answer within the whole
+    deadline opens the circuit of its host.
+    """
+    POOL_SIZE = 8
+    MIN_RETRY_TIME = 1.0  # A retry needs at least this long left before the deadline
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(HttpClient, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.POOL_SIZE, pool_maxsize=self.POOL_SIZE, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=self.POOL_SIZE, thread_name_prefix="HttpClient")
+        self._initialized = True
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout=10, stream: bool = False) -> requests.Response:
+        breaker = CircuitBreaker()
+        breaker.check(url)
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout, stream=stream)
+        except (requests.ConnectionError, requests.Timeout):
+            breaker.recordFailure(url)
+            raise
+        breaker.recordSuccess(url)
+        return response
+
+    def _get_until(self, url: str, headers: Optional[Dict[str, str]], deadline: float, read_timeout: float, retries: int,
+                   stop: threading.Event, answered: threading.Event) -> requests.Response:
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or stop.is_set():
+                raise requests.Timeout(f"No time left to fetch {url}")
+            try:
+                response = self.get(url, headers=headers, timeout=(remaining, read_timeout), stream=True)
+                if response.status_code >= 500:
+                    response.raise_for_status()
+                answered.set()
+                # The body may take longer than the deadline, each read only has to arrive within read_timeout
+                response.content
+                return response
+            except requests.RequestException as e:
+                attempt += 1
+                if isinstance(e, CircuitOpenError) or attempt >= retries or stop.is_set() or deadline - time.monotonic() < self.MIN_RETRY_TIME:
+                    raise
+                logger.warning(f"Attempt {attempt} failed for {url}: {e}")
+
+    def getAll(self, batch: Dict[str, Tuple[str, Optional[Dict[str, str]]]], deadline: float, retries: int = 2) -> Dict[str, requests.Response]:
+        """Fetch every (url, headers) of batch at once; the responses by the same keys.
+
+        Every request has to get its response headers within deadline seconds, after which its body only has to
+        keep arriving, with no more than deadline seconds between reads. Raises the requests.RequestException
+        of the first request that failed, or requests.Timeout when a request got no answer by the deadline.
+        Responses are returned whatever their status below 500, checking them is left to the caller.
+        """
+        stop = threading.Event()
+        end = time.monotonic() + deadline
+        answered = {key: threading.Event() for key in batch}
+        futures: Dict[Future, str] = {self.executor.submit(self._get_until, url, headers, end, deadline, retries, stop, answered[key]): key
+                                      for key, (url, headers) in batch.items()}
+        try:
+            done, pending = wait(futures, timeout=deadline, return_when=FIRST_EXCEPTION)
+            for future in done:
+                if future.exception() is not None:
+                    raise future.exception()
+            unanswered = [future for future in pending if not answered[futures[future]].is_set()]
+            if unanswered:
+                # Only a host that sent nothing by the deadline is unreachable, one still sending a body is not
+                for future in unanswered:
+                    CircuitBreaker().trip(batch[futures[future]][0])
+                raise requests.Timeout(f"{len(unanswered)} of {len(futures)} requests got no answer within {deadline}s: "
+                                       f"{', '.join(batch[futures[future]][0] for future in unanswered)}")
+            # Every request answered in time, the ones still reading their body are waited for
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in done:
+                if future.exception() is not None:
+                    raise future.exception()
+            return {futures[future]: future.result() for future in futures}
+        finally:
+            # Drop what has not started; running requests end by their own timeout and are ignored
+            stop.set()
+            for future in futures:
+                future.cancel()
@@ -1,8 +1,8 @@
-import os, psutil, shutil, time, rarfile, zipfile, py7zr
-from datetime import datetime
+import os, shutil, time
 from PySide6.QtCore import QThread, Signal
 from pathlib import Path
 from enum import Enum
+from typing import Dict
 
 from Core.Logger import logger
 from Core.MainDataManager import MainDataManager
@@ -11,13 +11,30 @@ from Core.GameManager import GameManager
 from Core.AppDataManager import AppDataManager
 from Core.NotificationManager import NotificationHandler
 from Core.ErrorHandler import ErrorHandler
+from Core.IntegrityManager import IntegrityManager
+from Core.ProgressBus import ProgressChannel
+from Core.StreamInstaller import StreamInstaller
+from Core.DiskAllocator import DiskAllocator
+from Core.ArchiveReader import ArchiveReader
+from Core.DeltaInstaller import DeltaInstaller, FingerprintCache
+from Core.BackupStrategy import BackupStrategy
+from Core.ContentStore import ContentStore
+from Core.InstallTransaction import InstallTransaction
+from Core.FastDelete import FastDelete
+from Core.SettingsBackup import SettingsBackup
+from Core.ProcessMonitor import ProcessMonitor
+from Core.InstallPlanner import InstallPlanner, GameSnapshot, DiskThroughput
 
 class InstallState(Enum):
     """Installation state definitions."""
     PREPARING = "Preparing..."
+    VERIFYING_ARCHIVE = "Verifying archive integrity..."
     BACKING_UP_SETTINGS = "Backing up settings folder..."
     BACKING_UP_TITLE_UPDATE = "Backing up current Title Update..."
+    PLANNING = "Planning installation..."
+    COMPARING_FILES = "Comparing installed files..."
     INSTALLING_FILES = "Installing Files..."
+    APPLYING_FILES = "Applying installed files..."
     INSTALLING_SQUADS = "Installing Squads..."
     INSTALLING_FUT_SQUADS = "Installing FutSquads..."
     DELETING_STORED_TITLE_UPDATE = "Deleting Title Update from Profiles..."
@@ -27,11 +44,11 @@ class InstallState(Enum):
 
 class InstallCore(QThread):
     """Manages game update installation in a separate thread."""
-    state_changed = Signal(InstallState, int, str)
     completed_signal = Signal()
     error_signal = Signal(str)  
     cancel_signal = Signal()
     request_table_update = Signal()
+    plan_signal = Signal(str)
 
     def __init__(self, update_name: str, tab_key: str, game_path: str, file_path: str):
         super().__init__()
@@ -40,15 +57,19 @@ class InstallCore(QThread):
         self.game_path = game_path
         self.file_path = file_path
         self.is_canceled = False
+        self.progress_channel = ProgressChannel()
+        self.stage_times: Dict[str, float] = {}  # Seconds spent in each stage of run()
         self.options = InstallOptions(self, game_path)
         self.game_mgr = GameManager()
         self.app_data_mgr = AppDataManager()
        
-    def emit_state(self, state: InstallState, progress: int, details: str = ""):
-        """Emit state changes to update UI."""
+    def emit_state(self, state: InstallState, progress: int, details: str = "", items_done: int = None, items_total: int = None,
+                   bytes_done: int = None, bytes_total: int = None):
+        """Publish the current state to the progress channel; the UI picks it up at its own frame rate."""
         if not self.is_canceled:
             try:
-                self.state_changed.emit(state, progress, details)
+                self.progress_channel.publish(state, details, bytes_done=bytes_done, bytes_total=bytes_total,
+                                              items_done=items_done, items_total=items_total, percentage=progress)
             except Exception as e:
                 ErrorHandler.handleError(f"Failed to emit state for {state.value}: {str(e)}")
                 self.error_signal.emit(str(e))
@@ -56,28 +77,22 @@ class InstallCore(QThread):
     def check_blocking_processes(self) -> bool:
         """Check for processes that block installation."""
         game_executables = [p.exe_name for p in self.game_mgr.profile_manager.get_all_profiles()]
-        blocking_processes = game_executables + ["FIFA Mod Manager.exe", "FIFA Editor Tool.exe", "FMT.exe", "Launcher.exe"]
-       
+        blocking_processes = game_executables + ProcessMonitor.MOD_TOOL_PROCESSES
+
         active_processes = []
-        for proc in psutil.process_iter(['name', 'pid', 'exe']):
-            try:
-                proc_name = proc.info['name'].lower()
-                proc_path = proc.info['exe']
-                if any(proc_name == block.lower() for block in blocking_processes):
-                    if proc_name == "launcher.exe":
-                        dll_path = os.path.join(os.path.dirname(proc_path), "FCLiveEditor.DLL")
-                        if not os.path.exists(dll_path):
-                            continue  
-                    active_processes.append((proc.info['name'], proc.info['pid']))
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-       
+        for block in blocking_processes:
+            for proc in ProcessMonitor().find(block):
+                # Launcher.exe is only the Live Editor one when its DLL sits next to it
+                if proc.name == "launcher.exe" and not (proc.exe and os.path.exists(os.path.join(os.path.dirname(proc.exe), "FCLiveEditor.DLL"))):
+                    continue
+                active_processes.append(proc)
+
         if not active_processes:
             return True
        
         process_count = len(active_processes)
         is_plural = process_count > 1
-        process_list = "\n".join([f"- {name} (PID: {pid})" for name, pid in active_processes])
+        process_list = "\n".join([f"- {proc.name} (PID: {proc.pid})" for proc in active_processes])
         message = (
             f"There {'are' if is_plural else 'is'} {'processes' if is_plural else 'process'} "
             f"preventing installation:\n{process_list}\n\n"
@@ -85,14 +100,8 @@ class InstallCore(QThread):
         )
         response = NotificationHandler.showConfirmation(message)
         if response == "Yes":
-            for _, pid in active_processes:
-                try:
-                    proc = psutil.Process(pid)
-                    proc.terminate()
-                    proc.wait(timeout=5)
-                    logger.info(f"Terminated process: {pid}")
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.TimeoutExpired) as e:
-                    logger.warning(f"Failed to terminate process {pid}: {str(e)}")
+            for proc in active_processes:
+                proc.terminate(timeout=5)
             return True
         else:
             logger.info("Installation canceled due to blocking processes")
@@ -115,6 +124,13 @@ class InstallCore(QThread):
                     self.cancel()
                     return
                
+            started = time.monotonic()
+            verified = self.verify_archive_integrity()
+            self.stage_times["Verify"] = time.monotonic() - started
+            if not verified:
+                self.cancel()
+                return
+
             logger.info(f"Starting installation: {self.update_name} for tab {self.tab_key} on game {self.game_path}")
             enabled_options = {
                 self.game_mgr.getTabKeyTitleUpdates(): [
@@ -130,6 +146,7 @@ class InstallCore(QThread):
 
             self.emit_state(InstallState.PREPARING, 0)
 
+            started = time.monotonic()
             if "BackupSettingsGameFolder" in enabled_options and not self.is_canceled:
                 self.options.backup_game_settings_folder()
             if "BackupTitleUpdate" in enabled_options and not self.is_canceled:
@@ -137,7 +154,9 @@ class InstallCore(QThread):
                     logger.info("Installation canceled during backup")
                     self.cancel()
                     return
+            self.stage_times["Backup"] = time.monotonic() - started
 
+            started = time.monotonic()
             if not self.is_canceled:
                 state = (InstallState.INSTALLING_FILES if self.tab_key == self.game_mgr.getTabKeyTitleUpdates()
                          else InstallState.INSTALLING_SQUADS if self.tab_key == self.game_mgr.getTabKeySquadsUpdates()
@@ -147,7 +166,9 @@ class InstallCore(QThread):
                 install_fn = (self.install_title_update if self.tab_key == self.game_mgr.getTabKeyTitleUpdates()
                               else self.install_squad_update)
                 install_fn()
+            self.stage_times["Install"] = time.monotonic() - started
 
+            started = time.monotonic()
             if not self.is_canceled:
                 cleanup_tasks = [
                     ("DeleteLiveTuningUpdate", self.options.delete_live_tuning_update, self.game_path),
@@ -160,6 +181,7 @@ class InstallCore(QThread):
 
             if not self.is_canceled:
                 self.clean_steam_files()
+                self.stage_times["Cleanup"] = time.monotonic() - started
                 self.emit_state(InstallState.INSTALLATION_COMPLETED, 100, "")
                 self.completed_signal.emit()
                 logger.info(f"Installation completed: {self.update_name}")
@@ -169,16 +191,42 @@ class InstallCore(QThread):
                 ErrorHandler.handleError(error_msg)
                 self.error_signal.emit(error_msg)
 
+    def verify_archive_integrity(self) -> bool:
+        """Check the stored file against the digest recorded when it was downloaded or imported."""
+        if not os.path.isfile(self.file_path):
+            return True
+        file_name = os.path.basename(self.file_path)
+        if digests := IntegrityManager.getCachedDigest(self.file_path):
+            logger.info(f"{file_name} unchanged since its digest was recorded (SHA1: {digests.get('SHA1')})")
+            return True
+        stored = IntegrityManager.getStoredDigest(self.file_path)
+        if not stored:
+            return True
+        self.emit_state(InstallState.VERIFYING_ARCHIVE, 0, file_name)
+        current = IntegrityManager.computeDigest(
+            self.file_path, lambda done, total: self.emit_state(InstallState.VERIFYING_ARCHIVE, int(done / total * 100) if total else 100, file_name),
+            save=False
+        )
+        if not IntegrityManager.findMismatch(current, stored):
+            IntegrityManager.saveDigest(self.file_path, current)
+            return True
+        response = NotificationHandler.showConfirmation(
+            f"{file_name} has changed since it was downloaded and may be corrupted.\n\n"
+            f"Do you want to install it anyway?"
+        )
+        if response == "Yes":
+            IntegrityManager.saveDigest(self.file_path, current)
+            return True
+        logger.info(f"Installation canceled: {file_name} failed the integrity check")
+        return False
+
     def delete_existing_file(self, file_path: str):
         """Delete existing file or directory before installation."""
         if os.path.exists(file_path):
             try:
-                if os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-                    logger.debug(f"Deleted existing directory: {file_path}")
-                else:
-                    os.remove(file_path)
-                    logger.debug(f"Deleted existing file: {file_path}")
+                is_dir = os.path.isdir(file_path)
+                FastDelete.deleteTree(file_path)
+                logger.debug(f"Deleted existing {'directory' if is_dir else 'file'}: {file_path}")
             except Exception as e:
                 logger.warning(f"Failed to delete {file_path}: {str(e)}")
 
@@ -186,6 +234,8 @@ class InstallCore(QThread):
         """Install Title Update to game directory, handling both compressed and non-compressed files."""
         if self.is_canceled:
             return
+        transaction = fingerprints = None
+        written = []
         try:
             logger.info(f"Installing Title Update: {self.update_name}")
             config_mgr = ConfigManager()
@@ -195,376 +245,140 @@ class InstallCore(QThread):
             is_compressed = ext in main_data_mgr.getCompressedFileExtensions()
             file_path, dest_dir = Path(
                 self.file_path).resolve(), Path(self.game_path).resolve()
+            if not os.path.exists(dest_dir):
+                raise FileNotFoundError(f"Game directory not found, cannot install update. Path does not exist: {dest_dir}")
+            expected_exes = [
+                p.exe_name for p in self.game_mgr.profile_manager.get_all_profiles()]
+
+            # Delta install: compare with the depot manifests and only touch files that differ
+            delta_manifest = None
+            if is_compressed and config_mgr.getConfigKeyDeltaInstall():
+                self.emit_state(InstallState.COMPARING_FILES, 0, "Fetching depot manifests...")
+                delta_manifest = DeltaInstaller.loadManifest(self.game_mgr, game_id, self.update_name)
+                if delta_manifest is None:
+                    logger.info("Depot manifests unavailable, installing every file")
+            kept_on_clean = self.get_clean_exclusions(str(dest_dir))
+
+            # Plan from the source's index and the game folder snapshot, before anything is written
+            self.emit_state(InstallState.PLANNING, 0, os.path.basename(self.file_path))
+            source_files, bytes_read = InstallPlanner.getSourceFiles(
+                str(file_path), expected_exes, main_data_mgr.getKey(), main_data_mgr.getUnRAR())
+            installed_files = GameSnapshot(str(dest_dir)).getFiles()
+            removals = [] if game_id == "FC24" or delta_manifest is not None else [
+                name for name in os.listdir(dest_dir) if name.lower() not in kept_on_clean]
+            plan = InstallPlanner.plan(str(dest_dir), source_files, bytes_read, removals, installed_files)
+            self.plan_signal.emit(plan.getSummary())
+            DiskAllocator.ensureFreeSpace(str(dest_dir), plan.required_space, f"installing {self.update_name}")
+
+            # Files are staged next to the game folder and swapped in once all of them are in place,
+            # so a failed or canceled install leaves the game folder as it was
+            transaction = InstallTransaction(str(dest_dir), self.update_name)
+            stage_dir = transaction.begin()
 
             # Clean the destination directory
             match game_id:
                 case "FC24":
-                    logger.info(f"Detected FC24. Only deleting files that have matching counterparts.")
+                    logger.info(f"Detected FC24. Only replacing files that have matching counterparts.")
+                case _ if delta_manifest is not None:
+                    logger.info("Delta install: only removing files the Title Update does not have.")
                 case _: # Default case
                     logger.info(
-                        f"Cleaning game directory before install (Game: {game_id}): {dest_dir}")
-                    data_folder_name_lower = "data"
-                    steam_related_exclusions = ["steam_appid.txt", "eastore.ini"]
-                    for file in os.listdir(dest_dir):
-                        if file.lower().endswith(".vdf"):
-                            steam_related_exclusions.append(file.lower())
-                    try:
-                        if not os.path.exists(dest_dir):
-                            raise FileNotFoundError(f"Game directory not found, cannot install update. Path does not exist: {dest_dir}")
-                        else:
-                            for item_name in os.listdir(dest_dir):
-                                if self.is_canceled:
-                                    return
-
-                                if item_name.lower() == data_folder_name_lower or item_name.lower() in steam_related_exclusions:
-                                    logger.debug(f"Skipping deletion of: {item_name}")
-                                    continue
-
-                                item_path = os.path.join(dest_dir, item_name)
-
-                                try:
-                                    if os.path.isdir(item_path):
-                                        shutil.rmtree(item_path)
-                                        logger.debug(f"Deleted directory: {item_path}")
-                                    elif os.path.isfile(item_path):
-                                        os.remove(item_path)
-                                        logger.debug(f"Deleted file: {item_path}")
-                                except PermissionError as pe:
-                                    logger.error(
-                                        f"Permission error while cleaning {item_path}: {str(pe)}")
-                                    raise pe
-                                except Exception as e:
-                                    logger.warning(
-                                        f"Failed to delete {item_path} during pre-install clean: {str(e)}")
-
-                    except Exception as e:
-                        logger.error(
-                            f"Failed during pre-install cleaning of {dest_dir}: {str(e)}")
-                        raise e
+                        f"Clearing game directory on install (Game: {game_id}): {dest_dir}")
+                    for item_name in plan.delete:
+                        transaction.remove(item_name)
+                        logger.debug(f"Removal planned: {item_name}")
 
             self.emit_state(InstallState.INSTALLING_FILES,
                             0, os.path.basename(self.file_path))
-
-            expected_exes = [
-                p.exe_name for p in self.game_mgr.profile_manager.get_all_profiles()]
+            started = time.monotonic()
 
             if is_compressed:
-                pwd = main_data_mgr.getKey()
                 os.makedirs(dest_dir, exist_ok=True)
 
-                if ext == ".rar":
-                    unrar = main_data_mgr.getUnRAR()
-                    rarfile.UNRAR_TOOL = unrar
-                    with rarfile.RarFile(str(file_path)) as rf:
-                        rf.setpassword(pwd)
-                        archive_files = [
-                            item.filename for item in rf.infolist() if not item.is_dir()]
-
-                        root_dir = None
-                        exe_path = None
-                        found_exes = []
-                        for file in archive_files:
-                            if file.lower().endswith('.exe'):
-                                found_exes.append(os.path.basename(file))
-                            if os.path.basename(file).lower() in [exe.lower() for exe in expected_exes]:
-                                exe_path = file
-                                root_dir = os.path.dirname(file)
-                                logger.debug(
-                                    f"Found executable: {os.path.basename(file)} at: {file}, root directory: {root_dir}")
-                                break
-                        if not exe_path:
-                            raise ValueError(
-                                f"No expected executable ({', '.join(expected_exes)}), Please ensure the archive or folder you want to install it contains the game's executable file")
-
-                        files_to_extract = archive_files if not root_dir else [
-                            f for f in archive_files
-                            if f.startswith(root_dir + '/') or f == exe_path
-                        ]
-                        logger.debug(
-                            f"Extracting {len(files_to_extract)} files from root directory: {root_dir or 'archive root'}")
-
-                        # delete counterparts
-                        delete_targets = []
-                        for file in files_to_extract:
-                            rel_path = file.replace(os.sep, '/') if not root_dir else os.path.relpath(
-                                file, root_dir).replace(os.sep, '/')
-                            final_dest = os.path.join(dest_dir, rel_path)
-                            delete_targets.append(final_dest)
-                        for d in delete_targets:
-                            self.delete_existing_file(d)
-
-                        for i, file in enumerate(files_to_extract):
-                            if self.is_canceled:
-                                return
-                            rel_path = file.replace(os.sep, '/') if not root_dir else os.path.relpath(
-                                file, root_dir).replace(os.sep, '/')
-
-                            rf.extract(file, path=dest_dir)
-                            progress = ((i + 1) / len(files_to_extract)) * 100
-                            self.emit_state(
-                                InstallState.INSTALLING_FILES, int(progress), rel_path)
-                            logger.debug(f"Extracted: {rel_path}")
-
-                        src_root = os.path.join(
-                            dest_dir, root_dir) if root_dir else dest_dir
-                        parent_folder = os.path.join(
-                            dest_dir, root_dir.split('/')[0]) if root_dir else dest_dir
-                        if root_dir and os.path.exists(src_root):
-                            files = []
-                            for root, _, filenames in os.walk(src_root):
-                                files.extend(os.path.join(root, fname)
-                                            for fname in filenames)
-
-                            dst_list = []
-                            for src in files:
-                                rel_path = os.path.relpath(
-                                    src, src_root).replace(os.sep, '/')
-                                dst = os.path.join(dest_dir, rel_path)
-                                dst_list.append(dst)
-                            for d in dst_list:
-                                self.delete_existing_file(d)
-
-                            for src in files:
-                                if self.is_canceled:
-                                    shutil.rmtree(
-                                        parent_folder, ignore_errors=True)
-                                    return
-                                rel_path = os.path.relpath(
-                                    src, src_root).replace(os.sep, '/')
-                                dst = os.path.join(dest_dir, rel_path)
-
-                                os.makedirs(os.path.dirname(dst), exist_ok=True)
-                                shutil.move(src, dst)
-                                logger.debug(f"Moved: {rel_path}")
-
-                            for root, dirs, _ in os.walk(src_root):
-                                for d in dirs:
-                                    src_subdir = os.path.join(root, d)
-                                    rel_subdir = os.path.relpath(
-                                        src_subdir, src_root).replace(os.sep, '/')
-                                    dst_subdir = os.path.join(
-                                        dest_dir, rel_subdir)
-                                    os.makedirs(dst_subdir, exist_ok=True)
-                                    logger.debug(
-                                        f"Moved directly to game path: {dst_subdir}")
-
-                            if not os.path.exists(os.path.join(dest_dir, os.path.basename(exe_path))):
-                                raise ValueError(
-                                    f"Failed to move executable {os.path.basename(exe_path)} to {dest_dir}")
-
-                            shutil.rmtree(parent_folder, ignore_errors=True)
-                            logger.debug(
-                                f"Removed parent folder: {parent_folder}")
-
-                elif ext == ".zip":
-                    with zipfile.ZipFile(str(file_path), 'r') as zf:
-                        if pwd:
-                            zf.setpassword(pwd.encode('utf-8'))
-                        archive_files = [
-                            item.filename for item in zf.infolist() if not item.is_dir()]
-
-                        root_dir = None
-                        exe_path = None
-                        found_exes = []
-                        for file in archive_files:
-                            if file.lower().endswith('.exe'):
-                                found_exes.append(os.path.basename(file))
-                            if os.path.basename(file).lower() in [exe.lower() for exe in expected_exes]:
-                                exe_path = file
-                                root_dir = os.path.dirname(file)
-                                logger.debug(
-                                    f"Found executable: {os.path.basename(file)} at: {file}, root directory: {root_dir}")
-                                break
-                        if not exe_path:
-                            raise ValueError(
-                                f"No expected executable ({', '.join(expected_exes)}), Please ensure the archive or folder you want to install it contains the game's executable file")
-
-                        files_to_extract = archive_files if not root_dir else [
-                            f for f in archive_files
-                            if f.startswith(root_dir + '/') or f == exe_path
-                        ]
-                        logger.debug(
-                            f"Extracting {len(files_to_extract)} files from root directory: {root_dir or 'archive root'}")
-
-                        # delete counterparts
-                        delete_targets = []
-                        for file in files_to_extract:
-                            rel_path = file.replace(os.sep, '/') if not root_dir else os.path.relpath(
-                                file, root_dir).replace(os.sep, '/')
-                            final_dest = os.path.join(dest_dir, rel_path)
-                            delete_targets.append(final_dest)
-                        for d in delete_targets:
-                            self.delete_existing_file(d)
-
-                        for i, file in enumerate(files_to_extract):
-                            if self.is_canceled:
-                                return
-                            rel_path = file.replace(os.sep, '/') if not root_dir else os.path.relpath(
-                                file, root_dir).replace(os.sep, '/')
-
-                            zf.extract(file, path=dest_dir)
-                            progress = ((i + 1) / len(files_to_extract)) * 100
-                            self.emit_state(
-                                InstallState.INSTALLING_FILES, int(progress), rel_path)
-                            logger.debug(f"Extracted: {rel_path}")
-
-                        src_root = os.path.join(
-                            dest_dir, root_dir) if root_dir else dest_dir
-                        parent_folder = os.path.join(
-                            dest_dir, root_dir.split('/')[0]) if root_dir else dest_dir
-                        if root_dir and os.path.exists(src_root):
-                            files = []
-                            for root, _, filenames in os.walk(src_root):
-                                files.extend(os.path.join(root, fname)
-                                            for fname in filenames)
-
-                            dst_list = []
-                            for src in files:
-                                rel_path = os.path.relpath(
-                                    src, src_root).replace(os.sep, '/')
-                                dst = os.path.join(dest_dir, rel_path)
-                                dst_list.append(dst)
-                            for d in dst_list:
-                                self.delete_existing_file(d)
-
-                            for src in files:
-                                if self.is_canceled:
-                                    shutil.rmtree(
-                                        parent_folder, ignore_errors=True)
-                                    return
-                                rel_path = os.path.relpath(
-                                    src, src_root).replace(os.sep, '/')
-                                dst = os.path.join(dest_dir, rel_path)
-
-                                os.makedirs(os.path.dirname(dst), exist_ok=True)
-                                shutil.move(src, dst)
-                                logger.debug(f"Moved: {rel_path}")
-
-                            for root, dirs, _ in os.walk(src_root):
-                                for d in dirs:
-                                    src_subdir = os.path.join(root, d)
-                                    rel_subdir = os.path.relpath(
-                                        src_subdir, src_root).replace(os.sep, '/')
-                                    dst_subdir = os.path.join(
-                                        dest_dir, rel_subdir)
-                                    os.makedirs(dst_subdir, exist_ok=True)
-                                    logger.debug(
-                                        f"Created directory: {dst_subdir}")
-
-                            if not os.path.exists(os.path.join(dest_dir, os.path.basename(exe_path))):
-                                raise ValueError(
-                                    f"Failed to move executable {os.path.basename(exe_path)} to {dest_dir}")
-
-                            shutil.rmtree(parent_folder, ignore_errors=True)
-                            logger.debug(
-                                f"Removed parent folder: {parent_folder}")
-
-                elif ext == ".7z":
-                    with py7zr.SevenZipFile(str(file_path), 'r', password=pwd) as szf:
-                        archive_files = [
-                            name for name in szf.getnames() if not name.endswith('/')]
-
-                        root_dir = None
-                        exe_path = None
-                        found_exes = []
-                        for file in archive_files:
-                            if file.lower().endswith('.exe'):
-                                found_exes.append(os.path.basename(file))
-                            if os.path.basename(file).lower() in [exe.lower() for exe in expected_exes]:
-                                exe_path = file
-                                root_dir = os.path.dirname(file)
-                                logger.debug(
-                                    f"Found executable: {os.path.basename(file)} at: {file}, root directory: {root_dir}")
-                                break
-                        if not exe_path:
-                            raise ValueError(
-                                f"No expected executable ({', '.join(expected_exes)}), Please ensure the archive or folder you want to install it contains the game's executable file")
-
-                        files_to_extract = archive_files if not root_dir else [
-                            f for f in archive_files
-                            if f.startswith(root_dir + '/') or f == exe_path
-                        ]
-                        logger.debug(
-                            f"Extracting {len(files_to_extract)} files from root directory: {root_dir or 'archive root'}")
-
-                        # delete counterparts
-                        delete_targets = []
-                        for file in files_to_extract:
-                            rel_path = file.replace(os.sep, '/') if not root_dir else os.path.relpath(
-                                file, root_dir).replace(os.sep, '/')
-                            final_dest = os.path.join(dest_dir, rel_path)
-                            delete_targets.append(final_dest)
-                        for d in delete_targets:
-                            self.delete_existing_file(d)
-
-                        for i, file in enumerate(files_to_extract):
-                            if self.is_canceled:
-                                return
-                            rel_path = file.replace(os.sep, '/') if not root_dir else os.path.relpath(
-                                file, root_dir).replace(os.sep, '/')
-
-                            szf.extract(targets=[file], path=dest_dir)
-                            progress = ((i + 1) / len(files_to_extract)) * 100
-                            self.emit_state(
-                                InstallState.INSTALLING_FILES, int(progress), rel_path)
-                            logger.debug(f"Extracted: {rel_path}")
-
-                        src_root = os.path.join(
-                            dest_dir, root_dir) if root_dir else dest_dir
-                        parent_folder = os.path.join(
-                            dest_dir, root_dir.split('/')[0]) if root_dir else dest_dir
-                        if root_dir and os.path.exists(src_root):
-                            files = []
-                            for root, _, filenames in os.walk(src_root):
-                                files.extend(os.path.join(root, fname)
-                                            for fname in filenames)
-
-                            dst_list = []
-                            for src in files:
-                                rel_path = os.path.relpath(
-                                    src, src_root).replace(os.sep, '/')
-                                dst = os.path.join(dest_dir, rel_path)
-                                dst_list.append(dst)
-                            for d in dst_list:
-                                self.delete_existing_file(d)
-
-                            for src in files:
-                                if self.is_canceled:
-                                    shutil.rmtree(
-                                        parent_folder, ignore_errors=True)
-                                    return
-                                rel_path = os.path.relpath(
-                                    src, src_root).replace(os.sep, '/')
-                                dst = os.path.join(dest_dir, rel_path)
-
-                                os.makedirs(os.path.dirname(dst), exist_ok=True)
-                                shutil.move(src, dst)
-                                logger.debug(f"Moved: {rel_path}")
-
-                            for root, dirs, _ in os.walk(src_root):
-                                for d in dirs:
-                                    src_subdir = os.path.join(root, d)
-                                    rel_subdir = os.path.relpath(
-                                        src_subdir, src_root).replace(os.sep, '/')
-                                    dst_subdir = os.path.join(
-                                        dest_dir, rel_subdir)
-                                    os.makedirs(dst_subdir, exist_ok=True)
-                                    logger.debug(
-                                        f"Created directory: {dst_subdir}")
-
-                            if not os.path.exists(os.path.join(dest_dir, os.path.basename(exe_path))):
-                                raise ValueError(
-                                    f"Failed to move executable {os.path.basename(exe_path)} to {dest_dir}")
-
-                            shutil.rmtree(parent_folder, ignore_errors=True)
+                with ArchiveReader(str(file_path), main_data_mgr.getKey(), main_data_mgr.getUnRAR()) as archive:
+                    archive_files = archive.getNames()
+
+                    root_dir = None
+                    exe_path = None
+                    for file in archive_files:
+                        if os.path.basename(file).lower() in [exe.lower() for exe in expected_exes]:
+                            exe_path = file
+                            root_dir = os.path.dirname(file)
                             logger.debug(
-                                f"Removed parent folder: {parent_folder}")
+                                f"Found executable: {os.path.basename(file)} at: {file}, root directory: {root_dir}")
+                            break
+                    if not exe_path:
+                        raise ValueError(
+                            f"No expected executable ({', '.join(expected_exes)}), Please ensure the archive or folder you want to install it contains the game's executable file")
+
+                    files_to_extract = set(archive_files if not root_dir else [
+                        f for f in archive_files
+                        if f.startswith(root_dir + '/') or f == exe_path
+                    ])
+                    logger.debug(
+                        f"Extracting {len(files_to_extract)} files from root directory: {root_dir or 'archive root'}")
+
+                    # Members are written straight to their place in the game folder, without root_dir
+                    def relative_path(name: str) -> str:
+                        return name if not root_dir else os.path.relpath(name, root_dir).replace(os.sep, '/')
+
+                    if delta_manifest is not None:
+                        fingerprints = FingerprintCache(str(dest_dir))
+                        delta_plan = DeltaInstaller.plan(
+                            str(dest_dir), {relative_path(member.name): member for member in archive.getMembers() if member.name in files_to_extract},
+                            delta_manifest, fingerprints, lambda rel_path: rel_path.split('/')[0].lower() in kept_on_clean,
+                            delete_absent=game_id != "FC24",
+                            progress_callback=lambda done, total, name: self.emit_state(
+                                InstallState.COMPARING_FILES, int(done / total * 100) if total else 100, name),
+                            cancel_check=lambda: self.is_canceled)
+                        fingerprints.save()
+                        if delta_plan is None:
+                            return
+                        for rel_path in delta_plan.delete:
+                            transaction.remove(rel_path)
+                            fingerprints.forget(rel_path)
+                        files_to_extract = delta_plan.extract
+                        plan = InstallPlanner.plan(
+                            str(dest_dir), {relative_path(name): source_files.get(relative_path(name), 0) for name in files_to_extract},
+                            bytes_read, delta_plan.delete, installed_files)
+                        self.plan_signal.emit(plan.getSummary())
+
+                    # One pass over the archive, solid 7z and rar blocks are decompressed once;
+                    # zip and other rar members are spread over as many writers as the drive keeps up with
+                    written = archive.extract(
+                        stage_dir, include=lambda member: member.name in files_to_extract,
+                        rename=lambda member: relative_path(member.name),
+                        progress_callback=lambda done, total, files_done, files_total, name: self.emit_state(
+                            InstallState.INSTALLING_FILES, int(done / total * 100) if total else 100, name,
+                            items_done=files_done, items_total=files_total, bytes_done=done, bytes_total=total),
+                        cancel_check=lambda: self.is_canceled, workers=ArchiveReader.getWorkerCount(stage_dir),
+                        digest=fingerprints is not None)
+                    if self.is_canceled:
+                        return
 
-                else:
-                    raise ValueError(f"Unsupported file extension: {ext}")
+                # A delta install leaves an unchanged executable where it is
+                if not (os.path.exists(os.path.join(stage_dir, os.path.basename(exe_path)))
+                        or exe_path not in files_to_extract and os.path.exists(os.path.join(dest_dir, os.path.basename(exe_path)))):
+                    raise ValueError(
+                        f"Failed to extract executable {os.path.basename(exe_path)} to {dest_dir}")
 
                 logger.info(
-                    f"Extracted compressed file contents to {dest_dir}")
+                    f"Extracted compressed file contents to {stage_dir}")
+
+            elif ContentStore.isManifestFile(self.file_path):
+                # Stored update: its files are already relative to the folder holding the executable
+                root_dir = None
+                entries = ContentStore.readManifest(str(file_path))
+                if not any(os.path.basename(entry["Path"]).lower() in [exe.lower() for exe in expected_exes] for entry in entries):
+                    raise ValueError(
+                        f"No expected executable ({', '.join(expected_exes)}) found in stored update {os.path.basename(self.file_path)}")
+                if not ContentStore.forManifest(str(file_path)).install(
+                        str(file_path), stage_dir,
+                        progress_callback=lambda done, total, name: self.emit_state(
+                            InstallState.INSTALLING_FILES, int(done / total * 100) if total else 100, name, bytes_done=done, bytes_total=total),
+                        cancel_check=lambda: self.is_canceled):
+                    return
+                logger.info(f"Stored Title Update written to {stage_dir}")
 
             else:
                 src_dir = file_path
@@ -590,28 +404,21 @@ class InstallCore(QThread):
                     files.extend(os.path.join(root, fname)
                                 for fname in filenames)
 
-                # delete counterparts
-                dst_list = []
-                for src in files:
-                    rel_path = os.path.relpath(
-                        src, root_dir).replace(os.sep, '/')
-                    dst = os.path.join(dest_dir, rel_path)
-                    dst_list.append(dst)
-                for d in dst_list:
-                    self.delete_existing_file(d)
-
+                # Progress follows the bytes copied, one large file weighs more than many small ones
+                bytes_done = 0
                 for i, src in enumerate(files):
                     if self.is_canceled:
                         return
                     rel_path = os.path.relpath(
                         src, root_dir).replace(os.sep, '/')
-                    dst = os.path.join(dest_dir, rel_path)
+                    dst = os.path.join(stage_dir, rel_path)
 
                     os.makedirs(os.path.dirname(dst), exist_ok=True)
                     shutil.copy2(src, dst)
-                    progress = ((i + 1) / len(files)) * 100
+                    bytes_done += plan.write.get(rel_path, 0)
                     self.emit_state(
-                        InstallState.INSTALLING_FILES, int(progress), rel_path)
+                        InstallState.INSTALLING_FILES, int(bytes_done / plan.bytes_write * 100) if plan.bytes_write else 100, rel_path,
+                        items_done=i + 1, items_total=len(files), bytes_done=bytes_done, bytes_total=plan.bytes_write)
                     logger.debug(f"Copied: {rel_path}")
 
                 for root, dirs, _ in os.walk(root_dir):
@@ -619,33 +426,22 @@ class InstallCore(QThread):
                         src_subdir = os.path.join(root, d)
                         rel_subdir = os.path.relpath(
                             src_subdir, root_dir).replace(os.sep, '/')
-                        dst_subdir = os.path.join(dest_dir, rel_subdir)
+                        dst_subdir = os.path.join(stage_dir, rel_subdir)
                         os.makedirs(dst_subdir, exist_ok=True)
                         logger.debug(f"Created directory: {dst_subdir}")
 
-                logger.info(f"Title Update copied to {dest_dir}")
+                logger.info(f"Title Update copied to {stage_dir}")
 
-            root_dir_name = os.path.basename(root_dir) if root_dir else ''
-            subfolder_path = os.path.join(
-                dest_dir, root_dir_name) if root_dir_name else ''
-            if subfolder_path and os.path.exists(subfolder_path) and os.path.isdir(subfolder_path):
-                logger.debug(
-                    f"Found subfolder {root_dir_name} in {dest_dir}, moving contents to root")
-                for item in os.listdir(subfolder_path):
-                    if self.is_canceled:
-                        shutil.rmtree(subfolder_path, ignore_errors=True)
-                        return
-                    src_item = os.path.join(subfolder_path, item)
-                    dst_item = os.path.join(dest_dir, item)
-                    if os.path.exists(dst_item):
-                        if os.path.isdir(dst_item):
-                            shutil.rmtree(dst_item, ignore_errors=True)
-                        else:
-                            os.remove(dst_item)
-                    shutil.move(src_item, dst_item)
-                    logger.debug(f"Moved: {item} to {dest_dir}")
-                shutil.rmtree(subfolder_path, ignore_errors=True)
-                logger.debug(f"Removed subfolder: {subfolder_path}")
+            if self.is_canceled:
+                return
+            DiskThroughput.record(str(dest_dir), plan.bytes_write, time.monotonic() - started)
+            # Everything is staged: swap it in with renames, reverted if one of them fails
+            transaction.commit(progress_callback=lambda done, total, name: self.emit_state(
+                InstallState.APPLYING_FILES, int(done / total * 100) if total else 100, name, items_done=done, items_total=total))
+            if fingerprints:
+                for member in written:
+                    fingerprints.record(relative_path(member.name), member.sha1)
+                fingerprints.save()
 
             if not self.is_canceled:
                 if not self.game_mgr.validateAndUpdateGameExeSHA1(self.game_path, config_mgr):
@@ -671,7 +467,17 @@ class InstallCore(QThread):
             self.error_signal.emit(str(e))
             if not self.is_canceled:
                 self.cancel()
-                
+        finally:
+            if transaction and not transaction.committed:
+                transaction.discard()
+
+    def get_clean_exclusions(self, dest_dir: str) -> set:
+        """Lower-cased names in the game folder that cleaning it before an install leaves alone."""
+        exclusions = {"data", "steam_appid.txt", "eastore.ini"}
+        if os.path.isdir(dest_dir):
+            exclusions.update(file.lower() for file in os.listdir(dest_dir) if file.lower().endswith(".vdf"))
+        return exclusions
+
     def install_squad_update(self):
         """Install squad/fut update to game settings folder, handling both compressed and non-compressed files."""
         if self.is_canceled:
@@ -687,50 +493,28 @@ class InstallCore(QThread):
             file_path = Path(self.file_path).resolve()
 
             self.emit_state(state, 0, os.path.basename(self.file_path))
+
+            staging_folder = StreamInstaller.getStagingFolder(dst_path, self.update_name)
+            staged_files = StreamInstaller.getStagedFiles(staging_folder, self.file_path, IntegrityManager.getCachedDigest(self.file_path))
+            if staged_files:
+                # Extracted while downloading: the files only have to be moved into place
+                StreamInstaller.commit(staging_folder, staged_files, dst_path, lambda done, total, name: self.emit_state(
+                    state, int(done / total * 100), name.replace('\\', '/'), items_done=done, items_total=total))
+                logger.info(f"Installed squad files extracted while downloading to {dst_path}")
+                return
+            StreamInstaller.removeFolder(staging_folder)
             time.sleep(0.5)
 
             if is_compressed:
-                pwd = main_data_mgr.getKey()
                 os.makedirs(dst_path, exist_ok=True)
-
-                if ext == ".rar":
-                    unrar = main_data_mgr.getUnRAR()
-                    rarfile.UNRAR_TOOL = unrar
-                    with rarfile.RarFile(str(file_path)) as rf:
-                        rf.setpassword(pwd)
-                        file_list = [item for item in rf.infolist() if not item.is_dir()]
-                        for i, member in enumerate(file_list):
-                            if self.is_canceled:
-                                return
-                            rf.extract(member, dst_path)
-                            progress = ((i + 1) / len(file_list)) * 100
-                            self.emit_state(state, int(progress), member.filename.replace('\\', '/'))
-                            logger.debug(f"Extracted: {member.filename}")
-                elif ext == ".zip":
-                    with zipfile.ZipFile(str(file_path), 'r') as zf:
-                        if pwd:
-                            zf.setpassword(pwd.encode('utf-8'))
-                        file_list = [item for item in zf.infolist() if not item.is_dir()]
-                        for i, member in enumerate(file_list):
-                            if self.is_canceled:
-                                return
-                            zf.extract(member, dst_path)
-                            progress = ((i + 1) / len(file_list)) * 100
-                            self.emit_state(state, int(progress), member.filename.replace('\\', '/'))
-                            logger.debug(f"Extracted: {member.filename}")
-                elif ext == ".7z":
-                    with py7zr.SevenZipFile(str(file_path), 'r', password=pwd) as szf:
-                        file_list = [name for name in szf.getnames() if not name.endswith('/')]
-                        for i, member in enumerate(file_list):
-                            if self.is_canceled:
-                                return
-                            szf.extractall(path=dst_path, targets=[member])
-                            progress = ((i + 1) / len(file_list)) * 100
-                            self.emit_state(state, int(progress), member.replace('\\', '/'))
-                            logger.debug(f"Extracted: {member}")
-                else:
-                    raise ValueError(f"Unsupported file extension: {ext}")
-
+                with ArchiveReader(str(file_path), main_data_mgr.getKey(), main_data_mgr.getUnRAR()) as archive:
+                    archive.extract(
+                        dst_path,
+                        progress_callback=lambda done, total, files_done, files_total, name: self.emit_state(
+                            state, int(done / total * 100) if total else 100, name, items_done=files_done, items_total=files_total),
+                        cancel_check=lambda: self.is_canceled)
+                if self.is_canceled:
+                    return
                 logger.info(f"Extracted squad file to {dst_path}")
             else:
                 dst_file = os.path.join(dst_path, os.path.basename(self.file_path))
@@ -767,7 +551,7 @@ class InstallOptions:
         self.app_data_mgr = AppDataManager()
 
     def backup_game_settings_folder(self):
-        """Backup game settings folder to compressed archive with confirmation."""
+        """Back up the game settings folder as an incremental snapshot."""
         if self.install_core.is_canceled:
             return
         try:
@@ -785,33 +569,20 @@ class InstallOptions:
                 self.game_mgr.getSelectedGameId(self.game_path)
             )
             os.makedirs(backup_dir, exist_ok=True)
-            backup_file = os.path.join(backup_dir, f"settings{datetime.now().strftime('%Y-%m-%d')}.zip")
 
-            self.install_core.emit_state(InstallState.BACKING_UP_SETTINGS, 0, os.path.basename(backup_file))
+            self.install_core.emit_state(InstallState.BACKING_UP_SETTINGS, 0, os.path.basename(settings_path))
             time.sleep(0.5)
 
-            if os.path.exists(backup_file):
-                confirmation_message = (
-                    f"\"Backup game settings folder\" option is enabled.\n\n"
-                    f"A backup file already exists for today at:\n\"{backup_file}\"\n\n"
-                    f"Do you want to replace it?"
-                )
-                response = NotificationHandler.showConfirmation(confirmation_message)
-                if response == "Yes":
-                    os.remove(backup_file)
-                    logger.info(f"Deleted existing backup file: {backup_file}")
-                elif response == "No":
-                    logger.info("Backup operation skipped by user")
-                    return
-                elif response == "Cancel":
-                    logger.info("Backup operation canceled by user")
-                    self.install_core.cancel()
-                    return
-
-            shutil.make_archive(backup_file[:-4], "zip", settings_path)
+            # Only files changed since the last snapshot are read, so repeated installs cost next to nothing
+            snapshot = SettingsBackup(backup_dir).createSnapshot(
+                settings_path,
+                progress_callback=lambda done, total, rel_path: self.install_core.emit_state(
+                    InstallState.BACKING_UP_SETTINGS, int(done / total * 100), rel_path, items_done=done, items_total=total),
+                cancel_check=lambda: self.install_core.is_canceled)
+            if snapshot is None:
+                return
             self.install_core.emit_state(InstallState.BACKING_UP_SETTINGS, 100, "100%")
-            time.sleep(0.5)
-            logger.info(f"Settings folder backed up: {backup_file}")
+            logger.info(f"Settings folder backed up: {snapshot}")
         except Exception as e:
             ErrorHandler.handleError(f"Failed to backup game settings folder for {self.game_path}: {str(e)}")
             self.install_core.error_signal.emit(str(e))
@@ -836,7 +607,7 @@ class InstallOptions:
             )
             full_backup_dir = os.path.join(base_backup_dir, installed_update)
 
-            compressed_extensions = MainDataManager().getCompressedFileExtensions()
+            compressed_extensions = MainDataManager().getCompressedFileExtensions() + [ContentStore.EXTENSION]
             conflict_exists = (os.path.exists(full_backup_dir) or
                                any(os.path.exists(f"{full_backup_dir}{ext}") for ext in compressed_extensions))
 
@@ -854,13 +625,15 @@ class InstallOptions:
                 response = NotificationHandler.showConfirmation(confirmation_message)
                 if response == "Yes":
                     if os.path.exists(full_backup_dir):
-                        shutil.rmtree(full_backup_dir)
+                        FastDelete.deleteInBackground(full_backup_dir)
                         logger.info(f"Deleted existing backup folder: {full_backup_dir}")
                     for ext in compressed_extensions:
                         compressed_path = f"{full_backup_dir}{ext}"
                         if os.path.exists(compressed_path):
                             os.remove(compressed_path)
                             logger.info(f"Deleted existing compressed file: {compressed_path}")
+                    if not self.config_mgr.getConfigKeyContentStore():
+                        ContentStore(base_backup_dir).collectGarbage()
                 elif response == "No":
                     logger.info("Backup operation skipped by user")
                     return True
@@ -869,24 +642,37 @@ class InstallOptions:
                     self.install_core.cancel()
                     return False
 
-            os.makedirs(full_backup_dir, exist_ok=True)
-            logger.info(f"Created backup directory: {full_backup_dir}")
-
             files = []
             exclude_folders = ['Data', 'FIFAModData']
             for root, dirs, filenames in os.walk(self.game_path):
                 dirs[:] = [d for d in dirs if d.lower() not in [f.lower() for f in exclude_folders] and not d.lower().startswith('original_')]
                 files.extend(os.path.join(root, fname) for fname in filenames)
 
-            for i, src in enumerate(files):
-                if self.install_core.is_canceled:
+            if self.config_mgr.getConfigKeyContentStore():
+                # Only files no other stored update has are copied in
+                store = ContentStore(base_backup_dir)
+                manifest_path = store.addFolder(
+                    installed_update, self.game_path, files,
+                    progress_callback=lambda done, total, name: self.install_core.emit_state(
+                        InstallState.BACKING_UP_TITLE_UPDATE, int(done / total * 100) if total else 100, name),
+                    cancel_check=lambda: self.install_core.is_canceled)
+                if not manifest_path:
                     return False
-                rel_path = os.path.relpath(src, self.game_path).replace(os.sep, '/')
-                dst = os.path.join(full_backup_dir, rel_path)
-                os.makedirs(os.path.dirname(dst), exist_ok=True)
-                shutil.copy2(src, dst)
-                progress = ((i + 1) / len(files)) * 100
-                self.install_core.emit_state(InstallState.BACKING_UP_TITLE_UPDATE, int(progress), f"{int(progress)}%")
+                store.collectGarbage()
+                logger.info(f"Title Update backed up to {manifest_path}")
+                return True
+
+            os.makedirs(full_backup_dir, exist_ok=True)
+            logger.info(f"Created backup directory: {full_backup_dir}")
+
+            # Cloned where the volume supports it, copied otherwise. Never hard-linked: the install keeps some of
+            # these files, and a later write to one of them would change the backup too
+            if not BackupStrategy(self.game_path, full_backup_dir, link=False).backupFiles(
+                files, self.game_path, full_backup_dir,
+                progress_callback=lambda done, total: self.install_core.emit_state(
+                    InstallState.BACKING_UP_TITLE_UPDATE, int(done / total * 100), f"{int(done / total * 100)}%", items_done=done, items_total=total),
+                cancel_check=lambda: self.install_core.is_canceled):
+                return False
 
             for root, dirs, _ in os.walk(self.game_path):
                 dirs[:] = [d for d in dirs if d.lower() not in [f.lower() for f in exclude_folders] and not d.lower().startswith('original_')]
@@ -912,7 +698,11 @@ class InstallOptions:
                 return
             simplified_path = f"Profiles/{os.path.basename(path)}"
             self.install_core.emit_state(InstallState.DELETING_STORED_TITLE_UPDATE, 0, simplified_path)
-            self._common_delete(path)
+            if ContentStore.isManifestFile(path):
+                ContentStore.forManifest(path).remove(os.path.basename(path)[:-len(ContentStore.EXTENSION)])
+            else:
+                self._common_delete(path)
+            IntegrityManager.deleteDigest(path)
             time.sleep(0.5)
         except Exception as e:
             ErrorHandler.handleError(f"Failed to delete stored Title Update {path}: {str(e)}")
@@ -928,6 +718,7 @@ class InstallOptions:
             simplified_path = f"Profiles/{os.path.basename(path)}"
             self.install_core.emit_state(InstallState.DELETING_SQUAD_FILES, 0, simplified_path)
             self._common_delete(path)
+            IntegrityManager.deleteDigest(path)
             time.sleep(0.5)
         except Exception as e:
             ErrorHandler.handleError(f"Failed to delete squad files {path}: {str(e)}")
@@ -952,10 +743,8 @@ class InstallOptions:
         """Delete file or directory."""
         try:
             if os.path.exists(path):
-                if os.path.isfile(path):
-                    os.remove(path)
-                else:
-                    shutil.rmtree(path)
+                # Out of the way at once, folders of squad files are emptied in the background
+                FastDelete.deleteInBackground(path)
                 logger.info(f"Resource deleted: {path}")
         except Exception as e:
             ErrorHandler.handleError(f"Failed to delete resource {path}: {str(e)}")
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import hashlib
+from typing import Optional, Dict, List, Tuple
+
+from Core.Logger import logger
+from Core.AppDataManager import AppDataManager
+from Core.DiskAllocator import DiskAllocator
+from Core.ArchiveReader import ArchiveReader
+from Core.ContentStore import ContentStore
+
+class GameSnapshot:
+    """Sizes of the files in a game folder, cached in the app data folder between installs.
+
+    A folder whose modified time is unchanged has the same entries as when it was last listed, so only
+    folders something was added to, removed from or renamed in are listed again; the rest cost one stat.
+    """
+    FOLDER = "Snapshots"
+
+    def __init__(self, game_path: str):
+        self.game_path = os.path.abspath(game_path)
+        self.path = os.path.join(AppDataManager.getDataFolder(), self.FOLDER,
+                                 f"{hashlib.sha1(os.path.normcase(self.game_path).encode('utf-8')).hexdigest()[:16]}.json")
+        self.folders: Dict[str, list] = {}  # Relative folder -> [mtime_ns, {file name: size}, [sub folders]]
+        try:
+            if os.path.isfile(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("GamePath") == self.game_path:
+                    self.folders = data.get("Folders", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable game snapshot {self.path}: {e}")
+
+    def getFiles(self) -> Dict[str, int]:
+        """Size of every file in the game folder by relative path."""
+        files, folders, listed = {}, {}, 0
+        pending = [""]
+        while pending:
+            rel_folder = pending.pop()
+            full_folder = os.path.join(self.game_path, rel_folder)
+            try:
+                mtime = os.stat(full_folder).st_mtime_ns
+            except OSError:
+                continue
+            cached = self.folders.get(rel_folder)
+            if not cached or cached[0] != mtime:
+                names, sub_folders = {}, []
+                with os.scandir(full_folder) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            sub_folders.append(entry.name)
+                        elif entry.is_file(follow_symlinks=False):
+                            names[entry.name] = entry.stat().st_size
+                cached = [mtime, names, sub_folders]
+                listed += 1
+            folders[rel_folder] = cached
+            files.update({f"{rel_folder}/{name}" if rel_folder else name: size for name, size in cached[1].items()})
+            pending.extend(f"{rel_folder}/{name}" if rel_folder else name for name in cached[2])
+        self.folders = folders
+        self._save()
+        logger.debug(f"Game snapshot: {len(files)} files in {len(folders)} folders, {listed} listed again")
+        return files
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"GamePath": self.game_path, "Folders": self.folders}, f)
+        except OSError as e:
+            logger.warning(f"Failed to save game snapshot {self.path}: {e}")
+
+class DiskThroughput:
+    """Install write speed per volume, measured by past installs, or by a short probe before the first one."""
+    FILE_NAME = "DiskThroughput.json"
+    PROBE_SIZE = 64 * 1024 * 1024
+    SMOOTHING = 0.5  # Weight of the newest install in the average
+
+    @staticmethod
+    def _load() -> Dict[str, float]:
+        try:
+            with open(os.path.join(AppDataManager.getDataFolder(), DiskThroughput.FILE_NAME), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def get(path: str) -> float:
+        """Bytes per second installs can write to the volume of path."""
+        volume = DiskAllocator.getVolume(path)
+        rate = DiskThroughput._load().get(volume)
+        if not rate:
+            rate = DiskThroughput._probe(path)
+            DiskThroughput._store(volume, rate)
+        return rate
+
+    @staticmethod
+    def record(path: str, size: int, seconds: float) -> None:
+        """Fold the speed of a finished install into the average of its volume."""
+        if size < DiskThroughput.PROBE_SIZE or seconds <= 0:
+            return
+        volume = DiskAllocator.getVolume(path)
+        old = DiskThroughput._load().get(volume)
+        rate = size / seconds
+        DiskThroughput._store(volume, old + DiskThroughput.SMOOTHING * (rate - old) if old else rate)
+
+    @staticmethod
+    def _store(volume: str, rate: float) -> None:
+        rates = DiskThroughput._load()
+        rates[volume] = rate
+        try:
+            with open(os.path.join(AppDataManager.getDataFolder(), DiskThroughput.FILE_NAME), "w", encoding="utf-8") as f:
+                json.dump(rates, f)
+        except OSError as e:
+            logger.warning(f"Failed to save disk throughput: {e}")
+
+    @staticmethod
+    def _probe(path: str) -> float:
+        """Time a flushed write next to path; it lands on the same volume as the install."""
+        probe_path = os.path.join(DiskAllocator._existing_path(os.path.dirname(os.path.abspath(path))), ".FCThroughputProbe")
+        chunk = os.urandom(1024 * 1024)
+        try:
+            started = time.monotonic()
+            with open(probe_path, "wb") as f:
+                for _ in range(DiskThroughput.PROBE_SIZE // len(chunk)):
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            rate = DiskThroughput.PROBE_SIZE / max(time.monotonic() - started, 1e-3)
+            logger.info(f"Measured write speed of {DiskAllocator.getVolume(path)}: {rate / 1024 ** 2:.0f} MB/s")
+            return rate
+        finally:
+            if os.path.exists(probe_path):
+                os.remove(probe_path)
+
+class InstallPlan:
+    """What an install will do to a game folder, worked out without writing anything."""
+    def __init__(self):
+        self.write: Dict[str, int] = {}  # Relative path -> size
+        self.delete: List[str] = []  # Relative paths of the files or folders moved aside
+        self.delete_files = 0
+        self.delete_bytes = 0
+        self.bytes_read = 0
+        self.write_rate: Optional[float] = None
+
+    @property
+    def bytes_write(self) -> int:
+        return sum(self.write.values())
+
+    @property
+    def required_space(self) -> int:
+        """New files are staged while the ones they replace are still in place."""
+        return self.bytes_write
+
+    @property
+    def seconds(self) -> Optional[float]:
+        return self.bytes_write / self.write_rate if self.write_rate else None
+
+    def getSummary(self) -> str:
+        seconds = self.seconds
+        eta = "unknown" if seconds is None else f"{int(seconds // 60)}m{int(seconds % 60)}s" if seconds >= 60 else f"{max(int(seconds), 1)}s"
+        return (f"Write {len(self.write)} files ({DiskAllocator.formatSize(self.bytes_write)}), "
+                f"remove {self.delete_files} files ({DiskAllocator.formatSize(self.delete_bytes)}), "
+                f"read {DiskAllocator.formatSize(self.bytes_read)}, "
+                f"needs {DiskAllocator.formatSize(self.required_space)} free, about {eta}")
+
+class InstallPlanner:
+    """Builds an InstallPlan from the source's index and a snapshot of the game folder."""
+
+    @staticmethod
+    def getSourceFiles(file_path: str, expected_exes: List[str], password: Optional[str] = None,
+                       unrar_tool: Optional[str] = None) -> Tuple[Dict[str, int], int]:
+        """Sizes of the files a Title Update source installs, relative to the folder holding its executable,
+        and how many bytes reading it takes."""
+        expected_exes = [exe.lower() for exe in expected_exes]
+        if ContentStore.isManifestFile(file_path):
+            entries = {entry["Path"]: entry["Size"] for entry in ContentStore.readManifest(file_path)}
+            return entries, sum(entries.values())
+        if os.path.isdir(file_path):
+            entries = {os.path.relpath(os.path.join(root, name), file_path).replace(os.sep, '/'): os.path.getsize(os.path.join(root, name))
+                       for root, _, names in os.walk(file_path) for name in names}
+            read = sum(entries.values())
+        else:
+            with ArchiveReader(file_path, password, unrar_tool) as archive:
+                entries = {member.name: member.size for member in archive.getMembers()}
+            read = os.path.getsize(file_path)
+        root_dir = next((os.path.dirname(name) for name in entries if os.path.basename(name).lower() in expected_exes), "")
+        if root_dir:
+            entries = {os.path.relpath(name, root_dir).replace(os.sep, '/'): size
+                       for name, size in entries.items() if name.startswith(root_dir + '/')}
+        return entries, read
+
+    @staticmethod
+    def plan(game_path: str, files: Dict[str, int], bytes_read: int, delete: List[str],
+             installed: Optional[Dict[str, int]] = None) -> InstallPlan:
+        """Plan writing files (relative path -> size) and moving aside delete, files or folders of the game folder."""
+        plan = InstallPlan()
+        plan.write = dict(files)
+        plan.bytes_read = bytes_read
+        plan.delete = list(delete)
+        installed = installed if installed is not None else GameSnapshot(game_path).getFiles()
+        prefixes = tuple(rel_path.lower() + '/' for rel_path in delete)
+        deleted = {rel_path.lower() for rel_path in delete}
+        for rel_path, size in installed.items():
+            if rel_path.lower() in deleted or rel_path.lower().startswith(prefixes):
+                plan.delete_files += 1
+                plan.delete_bytes += size
+        try:
+            plan.write_rate = DiskThroughput.get(game_path)
+        except OSError as e:
+            logger.warning(f"Could not measure the write speed of {DiskAllocator.getVolume(game_path)}: {e}")
+        logger.info(f"Install plan: {plan.getSummary()}")
+        return plan
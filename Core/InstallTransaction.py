@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import hashlib
+from typing import Optional, Dict, List, Callable
+
+from Core.Logger import logger
+from Core.AppDataManager import AppDataManager
+from Core.DeltaInstaller import DeltaInstaller
+from Core.FastDelete import FastDelete
+
+class InstallTransactionError(Exception):
+    """Raised when a game folder still has an interrupted install that has not been recovered."""
+
+class InstallTransaction:
+    """Installs a Title Update into a game folder all at once, or not at all.
+
+    New files are staged in a hidden folder next to the game folder, on the same volume, while the game
+    folder is left alone. Once everything is staged, the planned operations are journaled and swapped in
+    with renames: installed files that are replaced or removed go to the Previous folder first, then the
+    staged files take their place. A crash or failure during the swap is undone, or finished, from the
+    journal with as many renames as there are files, and the journal is picked up again on next startup.
+    """
+    FOLDER_SUFFIX = ".FCInstall"
+    JOURNAL_FOLDER = "InstallJournals"
+    VERSION = 1
+    SWAPPING, COMMITTED = "Swapping", "Committed"
+
+    def __init__(self, game_path: str, update_name: str = ""):
+        self.game_path = os.path.abspath(game_path)
+        self.update_name = update_name
+        self.root = os.path.join(os.path.dirname(self.game_path), f".{os.path.basename(self.game_path)}{self.FOLDER_SUFFIX}")
+        self.new_dir = os.path.join(self.root, "New")
+        self.previous_dir = os.path.join(self.root, "Previous")
+        self.journal_path = os.path.join(AppDataManager.getDataFolder(), self.JOURNAL_FOLDER,
+                                         f"{hashlib.sha1(os.path.normcase(self.game_path).encode('utf-8')).hexdigest()[:16]}.json")
+        self.removed: List[str] = []
+        self.operations: List[Dict] = []
+        self.committed = False
+        self.swapping = False  # The journal is the only way back while this is set
+
+    @staticmethod
+    def getInterrupted() -> List["InstallTransaction"]:
+        """Installs whose swap was cut short by a crash, from the journals left in the app data folder."""
+        folder = os.path.join(AppDataManager.getDataFolder(), InstallTransaction.JOURNAL_FOLDER)
+        interrupted = []
+        if not os.path.isdir(folder):
+            return interrupted
+        for file_name in os.listdir(folder):
+            try:
+                with open(os.path.join(folder, file_name), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                transaction = InstallTransaction(data["GamePath"], data.get("UpdateName", ""))
+                transaction.operations = data.get("Operations", [])
+                if data.get("Version") == InstallTransaction.VERSION and data.get("State") == InstallTransaction.SWAPPING:
+                    transaction.swapping = True
+                    interrupted.append(transaction)
+                else:
+                    # Nothing in the game folder was touched yet, or the swap finished
+                    transaction.discard()
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable install journal {file_name}: {e}")
+        return interrupted
+
+    def begin(self) -> str:
+        """Start staging; returns the folder new files go to, laid out as in the game folder."""
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                if json.load(f).get("State") == self.SWAPPING:
+                    raise InstallTransactionError(
+                        f"A previous install into {self.game_path} was interrupted and has to be finished or reverted first. Restart the tool to do so.")
+        self.discard()
+        os.makedirs(self.new_dir, exist_ok=True)
+        logger.info(f"Staging install of {self.update_name} in {self.root}")
+        return self.new_dir
+
+    def remove(self, rel_path: str) -> None:
+        """Plan the removal of a file or folder of the game folder, moved aside when the swap happens."""
+        self.removed.append(rel_path.replace(os.sep, '/'))
+
+    def _save_journal(self, state: str) -> None:
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+        temp_path = self.journal_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"Version": self.VERSION, "GamePath": self.game_path, "UpdateName": self.update_name, "State": state,
+                       "Operations": self.operations, "Updated": time.time()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.journal_path)
+
+    def _plan(self) -> None:
+        """One operation per path: Previous when the installed one is moved aside, New when a staged one replaces it."""
+        operations: Dict[str, Dict] = {}
+        for rel_path in self.removed:
+            if os.path.lexists(os.path.join(self.game_path, rel_path)):
+                operations[rel_path.lower()] = {"Path": rel_path, "Previous": True, "New": False}
+        removed_prefixes = tuple(path + '/' for path in operations)
+        for root, _, names in os.walk(self.new_dir):
+            for name in names:
+                rel_path = os.path.relpath(os.path.join(root, name), self.new_dir).replace(os.sep, '/')
+                operation = operations.setdefault(rel_path.lower(), {"Path": rel_path, "Previous": False, "New": True})
+                operation["New"] = True
+                # Files inside a removed folder move aside with it
+                if not operation["Previous"] and not rel_path.lower().startswith(removed_prefixes):
+                    operation["Previous"] = os.path.lexists(os.path.join(self.game_path, rel_path))
+        self.operations = list(operations.values())
+
+    def commit(self, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> None:
+        """Swap the staged files into the game folder; reverted before this returns if any rename fails."""
+        self._plan()
+        self._save_journal(self.SWAPPING)
+        self.swapping = True
+        try:
+            self._swap(progress_callback)
+        except Exception as e:
+            logger.error(f"Swapping in {self.update_name} failed, reverting: {e}")
+            self.revert()
+            raise
+        self._finish()
+
+    def _swap(self, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> None:
+        """Move installed files aside, then staged files in. Safe to run again over a partial swap."""
+        total = sum(operation["Previous"] + operation["New"] for operation in self.operations)
+        done = 0
+        for operation in self.operations:
+            if operation["Previous"]:
+                current, previous = self._paths(operation["Path"], self.game_path), self._paths(operation["Path"], self.previous_dir)
+                if not os.path.lexists(previous) and os.path.lexists(current):
+                    os.makedirs(os.path.dirname(previous), exist_ok=True)
+                    os.rename(current, previous)
+                done += 1
+                if progress_callback:
+                    progress_callback(done, total, operation["Path"])
+        for operation in self.operations:
+            if operation["New"]:
+                staged, current = self._paths(operation["Path"], self.new_dir), self._paths(operation["Path"], self.game_path)
+                if os.path.lexists(staged):
+                    os.makedirs(os.path.dirname(current), exist_ok=True)
+                    os.rename(staged, current)
+                done += 1
+                if progress_callback:
+                    progress_callback(done, total, operation["Path"])
+        # Folders the update ships empty
+        for root, dirs, _ in os.walk(self.new_dir):
+            for name in dirs:
+                os.makedirs(os.path.join(self.game_path, os.path.relpath(os.path.join(root, name), self.new_dir)), exist_ok=True)
+
+    @staticmethod
+    def _paths(rel_path: str, base: str) -> str:
+        return os.path.join(base, *rel_path.split('/'))
+
+    def _finish(self) -> None:
+        self._save_journal(self.COMMITTED)
+        self.committed, self.swapping = True, False
+        DeltaInstaller.removeEmptyFolders(self.game_path, [operation["Path"] for operation in self.operations if not operation["New"]])
+        logger.info(f"Swapped {len(self.operations)} paths of {self.update_name} into {self.game_path}")
+        self.discard()
+
+    def complete(self) -> None:
+        """Finish an interrupted swap."""
+        logger.info(f"Completing interrupted install of {self.update_name} into {self.game_path}")
+        self._swap()
+        self._finish()
+
+    def revert(self) -> None:
+        """Undo a swap, complete or partial, putting every moved-aside file back."""
+        logger.info(f"Reverting install of {self.update_name} in {self.game_path}")
+        for operation in reversed(self.operations):
+            if operation["New"]:
+                staged, current = self._paths(operation["Path"], self.new_dir), self._paths(operation["Path"], self.game_path)
+                # Swapped in when it is gone from staging; otherwise whatever is in the game folder is the old file
+                if not os.path.lexists(staged) and os.path.lexists(current):
+                    os.makedirs(os.path.dirname(staged), exist_ok=True)
+                    os.rename(current, staged)
+        added = [operation["Path"] for operation in self.operations if operation["New"]]
+        DeltaInstaller.removeEmptyFolders(self.game_path, added)
+        for operation in reversed(self.operations):
+            if operation["Previous"]:
+                previous, current = self._paths(operation["Path"], self.previous_dir), self._paths(operation["Path"], self.game_path)
+                if os.path.lexists(previous):
+                    if os.path.isdir(current) and not os.listdir(current):
+                        os.rmdir(current)
+                    os.makedirs(os.path.dirname(current), exist_ok=True)
+                    os.rename(previous, current)
+        self.swapping = False
+        self.discard()
+
+    def discard(self) -> None:
+        """Drop the staging folder, in the background, and the journal; the game folder is left as it is."""
+        if self.swapping:
+            logger.error(f"Kept {self.root} and its journal, the install of {self.update_name} has to be recovered")
+            return
+        # After a swap this holds every replaced game file, often tens of thousands of them
+        FastDelete.deleteInBackground(self.root, ignore_errors=True)
+        for path in (self.journal_path, self.journal_path + ".tmp"):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                logger.warning(f"Failed to remove install journal {path}: {e}")
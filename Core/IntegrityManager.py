@@ -0,0 +1,152 @@
+import os
+import json
+import shutil
+import hashlib
+import zlib
+from typing import Optional, Dict, Callable
+
+from Core.Logger import logger
+
+try:
+    import win32api  # type: ignore
+    import win32con  # type: ignore
+except ModuleNotFoundError:
+    win32api = win32con = None
+
+class StreamHasher:
+    """Feeds the same bytes through SHA1, SHA256 and CRC32 in one pass."""
+    def __init__(self):
+        self._sha1 = hashlib.sha1()
+        self._sha256 = hashlib.sha256()
+        self._crc32 = 0
+        self.size = 0
+
+    def update(self, data: bytes) -> None:
+        self._sha1.update(data)
+        self._sha256.update(data)
+        self._crc32 = zlib.crc32(data, self._crc32)
+        self.size += len(data)
+
+    def hexdigests(self) -> Dict[str, str]:
+        return {"SHA1": self._sha1.hexdigest(), "SHA256": self._sha256.hexdigest(), "CRC32": f"{self._crc32 & 0xFFFFFFFF:08x}"}
+
+class IntegrityManager:
+    """Digests of stored archives, persisted in a sidecar file next to each one."""
+    DIGEST_EXTENSION = ".digest"
+    CHUNK_SIZE = 1024 * 1024
+    ALGORITHMS = ("SHA1", "SHA256", "CRC32")
+
+    @staticmethod
+    def getDigestPath(file_path: str) -> str: return file_path + IntegrityManager.DIGEST_EXTENSION
+
+    @staticmethod
+    def isDigestFile(file_name: str) -> bool: return file_name.lower().endswith(IntegrityManager.DIGEST_EXTENSION)
+
+    @staticmethod
+    def saveDigest(file_path: str, digests: Dict[str, str]) -> None:
+        """Store digests together with the size and mtime they belong to."""
+        try:
+            stat = os.stat(file_path)
+            digest_path = IntegrityManager.getDigestPath(file_path)
+            if os.path.exists(digest_path):
+                os.remove(digest_path)
+            data = {"Size": stat.st_size, "MTime": stat.st_mtime_ns, **{k: digests[k] for k in IntegrityManager.ALGORITHMS if k in digests}}
+            with open(digest_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
+            if win32api:
+                win32api.SetFileAttributes(digest_path, win32con.FILE_ATTRIBUTE_HIDDEN)
+            logger.debug(f"Saved digest for {file_path}: {data}")
+        except Exception as e:
+            logger.warning(f"Failed to save digest for {file_path}: {e}")
+
+    @staticmethod
+    def _load_digest(file_path: str) -> Optional[Dict]:
+        digest_path = IntegrityManager.getDigestPath(file_path)
+        if not os.path.isfile(digest_path):
+            return None
+        try:
+            with open(digest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable digest file {digest_path}: {e}")
+            return None
+
+    @staticmethod
+    def getCachedDigest(file_path: str) -> Optional[Dict[str, str]]:
+        """Digests from the sidecar if the file is unchanged since they were taken, without reading the file."""
+        data = IntegrityManager._load_digest(file_path)
+        if not data or not os.path.isfile(file_path):
+            return None
+        stat = os.stat(file_path)
+        if data.get("Size") != stat.st_size or data.get("MTime") != stat.st_mtime_ns:
+            return None
+        return {k: data[k] for k in IntegrityManager.ALGORITHMS if k in data}
+
+    @staticmethod
+    def isDigestStale(file_path: str) -> bool:
+        """True when a sidecar exists but the file was modified after its digest was taken."""
+        return IntegrityManager._load_digest(file_path) is not None and IntegrityManager.getCachedDigest(file_path) is None
+
+    @staticmethod
+    def getStoredDigest(file_path: str) -> Optional[Dict[str, str]]:
+        """Digests from the sidecar regardless of whether the file changed since."""
+        data = IntegrityManager._load_digest(file_path)
+        return {k: data[k] for k in IntegrityManager.ALGORITHMS if k in data} if data else None
+
+    @staticmethod
+    def computeDigest(file_path: str, progress_callback: Optional[Callable[[int, int], None]] = None, save: bool = True) -> Dict[str, str]:
+        """Read the file once and hash it with every algorithm."""
+        hasher = StreamHasher()
+        total = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            while chunk := f.read(IntegrityManager.CHUNK_SIZE):
+                hasher.update(chunk)
+                if progress_callback:
+                    progress_callback(hasher.size, total)
+        digests = hasher.hexdigests()
+        if save:
+            IntegrityManager.saveDigest(file_path, digests)
+        return digests
+
+    @staticmethod
+    def getDigest(file_path: str) -> Dict[str, str]:
+        return IntegrityManager.getCachedDigest(file_path) or IntegrityManager.computeDigest(file_path)
+
+    @staticmethod
+    def findMismatch(digests: Dict[str, str], expected: Optional[Dict[str, str]]) -> Optional[str]:
+        """Name of the first algorithm whose digest differs from the expected one, if any."""
+        for algorithm, value in (expected or {}).items():
+            if value and algorithm in digests and digests[algorithm].lower() != str(value).strip().lower():
+                return algorithm
+        return None
+
+    @staticmethod
+    def moveDigest(src_file: str, dst_file: str) -> None:
+        src_digest = IntegrityManager.getDigestPath(src_file)
+        if os.path.exists(src_digest):
+            shutil.move(src_digest, IntegrityManager.getDigestPath(dst_file))
+
+    @staticmethod
+    def deleteDigest(file_path: str) -> None:
+        digest_path = IntegrityManager.getDigestPath(file_path)
+        try:
+            if os.path.exists(digest_path):
+                os.remove(digest_path)
+        except OSError as e:
+            logger.warning(f"Failed to delete digest file {digest_path}: {e}")
+
+    @staticmethod
+    def copyWithDigest(src: str, dst: str, progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, str]:
+        """Copy a file and hash the bytes on the way through, so the copy never has to be read again."""
+        hasher = StreamHasher()
+        total = os.path.getsize(src)
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            while chunk := fsrc.read(IntegrityManager.CHUNK_SIZE):
+                hasher.update(chunk)
+                fdst.write(chunk)
+                if progress_callback:
+                    progress_callback(hasher.size, total)
+        shutil.copystat(src, dst)
+        digests = hasher.hexdigests()
+        IntegrityManager.saveDigest(dst, digests)
+        return digests
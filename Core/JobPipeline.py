@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import uuid
+from typing import Optional, Dict, List
+
+from PySide6.QtCore import QObject, Signal
+
+from Core.Logger import logger
+from Core.AppDataManager import AppDataManager
+from Core.DownloadScheduler import DownloadScheduler, DownloadJob
+
+class PipelineJob:
+    """An update taken from its download link to installed: resolve, download, verify, install, clean up."""
+    STATE_DOWNLOADING = "Downloading"
+    STATE_WAITING = "Waiting to install"
+    STATE_INSTALLING = "Installing"
+    STATE_COMPLETED = "Completed"
+    STATE_FAILED = "Failed"
+    STATE_CANCELED = "Canceled"
+
+    def __init__(self, download: DownloadJob, game_path: str, install: bool):
+        self.job_id = uuid.uuid4().hex
+        self.download = download
+        self.game_path = game_path
+        self.install = install  # Squads extracted while downloading are installed either way
+        self.file_path = ""
+        self.state = self.STATE_DOWNLOADING
+        self.stage_times: Dict[str, float] = {}
+        self.created = time.monotonic()
+        self.waiting_since: Optional[float] = None
+
+    @property
+    def update_name(self) -> str: return self.download.update_name
+
+    @property
+    def tab_key(self) -> str: return self.download.tab_key
+
+    def getTimingText(self) -> str:
+        return ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in self.stage_times.items())
+
+    def toDict(self) -> Dict:
+        return {"UpdateName": self.update_name, "TabKey": self.tab_key, "GameID": self.download.game_id, "State": self.state,
+                "StageTimes": {stage: round(seconds, 3) for stage, seconds in self.stage_times.items()},
+                "Total": round(time.monotonic() - self.created, 3), "Finished": time.time()}
+
+class JobPipeline(QObject):
+    """Chains a download into its install, overlapping the stages of different updates.
+
+    Downloads keep running in the DownloadScheduler while an install is under way, so the next update
+    downloads as the current one installs. Installs, which replace files in the game folder, run one at
+    a time: a finished download waits for the running install, started from the pipeline or by hand, and
+    install_ready is emitted for the UI to open its install window. The time each stage took is kept per
+    job and the last HISTORY_SIZE jobs are written to PipelineHistory.json.
+    """
+    install_ready = Signal(object)
+    job_finished = Signal(object)
+
+    HISTORY_SIZE = 50
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(JobPipeline, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        super().__init__()
+        self.HISTORY_FILE = os.path.join(AppDataManager.getDataFolder(), "PipelineHistory.json")
+        self.scheduler = DownloadScheduler()
+        self.jobs: List[PipelineJob] = []
+        self.installs: Dict[int, list] = {}  # id(install thread) -> [its job, None when started by hand, result state]
+        self.starting: Optional[PipelineJob] = None  # Handed to the UI, its install thread is not registered yet
+        self.scheduler.job_finished.connect(self._on_download_finished)
+        self._initialized = True
+
+    def submit(self, download: DownloadJob, game_path: str, install: bool) -> PipelineJob:
+        """Follow a queued download; once done it is installed into game_path if install is set or it was staged."""
+        job = next((job for job in self.jobs if job.download is download), None)
+        if job is None:
+            job = PipelineJob(download, game_path, install)
+            self.jobs.append(job)
+            logger.info(f"Pipeline job added: {job.update_name} ({job.tab_key}), install after download: {install}")
+        return job
+
+    def _on_download_finished(self, download: DownloadJob) -> None:
+        job = next((job for job in self.jobs if job.download is download and job.state == PipelineJob.STATE_DOWNLOADING), None)
+        if job is None:
+            return
+        job.stage_times.update(download.stage_times)
+        if download.result != DownloadScheduler.RESULT_COMPLETED:
+            self._finish(job, PipelineJob.STATE_CANCELED if download.result in (DownloadScheduler.RESULT_CANCELED, DownloadScheduler.RESULT_SUSPENDED)
+                         else PipelineJob.STATE_FAILED)
+            return
+        if not (job.install or download.staged_install):
+            self._finish(job, PipelineJob.STATE_COMPLETED)
+            return
+        if not download.final_path or not os.path.exists(download.final_path):
+            logger.warning(f"Pipeline job {job.update_name}: downloaded file not found, not installing")
+            self._finish(job, PipelineJob.STATE_FAILED)
+            return
+        job.file_path = download.final_path
+        job.state = PipelineJob.STATE_WAITING
+        job.waiting_since = time.monotonic()
+        self._start_next_install()
+
+    def _start_next_install(self) -> None:
+        if self.installs or self.starting:
+            return
+        job = next((job for job in self.jobs if job.state == PipelineJob.STATE_WAITING), None)
+        if job is None:
+            return
+        job.stage_times["Waiting"] = time.monotonic() - job.waiting_since
+        job.state = PipelineJob.STATE_INSTALLING
+        self.starting = job
+        logger.info(f"Pipeline job {job.update_name} ready to install")
+        self.install_ready.emit(job)
+
+    def registerInstall(self, thread, job: Optional[PipelineJob] = None) -> None:
+        """Track an install thread, so pipeline installs wait for it; job is None for an install started by hand."""
+        if job is not None and job is self.starting:
+            self.starting = None
+        self.installs[id(thread)] = [job, PipelineJob.STATE_CANCELED]
+        # Bound slots, so they run on this object's thread rather than the install thread
+        thread.completed_signal.connect(self._on_install_completed)
+        thread.error_signal.connect(self._on_install_error)
+        thread.finished.connect(self._on_install_finished)
+
+    def releaseInstall(self, job: PipelineJob) -> None:
+        """Give up the install slot handed out with install_ready when no install thread could be started."""
+        if job is self.starting:
+            self.starting = None
+            self._finish(job, PipelineJob.STATE_FAILED)
+            self._start_next_install()
+
+    def _on_install_completed(self) -> None:
+        if install := self.installs.get(id(self.sender())):
+            install[1] = PipelineJob.STATE_COMPLETED
+
+    def _on_install_error(self, _error: str) -> None:
+        if install := self.installs.get(id(self.sender())):
+            install[1] = PipelineJob.STATE_FAILED
+
+    def _on_install_finished(self) -> None:
+        thread = self.sender()
+        job, state = self.installs.pop(id(thread), (None, None))
+        if job is not None:
+            job.stage_times.update(thread.stage_times)
+            self._finish(job, state)
+        self._start_next_install()
+
+    def _finish(self, job: PipelineJob, state: str) -> None:
+        job.state = state
+        if job in self.jobs:
+            self.jobs.remove(job)
+        logger.info(f"Pipeline job {job.update_name} {state.lower()} in {time.monotonic() - job.created:.1f}s: {job.getTimingText()}")
+        self._save_history(job)
+        self.job_finished.emit(job)
+
+    def _save_history(self, job: PipelineJob) -> None:
+        try:
+            history = []
+            if os.path.exists(self.HISTORY_FILE):
+                with open(self.HISTORY_FILE, "r", encoding="utf-8") as f:
+                    history = json.load(f)
+            history = (history + [job.toDict()])[-self.HISTORY_SIZE:]
+            temp_file = self.HISTORY_FILE + ".tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(history, f, indent=4)
+            os.replace(temp_file, self.HISTORY_FILE)
+        except Exception as e:
+            logger.error(f"Failed to save pipeline history: {e}")
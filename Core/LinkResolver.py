@@ -0,0 +1,140 @@
+import time
+import base64
+import threading
+from typing import Optional, Dict, Tuple
+
+import certifi
+import cloudscraper
+from lxml import html
+
+from Core.Logger import logger
+
+class LinkResolverError(Exception):
+    """Raised when a hosting page does not yield a direct download link."""
+
+class LinkResolver:
+    """Turns MediaFire file pages into direct download links.
+
+    One scraper session is shared by every lookup and resolved links are cached per page URL
+    for CACHE_TTL seconds, so a link pre-resolved when a row is selected is ready when Download is pressed.
+    """
+    CACHE_TTL = 20 * 60  # MediaFire direct links stay valid for a while but not forever
+    MAX_ATTEMPTS = 2
+    RETRY_WAIT = 1
+    REQUEST_TIMEOUT = (10, 30)
+    USER_AGENT = "Mozilla/5.0"
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(LinkResolver, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.session = None
+        self.verify = certifi.where()
+        self.cache: Dict[str, Tuple[str, float]] = {}
+        self.pending: Dict[str, threading.Event] = {}
+        self.lock = threading.Lock()
+        self._initialized = True
+
+    def setSession(self, session, verify=True) -> None:
+        """Use another requests-compatible session, e.g. a plain one against a local fixture server."""
+        with self.lock:
+            self.session = session
+            self.verify = verify
+            self.cache.clear()
+
+    def _get_session(self):
+        with self.lock:
+            if self.session is None:
+                self.session = cloudscraper.create_scraper()
+            return self.session
+
+    @staticmethod
+    def needsResolving(url: str) -> bool: return "mediafire" in (url or "").lower()
+
+    @staticmethod
+    def parseDirectURL(page: str) -> Optional[str]:
+        """Direct link of a MediaFire file page, from the scrambled attribute or the plain href."""
+        tree = html.fromstring(page)
+        scrambled_link = tree.xpath('//a[@id="downloadButton"]/@data-scrambled-url')
+        if scrambled_link and scrambled_link[0]:
+            decoded_url = base64.b64decode(scrambled_link[0]).decode('utf-8')
+            if decoded_url and not decoded_url.startswith('#') and not decoded_url.endswith('#'):
+                return decoded_url
+        direct_link = tree.xpath('//a[@id="downloadButton"]/@href')
+        if direct_link and direct_link[0] and direct_link[0].startswith(("https://", "http://")):
+            return direct_link[0]
+        return None
+
+    def getCached(self, url: str) -> Optional[str]:
+        with self.lock:
+            entry = self.cache.get(url)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            self.cache.pop(url, None)
+            return None
+
+    def invalidate(self, url: str) -> None:
+        with self.lock:
+            if self.cache.pop(url, None):
+                logger.debug(f"Dropped cached direct link for {url}")
+
+    def resolve(self, url: str) -> str:
+        """Direct link for url, from the cache or by fetching the page. Waits for a lookup already in flight."""
+        if not self.needsResolving(url):
+            return url
+        while True:
+            if cached := self.getCached(url):
+                return cached
+            with self.lock:
+                event = self.pending.get(url)
+                if event is None:
+                    event = self.pending[url] = threading.Event()
+                    break
+            # Another thread is fetching this page; use its result, or take over if it failed
+            event.wait()
+        try:
+            direct_url = self._fetch(url)
+            with self.lock:
+                self.cache[url] = (direct_url, time.monotonic() + self.CACHE_TTL)
+            return direct_url
+        finally:
+            with self.lock:
+                self.pending.pop(url, None)
+            event.set()
+
+    def prefetch(self, url: str) -> None:
+        """Resolve url on a background thread so a later resolve() returns at once."""
+        if not self.needsResolving(url) or self.getCached(url):
+            return
+        with self.lock:
+            if url in self.pending:
+                return
+        threading.Thread(target=self._prefetch, args=(url,), daemon=True).start()
+
+    def _prefetch(self, url: str) -> None:
+        try:
+            self.resolve(url)
+            logger.debug(f"Pre-resolved direct link for {url}")
+        except Exception as e:
+            logger.warning(f"Pre-resolving {url} failed: {e}")
+
+    def _fetch(self, url: str) -> str:
+        session = self._get_session()
+        for attempt in range(self.MAX_ATTEMPTS):
+            try:
+                response = session.get(url, headers={"User-Agent": self.USER_AGENT}, verify=self.verify, timeout=self.REQUEST_TIMEOUT)
+                if response.status_code == 200 and (direct_url := self.parseDirectURL(response.text)):
+                    return direct_url
+                logger.warning(f"No direct link on {url} (HTTP {response.status_code}, attempt {attempt + 1})")
+            except Exception as e:
+                logger.warning(f"Fetching {url} failed (attempt {attempt + 1}): {e}")
+            if attempt + 1 < self.MAX_ATTEMPTS:
+                time.sleep(self.RETRY_WAIT)
+        raise LinkResolverError("Failed to retrieve direct download URL from MediaFire.")
@@ -0,0 +1,213 @@
+import time
+import threading
+from typing import Optional, Dict, List, Set, Tuple, Iterable, Callable
+
+import psutil
+
+from Core.Logger import logger
+
+class ProcessInfo:
+    """A running process the monitor watches. The executable path is only looked up when asked for.
+
+    A process is its ID and its creation time together, since Windows hands the ID of a process that exited
+    to the next one started; a process with the same ID but another creation time is not this one.
+    """
+    def __init__(self, pid: int, name: str, create_time: Optional[float]):
+        self.pid = pid
+        self.name = name
+        self.create_time = create_time
+        self._exe: Optional[str] = None
+
+    def _get_process(self) -> psutil.Process:
+        """The psutil process, raising NoSuchProcess if this one exited and its ID went to another."""
+        process = psutil.Process(self.pid)
+        if self.create_time is not None and process.create_time() != self.create_time:
+            raise psutil.NoSuchProcess(self.pid, self.name)
+        return process
+
+    @property
+    def exe(self) -> str:
+        if self._exe is None:
+            try:
+                self._exe = self._get_process().exe()
+            except psutil.Error:
+                self._exe = ""
+        return self._exe
+
+    def terminate(self, timeout: float = 5) -> bool:
+        """Ask the process to exit and wait until it has; False if it is still running or cannot be closed."""
+        try:
+            process = self._get_process()
+            process.terminate()
+            process.wait(timeout=timeout)
+            logger.info(f"Terminated process: {self.name} (PID: {self.pid})")
+            return True
+        except psutil.NoSuchProcess:
+            return True
+        except (psutil.AccessDenied, psutil.TimeoutExpired) as e:
+            logger.warning(f"Failed to terminate process {self.name} (PID: {self.pid}): {str(e)}")
+            return False
+
+    def __repr__(self) -> str:
+        return f"ProcessInfo({self.name}, {self.pid})"
+
+class ProcessMonitor:
+    """Keeps an index of the running processes the tool cares about, by executable name.
+
+    Every refresh lists the process IDs, which is one cheap system call, and only looks up the name of the
+    IDs it has not seen before. Processes it saw before are known by their ID and creation time: an ID whose
+    creation time changed was reused by Windows and counts as the old process exiting and a new one
+    starting. Lookups by name are a dictionary lookup. While anything is subscribed, a background thread refreshes the index every
+    POLL_INTERVAL seconds and reports processes starting and exiting; callbacks run on that thread.
+    """
+    STARTED, EXITED = "Started", "Exited"
+    POLL_INTERVAL = 1.0
+    MIN_REFRESH = 0.25  # Lookups closer together than this share one refresh
+    EA_PROCESSES = ["EADesktop.exe", "EACefSubProcess.exe", "EALocalHostSvc.exe"]
+    MOD_TOOL_PROCESSES = ["FIFA Mod Manager.exe", "FIFA Editor Tool.exe", "FMT.exe", "Launcher.exe"]
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ProcessMonitor, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._lock = threading.RLock()
+        self._names: Dict[int, Tuple[str, Optional[float]]] = {}  # Every process ID seen -> lowercase name, creation time
+        self._index: Dict[str, Dict[int, ProcessInfo]] = {}  # Watched lowercase name -> process ID -> info
+        self._watched: Set[str] = {name.lower() for name in self.EA_PROCESSES + self.MOD_TOOL_PROCESSES}
+        self._subscribers: List[Tuple[Callable[[str, ProcessInfo], None], Optional[Set[str]]]] = []
+        self._refreshed: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._initialized = True
+
+    def watch(self, names: Iterable[str]) -> None:
+        """Add executable names to the index, including processes with those names that already run."""
+        with self._lock:
+            new = {name.lower() for name in names} - self._watched
+            if not new:
+                return
+            self._watched |= new
+            for pid, (name, create_time) in self._names.items():
+                if name in new:
+                    self._index.setdefault(name, {})[pid] = ProcessInfo(pid, name, create_time)
+
+    def refresh(self, force: bool = False) -> None:
+        """Bring the index up to date with the processes started and exited since the last refresh."""
+        events: List[Tuple[str, ProcessInfo]] = []
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._refreshed is not None and now - self._refreshed < self.MIN_REFRESH:
+                return
+            # The first refresh finds what already runs, that is no news to subscribers
+            first = self._refreshed is None
+            self._refreshed = now
+            pids = set(psutil.pids())
+            gone = self._names.keys() - pids
+            for pid in self._names.keys() & pids:
+                if self._get_create_time(pid) != self._names[pid][1]:
+                    gone.add(pid)
+            for pid in gone:
+                name, _ = self._names.pop(pid)
+                info = self._index.get(name, {}).pop(pid, None)
+                if info:
+                    events.append((self.EXITED, info))
+            for pid in pids - self._names.keys():
+                try:
+                    process = psutil.Process(pid)
+                except psutil.NoSuchProcess:
+                    continue
+                create_time = self._get_create_time(pid, process)
+                try:
+                    name = process.name().lower()
+                except psutil.NoSuchProcess:
+                    continue
+                except psutil.AccessDenied:
+                    name = ""
+                self._names[pid] = (name, create_time)
+                if name in self._watched:
+                    info = ProcessInfo(pid, name, create_time)
+                    self._index.setdefault(name, {})[pid] = info
+                    events.append((self.STARTED, info))
+            subscribers = list(self._subscribers)
+        if first:
+            return
+        for event, info in events:
+            logger.debug(f"Process {event.lower()}: {info.name} (PID: {info.pid})")
+            for callback, names in subscribers:
+                if names is None or info.name in names:
+                    try:
+                        callback(event, info)
+                    except Exception as e:
+                        logger.error(f"Process monitor callback failed: {e}")
+
+    @staticmethod
+    def _get_create_time(pid: int, process: Optional[psutil.Process] = None) -> Optional[float]:
+        try:
+            return (process or psutil.Process(pid)).create_time()
+        except psutil.NoSuchProcess:
+            return 0.0  # Never matches a real creation time, so the ID counts as gone
+        except psutil.AccessDenied:
+            return None
+
+    def find(self, name: str) -> List[ProcessInfo]:
+        """Running processes with the given executable name."""
+        self.watch([name])
+        self.refresh()
+        with self._lock:
+            return list(self._index.get(name.lower(), {}).values())
+
+    def isRunning(self, name: str) -> bool:
+        return bool(self.find(name))
+
+    def subscribe(self, callback: Callable[[str, ProcessInfo], None], names: Optional[Iterable[str]] = None) -> None:
+        """Call callback(event, info) when a process with one of names starts or exits, any watched one if names is None."""
+        names = {name.lower() for name in names} if names is not None else None
+        if names:
+            self.watch(names)
+        self.refresh()
+        with self._lock:
+            self._subscribers.append((callback, names))
+            if not self._thread or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self, callback: Callable[[str, ProcessInfo], None]) -> None:
+        with self._lock:
+            self._subscribers = [(cb, names) for cb, names in self._subscribers if cb != callback]
+
+    def waitUntilGone(self, names: Iterable[str], timeout: float) -> bool:
+        """Block until no process with one of names runs, woken by their exit events; False on timeout."""
+        names = [name.lower() for name in names]
+        gone = threading.Event()
+
+        def is_gone() -> bool:
+            with self._lock:
+                return not any(self._index.get(name) for name in names)
+
+        def on_event(event: str, info: ProcessInfo):
+            if event == self.EXITED and is_gone():
+                gone.set()
+
+        self.subscribe(on_event, names)
+        try:
+            return is_gone() or gone.wait(timeout)
+        finally:
+            self.unsubscribe(on_event)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.POLL_INTERVAL)
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                self.refresh(force=True)
+            except Exception as e:
+                logger.error(f"Process monitor refresh failed: {e}")
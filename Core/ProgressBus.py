@@ -0,0 +1,140 @@
+import time
+import threading
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+from PySide6.QtCore import QObject, QTimer
+
+class ProgressFrame:
+    """Coalesced view of a channel's counters, as delivered to the UI."""
+    def __init__(self, state: Any, details: str, bytes_done: int, bytes_total: int, items_done: int, items_total: int,
+                 percentage: float, rate: float, item_rate: float, eta: Optional[float], extra: Dict[str, Any]):
+        self.state = state
+        self.details = details
+        self.bytes_done = bytes_done
+        self.bytes_total = bytes_total
+        self.items_done = items_done
+        self.items_total = items_total
+        self.percentage = percentage
+        self.rate = rate  # Bytes per second, smoothed
+        self.item_rate = item_rate  # Items per second, smoothed
+        self.eta = eta  # Seconds, None when unknown
+        self.extra = extra
+
+    def getETAText(self) -> str:
+        if self.eta is None:
+            return "N/A"
+        hours, remainder = divmod(int(self.eta), 3600)
+        minutes, seconds = divmod(remainder, 60)
+        return f"{hours}h{minutes}m{seconds}s" if hours else f"{minutes}m{seconds}s" if minutes else f"{seconds}s"
+
+class ProgressChannel:
+    """Raw progress counters of one worker. publish() is cheap and safe to call from any thread for every item."""
+    SMOOTHING = 0.3  # Weight of the newest sample in the rate average
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Any] = {}
+        self._dirty = False
+        self._reset_rates()
+
+    def _reset_rates(self) -> None:
+        self._sample_time = None
+        self._sample_bytes = self._sample_items = 0
+        self._rate = self._item_rate = 0.0
+
+    def publish(self, state: Any = None, details: Optional[str] = None, bytes_done: Optional[int] = None,
+                bytes_total: Optional[int] = None, items_done: Optional[int] = None, items_total: Optional[int] = None,
+                percentage: Optional[float] = None, rate: Optional[float] = None, **extra) -> None:
+        """Update any subset of the counters; the latest values win until the next frame."""
+        with self._lock:
+            if state is not None and state != self._values.get("state"):
+                # A new phase starts its own counters and rate history
+                self._values = {"state": state}
+                self._reset_rates()
+            for key, value in (("details", details), ("bytes_done", bytes_done), ("bytes_total", bytes_total),
+                               ("items_done", items_done), ("items_total", items_total),
+                               ("percentage", percentage), ("rate", rate)):
+                if value is not None:
+                    self._values[key] = value
+            if extra:
+                self._values.setdefault("extra", {}).update(extra)
+            self._dirty = True
+
+    def takeFrame(self, now: Optional[float] = None) -> Optional[ProgressFrame]:
+        """Build a frame if anything changed since the last one."""
+        with self._lock:
+            if not self._dirty:
+                return None
+            self._dirty = False
+            values = dict(self._values)
+            now = now if now is not None else time.monotonic()
+            bytes_done, items_done = values.get("bytes_done", 0), values.get("items_done", 0)
+            if self._sample_time is not None and (elapsed := now - self._sample_time) > 0:
+                self._rate += self.SMOOTHING * ((bytes_done - self._sample_bytes) / elapsed - self._rate)
+                self._item_rate += self.SMOOTHING * ((items_done - self._sample_items) / elapsed - self._item_rate)
+            self._sample_time, self._sample_bytes, self._sample_items = now, bytes_done, items_done
+            rate, item_rate = values.get("rate", max(self._rate, 0.0)), max(self._item_rate, 0.0)
+
+        bytes_total, items_total = values.get("bytes_total", 0), values.get("items_total", 0)
+        percentage = values.get("percentage")
+        if percentage is None:
+            percentage = bytes_done / bytes_total * 100 if bytes_total else items_done / items_total * 100 if items_total else 0.0
+        if bytes_total and rate > 0:
+            eta = max(bytes_total - bytes_done, 0) / rate
+        elif items_total and item_rate > 0:
+            eta = max(items_total - items_done, 0) / item_rate
+        else:
+            eta = None
+        return ProgressFrame(values.get("state"), values.get("details", ""), bytes_done, bytes_total, items_done, items_total,
+                             percentage, rate, item_rate, eta, values.get("extra", {}))
+
+class ProgressBus(QObject):
+    """Delivers worker progress to the UI at a fixed frame rate, however often the workers publish.
+
+    Subscriptions are made from the GUI thread; callbacks run there, at most FRAME_RATE times per second per channel.
+    """
+    FRAME_RATE = 20
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ProgressBus, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        super().__init__()
+        self.subscriptions: List[Tuple[ProgressChannel, Callable[[ProgressFrame], None]]] = []
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000 // self.FRAME_RATE)
+        self.timer.timeout.connect(self._deliver_frames)
+        self._initialized = True
+
+    def subscribe(self, channel: ProgressChannel, callback: Callable[[ProgressFrame], None]) -> None:
+        self.subscriptions.append((channel, callback))
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def unsubscribe(self, channel: ProgressChannel, callback: Optional[Callable[[ProgressFrame], None]] = None) -> None:
+        self.subscriptions = [(c, cb) for c, cb in self.subscriptions if not (c is channel and (callback is None or cb == callback))]
+        if not self.subscriptions:
+            self.timer.stop()
+
+    def flush(self, channel: ProgressChannel) -> None:
+        """Deliver the channel's pending frame now, e.g. right before a completion handler runs."""
+        self._deliver_frames(channel)
+
+    def _deliver_frames(self, only: Optional[ProgressChannel] = None) -> None:
+        now = time.monotonic()
+        frames: Dict[int, Optional[ProgressFrame]] = {}
+        for channel, callback in list(self.subscriptions):
+            if only is not None and channel is not only:
+                continue
+            # One frame per channel per tick, shared by all of its subscribers
+            if id(channel) not in frames:
+                frames[id(channel)] = channel.takeFrame(now)
+            if (frame := frames[id(channel)]) is not None:
+                callback(frame)
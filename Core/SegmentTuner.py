@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import threading
+from typing import Optional, Dict, Any
+from urllib.parse import urlparse
+
+from Core.Logger import logger
+
+class SegmentTuner:
+    """Picks the number of connections for a download by measuring throughput in its first seconds.
+
+    Starting from the count remembered for the host (or the configured one), it doubles the
+    connections while total throughput keeps improving, tries half as many if doubling never
+    helped, then settles on the best count and remembers it for the next download from that host.
+    """
+    MAX_CONNECTIONS = 16
+    WARMUP = 3.0  # Seconds ignored after each change while new connections ramp up
+    WINDOW = 3.0  # Seconds measured per candidate
+    TUNING_TIME = 45.0  # Settle on the best count seen after this long
+    GAIN = 0.08  # Relative throughput change that counts as better or worse
+
+    _store_lock = threading.Lock()
+
+    def __init__(self, host: str, initial: int, maximum: int = MAX_CONNECTIONS, store_path: Optional[str] = None, download_logger=None):
+        self.host = host
+        self.store_path = store_path
+        self.log = download_logger or logger
+        self.maximum = max(min(int(maximum), self.MAX_CONNECTIONS), 1)
+        remembered = self.getRemembered(host, store_path)
+        self.connections = max(min(remembered or int(initial), self.maximum), 1)
+        self.settled = self.maximum == 1
+        self.best_connections = self.connections
+        self.best_rate = 0.0
+        self.grew = False
+        self.shrinking = False
+        self._start_time = None
+        self._window_start = None
+        self._measure_start = None
+        self._measure_bytes = 0
+        self.log.info(
+            f"Autotune: starting {host} with {self.connections} connection(s) "
+            f"({'remembered from earlier downloads' if remembered else 'configured value'}, at most {self.maximum})"
+        )
+
+    # region Host memory
+    @staticmethod
+    def getHostKey(url: str) -> str:
+        """Servers of one host share a key, e.g. download1234.mediafire.com -> mediafire.com."""
+        host = (urlparse(url).hostname or "").lower()
+        parts = host.split(".")
+        return host if len(parts) <= 2 or host.replace(".", "").isdigit() else ".".join(parts[-2:])
+
+    @staticmethod
+    def _load_store(store_path: Optional[str]) -> Dict[str, Any]:
+        if not store_path or not os.path.isfile(store_path):
+            return {}
+        try:
+            with open(store_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable segment tuning file {store_path}: {e}")
+            return {}
+
+    @staticmethod
+    def getRemembered(host: str, store_path: Optional[str]) -> Optional[int]:
+        entry = SegmentTuner._load_store(store_path).get(host)
+        try:
+            return int(entry["Connections"]) if entry else None
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _remember(self) -> None:
+        if not self.store_path:
+            return
+        with SegmentTuner._store_lock:
+            store = self._load_store(self.store_path)
+            store[self.host] = {"Connections": self.best_connections, "Rate": int(self.best_rate), "Updated": int(time.time())}
+            try:
+                os.makedirs(os.path.dirname(self.store_path) or ".", exist_ok=True)
+                temp_path = self.store_path + ".tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(store, f, indent=4)
+                os.replace(temp_path, self.store_path)
+            except OSError as e:
+                logger.warning(f"Failed to save segment tuning for {self.host}: {e}")
+    # endregion
+
+    # region Tuning
+    def setMaximum(self, maximum: int) -> None:
+        """Change the most connections to try, e.g. when another download on the host takes or returns a share."""
+        self.maximum = max(min(int(maximum), self.MAX_CONNECTIONS), 1)
+        if self.settled and not self.best_rate and self.maximum > 1:
+            # Started with a single connection to spare, nothing was measured yet: tune now there is room
+            self.settled = False
+        if self.settled:
+            self.connections = min(self.best_connections, self.maximum)
+        else:
+            self.connections = min(self.connections, self.maximum)
+            self.best_connections = min(self.best_connections, self.maximum)
+
+    def observe(self, now: float, downloaded: int) -> int:
+        """Feed the running byte count; returns the number of connections to use from now on."""
+        if self.settled:
+            return self.connections
+        if self._start_time is None:
+            self._start_time = now
+            self._begin_window(now, downloaded)
+            return self.connections
+        if now - self._window_start < self.WARMUP:
+            self._measure_start, self._measure_bytes = now, downloaded
+            return self.connections
+        if now - self._measure_start < self.WINDOW:
+            return self.connections
+
+        rate = (downloaded - self._measure_bytes) / (now - self._measure_start)
+        self.log.info(f"Autotune: {self.connections} connection(s) -> {rate / 1024 ** 2:.2f} MB/s "
+                      f"({rate / self.connections / 1024 ** 2:.2f} MB/s per connection)")
+        self._decide(rate)
+        if not self.settled and now - self._start_time >= self.TUNING_TIME:
+            self._settle("tuning time is up")
+        self._begin_window(now, downloaded)
+        return self.connections
+
+    def _decide(self, rate: float) -> None:
+        if not self.best_rate:
+            self.best_rate = rate
+            self._next_candidate()
+            return
+        if not self.shrinking and rate > self.best_rate * (1 + self.GAIN):
+            self.best_connections, self.best_rate, self.grew = self.connections, rate, True
+            self._next_candidate()
+        elif self.shrinking and rate >= self.best_rate * (1 - self.GAIN):
+            # Fewer connections are as fast: prefer them, they are kinder to the server
+            self.best_connections, self.best_rate = self.connections, rate
+            self._next_candidate()
+        elif not self.shrinking and not self.grew and self.best_connections > 1:
+            self.log.info(f"Autotune: {self.connections} connection(s) were not faster than {self.best_connections}, trying fewer")
+            self.shrinking = True
+            self.connections = max(self.best_connections // 2, 1)
+        else:
+            self._settle(f"{self.connections} connection(s) changed throughput to {rate / 1024 ** 2:.2f} MB/s "
+                         f"against {self.best_rate / 1024 ** 2:.2f} MB/s")
+
+    def _next_candidate(self) -> None:
+        if not self.shrinking:
+            candidate = min(self.best_connections * 2, self.maximum)
+            if candidate != self.best_connections:
+                self.connections = candidate
+                return
+            if self.grew:
+                self._settle("reached the connection limit")
+                return
+            # Started at the limit: see whether fewer connections do as well
+            self.shrinking = True
+        candidate = max(self.best_connections // 2, 1)
+        if candidate == self.best_connections:
+            self._settle("no further counts to try")
+        else:
+            self.connections = candidate
+
+    def _settle(self, reason: str) -> None:
+        self.settled = True
+        self.connections = self.best_connections
+        self.log.info(f"Autotune: settled on {self.connections} connection(s) for {self.host} "
+                      f"at {self.best_rate / 1024 ** 2:.2f} MB/s ({reason})")
+        if self.best_rate:
+            self._remember()
+
+    def _begin_window(self, now: float, downloaded: int) -> None:
+        self._window_start = self._measure_start = now
+        self._measure_bytes = downloaded
+
+    def finish(self) -> None:
+        """Log why nothing was remembered when the download ended before tuning did."""
+        if not self.settled:
+            self.log.info(f"Autotune: download ended before tuning finished, keeping the previous choice for {self.host}")
+    # endregion
@@ -0,0 +1,131 @@
+import os
+import json
+import gzip
+import shutil
+import hashlib
+from datetime import datetime
+from typing import Optional, Dict, List, Callable
+
+from Core.Logger import logger
+
+class SettingsBackup:
+    """Incremental backups of a game settings folder.
+
+    Each backup is a small "settings<date>_<time>.fcsettings" snapshot listing every file of the folder by
+    relative path, size, modified time and SHA1. File contents are kept once each under .SettingsObjects,
+    gzip-compressed at the fastest level, so a backup only reads the files whose size or modified time
+    changed since the last snapshot and only compresses the ones whose content is new. A backup of an
+    unchanged folder writes nothing, and every snapshot can still be restored on its own.
+    """
+    EXTENSION = ".fcsettings"
+    FOLDER = ".SettingsObjects"
+    VERSION = 1
+    CHUNK_SIZE = 1024 * 1024
+    COMPRESS_LEVEL = 1
+
+    def __init__(self, backup_dir: str):
+        self.backup_dir = backup_dir
+        self.objects = os.path.join(backup_dir, self.FOLDER)
+
+    @staticmethod
+    def isSnapshotFile(file_name: str) -> bool:
+        return file_name.lower().endswith(SettingsBackup.EXTENSION)
+
+    def getBlobPath(self, sha1: str) -> str:
+        return os.path.join(self.objects, sha1[:2], sha1 + ".gz")
+
+    def getSnapshots(self) -> List[str]:
+        """Snapshot paths, oldest first."""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        return sorted(os.path.join(self.backup_dir, file_name) for file_name in os.listdir(self.backup_dir) if self.isSnapshotFile(file_name))
+
+    @staticmethod
+    def readSnapshot(snapshot_path: str) -> List[Dict]:
+        """Files of a snapshot: dicts with Path, Size, MTime (ns) and SHA1."""
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("Version") != SettingsBackup.VERSION:
+            raise ValueError(f"Unsupported settings snapshot version in {snapshot_path}")
+        return data["Files"]
+
+    def _get_latest(self) -> Optional[str]:
+        snapshots = self.getSnapshots()
+        return snapshots[-1] if snapshots else None
+
+    def _hash_file(self, path: str) -> str:
+        sha1 = hashlib.sha1()
+        with open(path, "rb") as f:
+            while chunk := f.read(self.CHUNK_SIZE):
+                sha1.update(chunk)
+        return sha1.hexdigest()
+
+    def _store_blob(self, path: str, sha1: str) -> None:
+        blob_path = self.getBlobPath(sha1)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        temp_path = blob_path + ".tmp"
+        with open(path, "rb") as src, gzip.open(temp_path, "wb", compresslevel=self.COMPRESS_LEVEL) as dst:
+            shutil.copyfileobj(src, dst, self.CHUNK_SIZE)
+        os.replace(temp_path, blob_path)
+
+    def createSnapshot(self, settings_path: str, progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                       cancel_check: Optional[Callable[[], bool]] = None) -> Optional[str]:
+        """Back up settings_path; returns the new snapshot path, the latest one if nothing changed, or None if canceled."""
+        latest = self._get_latest()
+        previous: Dict[str, Dict] = {}
+        if latest:
+            try:
+                previous = {entry["Path"]: entry for entry in self.readSnapshot(latest)}
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable settings snapshot {latest}: {e}")
+                latest = None
+
+        paths = [os.path.join(root, file_name) for root, _, names in os.walk(settings_path) for file_name in names]
+        entries, hashed, stored = [], 0, 0
+        for i, path in enumerate(paths):
+            if cancel_check and cancel_check():
+                return None
+            rel_path = os.path.relpath(path, settings_path).replace(os.sep, '/')
+            stat = os.stat(path)
+            entry = previous.get(rel_path)
+            if not entry or entry["Size"] != stat.st_size or entry["MTime"] != stat.st_mtime_ns or not os.path.exists(self.getBlobPath(entry["SHA1"])):
+                entry = {"Path": rel_path, "Size": stat.st_size, "MTime": stat.st_mtime_ns, "SHA1": self._hash_file(path)}
+                hashed += 1
+                if not os.path.exists(self.getBlobPath(entry["SHA1"])):
+                    self._store_blob(path, entry["SHA1"])
+                    stored += 1
+            entries.append(entry)
+            if progress_callback:
+                progress_callback(i + 1, len(paths), rel_path)
+
+        if latest and sorted(entries, key=lambda entry: entry["Path"]) == sorted(previous.values(), key=lambda entry: entry["Path"]):
+            logger.info(f"Game settings unchanged since {os.path.basename(latest)}, no backup written")
+            return latest
+        snapshot_path = os.path.join(self.backup_dir, f"settings{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}{self.EXTENSION}")
+        temp_path = snapshot_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"Version": self.VERSION, "SettingsPath": settings_path, "Files": entries}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, snapshot_path)
+        logger.info(f"Settings snapshot {os.path.basename(snapshot_path)}: {len(entries)} files, "
+                    f"{hashed} read, {stored} stored")
+        return snapshot_path
+
+    def restore(self, snapshot_path: str, settings_path: str, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> None:
+        """Put the files of a snapshot back into settings_path. Files the snapshot does not list are left alone."""
+        entries = self.readSnapshot(snapshot_path)
+        for i, entry in enumerate(entries):
+            blob_path = self.getBlobPath(entry["SHA1"])
+            if not os.path.isfile(blob_path):
+                raise FileNotFoundError(f"Settings backup is missing {entry['Path']} ({entry['SHA1']}) of {os.path.basename(snapshot_path)}")
+            target = os.path.join(settings_path, *entry["Path"].split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            temp_path = target + ".tmp"
+            with gzip.open(blob_path, "rb") as src, open(temp_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, self.CHUNK_SIZE)
+            os.replace(temp_path, target)
+            os.utime(target, ns=(entry["MTime"], entry["MTime"]))
+            if progress_callback:
+                progress_callback(i + 1, len(entries), entry["Path"])
+        logger.info(f"Restored {len(entries)} settings files from {os.path.basename(snapshot_path)} to {settings_path}")
@@ -0,0 +1,239 @@
+import os
+import json
+import shutil
+import struct
+import zlib
+from typing import Optional, Dict, List, Callable
+
+from Core.Logger import logger
+
+class StreamInstallError(Exception):
+    """Raised when downloaded bytes cannot be extracted on the fly; the regular install is used instead."""
+
+class SquadStreamExtractor:
+    """Extracts a squad download from its bytes in file order, while the rest is still downloading.
+
+    Files are written to a staging folder next to the game settings folder, so moving them into place
+    once the download is verified is a rename. Zip archives are extracted member by member from their
+    local headers, files without an archive extension are staged as they are, like InstallCore copies them.
+    """
+    ZIP_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+    ZIP_LOCAL_SIGNATURE = b"PK\x03\x04"
+    ZIP_END_SIGNATURES = (b"PK\x01\x02", b"PK\x05\x06", b"PK\x06\x06")
+    ZIP_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+    FLAG_ENCRYPTED, FLAG_DESCRIPTOR, FLAG_UTF8 = 0x1, 0x8, 0x800
+    METHOD_STORED, METHOD_DEFLATED = 0, 8
+
+    def __init__(self, staging_folder: str, file_name: str):
+        self.staging_folder = staging_folder
+        self.file_name = file_name
+        self.ext = os.path.splitext(file_name)[1].lower()
+        if self.ext in (".rar", ".7z"):
+            # 7z and rar keep their directory at the end and are usually solid, they cannot be unpacked from the front
+            raise StreamInstallError(f"{self.ext} archives cannot be extracted while downloading")
+        StreamInstaller.removeFolder(staging_folder)
+        os.makedirs(staging_folder, exist_ok=True)
+        self.fed = 0
+        self.files: List[str] = []
+        self.complete = False
+        self._buffer = bytearray()
+        self._out = None
+        self._member = None
+        self._inflater = None
+        self._crc = 0
+        self._remaining = 0
+        if self.ext != ".zip":
+            self._out = open(os.path.join(staging_folder, file_name), "wb")
+            self.files.append(file_name)
+
+    def feed(self, data: bytes) -> None:
+        self.fed += len(data)
+        if self.ext != ".zip":
+            self._out.write(data)
+            return
+        if self.complete:
+            return
+        self._buffer += data
+        while self._step():
+            pass
+
+    def finish(self, total_size: int, file_name: Optional[str] = None) -> List[str]:
+        """Close the staged files once every byte was fed; returns their paths relative to the staging folder."""
+        self._close_output()
+        if self.fed != total_size:
+            raise StreamInstallError(f"Only {self.fed} of {total_size} bytes were extracted")
+        if self.ext != ".zip":
+            if file_name and file_name != self.file_name:
+                # The download was stored under another name, e.g. "name (1)"; install it under that one
+                os.replace(os.path.join(self.staging_folder, self.file_name), os.path.join(self.staging_folder, file_name))
+                self.files = [file_name]
+            self.complete = True
+        if not self.complete:
+            raise StreamInstallError("The archive ended before its central directory")
+        return list(self.files)
+
+    def abort(self) -> None:
+        self._close_output()
+        StreamInstaller.removeFolder(self.staging_folder)
+
+    # region Zip
+    def _step(self) -> bool:
+        """Consume what the buffer allows; False when more bytes are needed."""
+        if self._member is None:
+            return self._read_header()
+        if self._inflater is not None:
+            return self._inflate()
+        if self._remaining:
+            chunk = bytes(self._buffer[:self._remaining])
+            if not chunk:
+                return False
+            del self._buffer[:len(chunk)]
+            self._write(chunk)
+            self._remaining -= len(chunk)
+            if self._remaining:
+                return False
+        return self._end_member()
+
+    def _read_header(self) -> bool:
+        if len(self._buffer) < 4:
+            return False
+        signature = bytes(self._buffer[:4])
+        if signature in self.ZIP_END_SIGNATURES:
+            self.complete = True
+            self._buffer.clear()
+            return False
+        if signature != self.ZIP_LOCAL_SIGNATURE:
+            raise StreamInstallError("Unexpected data between zip members")
+        if len(self._buffer) < self.ZIP_LOCAL_HEADER.size:
+            return False
+        _, _, flags, method, _, _, crc, compressed_size, size, name_length, extra_length = self.ZIP_LOCAL_HEADER.unpack_from(self._buffer)
+        header_size = self.ZIP_LOCAL_HEADER.size + name_length + extra_length
+        if len(self._buffer) < header_size:
+            return False
+        raw_name = bytes(self._buffer[self.ZIP_LOCAL_HEADER.size:self.ZIP_LOCAL_HEADER.size + name_length])
+        name = raw_name.decode("utf-8" if flags & self.FLAG_UTF8 else "cp437")
+        del self._buffer[:header_size]
+
+        if flags & self.FLAG_ENCRYPTED:
+            raise StreamInstallError(f"{name} is encrypted")
+        if method not in (self.METHOD_STORED, self.METHOD_DEFLATED):
+            raise StreamInstallError(f"{name} uses unsupported compression method {method}")
+        if 0xFFFFFFFF in (compressed_size, size):
+            raise StreamInstallError(f"{name} is a zip64 member")
+        if method == self.METHOD_STORED and flags & self.FLAG_DESCRIPTOR:
+            raise StreamInstallError(f"{name} is stored without its size in the header")
+
+        self._member = {"name": name, "flags": flags, "crc": crc, "size": size}
+        self._crc = 0
+        self._inflater = zlib.decompressobj(-15) if method == self.METHOD_DEFLATED else None
+        self._remaining = compressed_size if method == self.METHOD_STORED else 0
+        if not name.endswith("/"):
+            path = self._member_path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._out = open(path, "wb")
+        return True
+
+    def _inflate(self) -> bool:
+        if not self._buffer:
+            return False
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        self._write(self._inflater.decompress(data))
+        if not self._inflater.eof:
+            return False
+        self._buffer[:0] = self._inflater.unused_data
+        self._inflater = None
+        return True
+
+    def _end_member(self) -> bool:
+        member = self._member
+        if member["flags"] & self.FLAG_DESCRIPTOR:
+            if len(self._buffer) < 16:
+                return False
+            offset = 4 if bytes(self._buffer[:4]) == self.ZIP_DESCRIPTOR_SIGNATURE else 0
+            member["crc"], _, member["size"] = struct.unpack_from("<III", self._buffer, offset)
+            del self._buffer[:offset + 12]
+        written = self._out.tell() if self._out else 0
+        self._close_output()
+        if (self._crc & 0xFFFFFFFF) != member["crc"] or written != member["size"]:
+            raise StreamInstallError(f"{member['name']} failed its CRC check")
+        if not member["name"].endswith("/"):
+            self.files.append(os.path.relpath(self._member_path(member["name"]), self.staging_folder))
+            logger.debug(f"Extracted while downloading: {member['name']}")
+        self._member = None
+        return True
+
+    def _member_path(self, name: str) -> str:
+        relative = os.path.normpath(name.replace("\\", "/").lstrip("/"))
+        if relative in (".", "..") or relative.startswith(".." + os.sep) or os.path.isabs(relative):
+            raise StreamInstallError(f"{name} points outside the settings folder")
+        return os.path.join(self.staging_folder, relative)
+
+    def _write(self, data: bytes) -> None:
+        if data:
+            self._crc = zlib.crc32(data, self._crc)
+            if self._out:
+                self._out.write(data)
+
+    def _close_output(self) -> None:
+        if self._out:
+            self._out.close()
+            self._out = None
+    # endregion
+
+class StreamInstaller:
+    """Staging folders of squad updates extracted while downloading, and moving them into the settings folder."""
+    STAGING_FOLDER = ".FCRollbackTool Staging"
+    MANIFEST_EXTENSION = ".json"
+
+    @staticmethod
+    def getStagingFolder(settings_path: str, update_name: str) -> str:
+        """Next to the settings folder, so it is on the same drive and is left out of settings backups."""
+        return os.path.join(os.path.dirname(os.path.normpath(settings_path)), StreamInstaller.STAGING_FOLDER, update_name)
+
+    @staticmethod
+    def removeFolder(staging_folder: str) -> None:
+        try:
+            if os.path.isdir(staging_folder):
+                shutil.rmtree(staging_folder)
+            if os.path.isfile(manifest := staging_folder + StreamInstaller.MANIFEST_EXTENSION):
+                os.remove(manifest)
+        except OSError as e:
+            logger.warning(f"Failed to remove staging folder {staging_folder}: {e}")
+
+    @staticmethod
+    def saveManifest(staging_folder: str, source_file: str, digests: Dict[str, str], files: List[str]) -> None:
+        """Tie the staged files to the downloaded file they came from."""
+        with open(staging_folder + StreamInstaller.MANIFEST_EXTENSION, "w", encoding="utf-8") as f:
+            json.dump({"Source": os.path.basename(source_file), "SHA1": digests.get("SHA1"), "Files": files}, f, indent=4)
+
+    @staticmethod
+    def getStagedFiles(staging_folder: str, file_path: str, digests: Optional[Dict[str, str]]) -> Optional[List[str]]:
+        """Files staged from file_path, or None if nothing was staged or it came from other bytes."""
+        manifest_path = staging_folder + StreamInstaller.MANIFEST_EXTENSION
+        if not os.path.isfile(manifest_path):
+            return None
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable staging manifest {manifest_path}: {e}")
+            return None
+        if (manifest.get("Source") != os.path.basename(file_path) or not digests
+                or not manifest.get("SHA1") or digests.get("SHA1") != manifest["SHA1"]):
+            return None
+        files = manifest.get("Files") or []
+        if not files or not all(os.path.isfile(os.path.join(staging_folder, name)) for name in files):
+            return None
+        return files
+
+    @staticmethod
+    def commit(staging_folder: str, files: List[str], dst_path: str, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> None:
+        """Move staged files into dst_path, replacing what is there, then drop the staging folder."""
+        for i, name in enumerate(files):
+            dst_file = os.path.join(dst_path, name)
+            os.makedirs(os.path.dirname(dst_file), exist_ok=True)
+            os.replace(os.path.join(staging_folder, name), dst_file)
+            if progress_callback:
+                progress_callback(i + 1, len(files), name)
+        StreamInstaller.removeFolder(staging_folder)
@@ -12,6 +12,7 @@ from Core.MainDataManager import MainDataManager
 from Core.ConfigManager import ConfigManager
 from Core.GameManager import GameManager
 from Core.ErrorHandler import ErrorHandler
+from Core.ContentStore import ContentStore
 
 class BaseTable(QFrame):
     table_updated_signal = Signal()
@@ -266,7 +267,7 @@ class BaseTable(QFrame):
         update_name = update_data.get(self._get_name_key())
         if update_name and self.specific_monitor_dir:
             found_path = None
-            for ext in self.main_data_manager.getCompressedFileExtensions() + [""]:
+            for ext in self.main_data_manager.getCompressedFileExtensions() + [ContentStore.EXTENSION, ""]:
                 potential_path = os.path.join(self.specific_monitor_dir, update_name + ext)
                 if os.path.exists(potential_path):
                     found_path = potential_path
@@ -408,7 +409,7 @@ class BaseTable(QFrame):
         if not update_name:
             return False
         update_name_lower = update_name.strip().lower()
-        compressed_extensions = self.main_data_manager.getCompressedFileExtensions()
+        compressed_extensions = self.main_data_manager.getCompressedFileExtensions() + [ContentStore.EXTENSION]
         for file_or_dir in normalized_files:
             if any(file_or_dir.endswith(ext) for ext in compressed_extensions):
                 base_name = os.path.splitext(file_or_dir)[0].strip().lower()
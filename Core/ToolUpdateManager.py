@@ -1,5 +1,5 @@
-import requests
 from Core.Logger import logger
+from Core.HttpClient import HttpClient
 
 GITHUB_ACC = "zmshmods"
 GITHUB_ACC_TOOL = "FCRollbackTool"
@@ -28,7 +28,7 @@ class ToolUpdateManager:
     def get_changelog_for_version(self, version: str) -> list:
         try:
             if version not in self._changelog_cache:
-                response = requests.get(f"{self.CHANGELOG_BASE_URL}{version}.txt", timeout=10)
+                response = HttpClient().get(f"{self.CHANGELOG_BASE_URL}{version}.txt", timeout=10)
                 response.raise_for_status()
                 self._changelog_cache[version] = response.text.splitlines()
             return self._changelog_cache[version]
@@ -38,7 +38,7 @@ class ToolUpdateManager:
 # --
     def FetchManifests(self) -> None:
         try:
-            response = requests.get(self.UPDATE_MANIFEST, timeout=10)
+            response = HttpClient().get(self.UPDATE_MANIFEST, timeout=10)
             response.raise_for_status()
             self._manifest_cache = response.json()
             logger.debug("Fetched toolupdate manifest data")
@@ -58,7 +58,7 @@ class ToolUpdateManager:
     def getToolChangelog(self) -> list:
         try:
             if self.TOOL_VERSION not in self._changelog_cache:
-                response = requests.get(f"{self.CHANGELOG_BASE_URL}{self.TOOL_VERSION}.txt", timeout=10)
+                response = HttpClient().get(f"{self.CHANGELOG_BASE_URL}{self.TOOL_VERSION}.txt", timeout=10)
                 response.raise_for_status()
                 self._changelog_cache[self.TOOL_VERSION] = response.text.splitlines()
             return self._changelog_cache[self.TOOL_VERSION]
@@ -74,7 +74,7 @@ class ToolUpdateManager:
         try:
             version = self.getManifestToolVersion()
             if version not in self._changelog_cache:
-                response = requests.get(f"{self.CHANGELOG_BASE_URL}{version}.txt", timeout=10)
+                response = HttpClient().get(f"{self.CHANGELOG_BASE_URL}{version}.txt", timeout=10)
                 response.raise_for_status()
                 self._changelog_cache[version] = response.text.splitlines()
             return self._changelog_cache[version]
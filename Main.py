@@ -37,9 +37,15 @@ from Core.MainDataManager import MainDataManager
 from Core.ConfigManager import ConfigManager
 from Core.GameManager import GameManager
 from Core.AppDataManager import AppDataManager
+from Core.FastDelete import FastDelete
 from Core.NotificationManager import NotificationHandler
 from Core.ErrorHandler import ErrorHandler
 from Core.GameLauncher import launch_game_threaded
+from Core.DownloadScheduler import DownloadScheduler
+from Core.JobPipeline import JobPipeline
+from Core.LinkResolver import LinkResolver
+from Core.ContentStore import ContentStore
+from Core.InstallTransaction import InstallTransaction
 
 # Constants
 APP_NAME = "FC Rollback Tool"
@@ -66,6 +72,7 @@ class MainWindow(BaseWindow):
         self.main_container = None
         self.button_manager = None
         self.menu_bar = None
+        self._pipeline_connected = False
         self.resize(*WINDOW_SIZE)
         self.center_window()
         self.config_manager.register_config_updated_callback(self._on_config_updated)
@@ -79,6 +86,9 @@ class MainWindow(BaseWindow):
             self.config_manager.setConfigKeyLastUsedTab(
                 self.game_manager.getTabKeys()[self.main_container.tab_container.currentIndex()]
             )
+            if self._pipeline_connected:
+                JobPipeline().install_ready.disconnect(self.button_manager.install_pipeline_job)
+                self._pipeline_connected = False
             if self.button_manager:
                 for window_list in [
                     self.button_manager.tables_windows,
@@ -160,6 +170,10 @@ class MainWindow(BaseWindow):
                     )
 
             self._load_content_for_selected_game()
+            JobPipeline().install_ready.connect(self.button_manager.install_pipeline_job)
+            self._pipeline_connected = True
+            QTimer.singleShot(0, self.button_manager.recover_interrupted_installs)
+            QTimer.singleShot(0, self.button_manager.restore_download_queue)
         except Exception as e:
             ErrorHandler.handleError(f"Failed to set up UI: {str(e)}")
             self.close()
@@ -445,6 +459,8 @@ class ButtonManager:
             if status_text == status_mapping.get("AvailableForDownload", {}).get("text", ""):
                 self.buttons["download"].setEnabled(True)
                 self.buttons["download_options"].setEnabled(True)
+                if is_tu:
+                    self._prefetch_download_url(table_component, current.row())
 
             elif status_text == status_mapping.get("Installed", {}).get("text", ""):
                 self.buttons["download"].setEnabled(True)
@@ -484,6 +500,15 @@ class ButtonManager:
         except Exception as e:
             ErrorHandler.handleError(f"Failed to update buttons: {str(e)}")
 
+    def _prefetch_download_url(self, table_component, row: int):
+        """Resolve the row's direct download link in the background so Download can start at once."""
+        try:
+            updates = self.game_manager.getUpdatesList(table_component.game_content).get(self.game_manager.getContentKeyTitleUpdate(), [])
+            if 0 <= row < len(updates):
+                LinkResolver().prefetch(updates[row].get(self.game_manager.getDownloadURLKeyForTab(self.game_manager.getTabKeyTitleUpdates())))
+        except Exception as e:
+            logger.warning(f"Failed to pre-resolve download URL: {str(e)}")
+
     def update_button_visibility(self, tab_key: str):
         try:
             visibility = {
@@ -518,7 +543,8 @@ class ButtonManager:
             row = table.table.currentRow()
             if row < 0:
                 raise ValueError("No row selected")
-            index_url = updates[content_key][row].get(self.game_manager.getDownloadURLKeyForTab(tab_key))
+            update_entry = updates[content_key][row]
+            index_url = update_entry.get(self.game_manager.getDownloadURLKeyForTab(tab_key))
             if not index_url:
                 raise ValueError("No Index URL available")
             update_name = updates[content_key][row].get(self.game_manager.getSquadsNameKey())
@@ -694,7 +720,8 @@ class ButtonManager:
             if row < 0:
                 raise ValueError("No row selected")
 
-            index_url = updates[content_key][row].get(self.game_manager.getDownloadURLKeyForTab(tab_key))
+            update_entry = updates[content_key][row]
+            index_url = update_entry.get(self.game_manager.getDownloadURLKeyForTab(tab_key))
             if not index_url:
                 raise ValueError("No download URL")
             
@@ -712,14 +739,67 @@ class ButtonManager:
                     return
                 self.config_manager.setConfigKeyDownloadDisclaimer(False)
 
-            download_window = DownloadWindow(update_name, index_url, game_id, tab_key)
-            self.download_windows.append(download_window)
-            download_window.show()
-            MainWindow.center_child_window(self.main_window, download_window)
+            self._open_download_window(
+                update_name, index_url, game_id, tab_key,
+                self.game_manager.getExpectedArchiveDigests(update_entry),
+                self.game_manager.parseSizeToBytes(update_entry.get({
+                    self.game_manager.getTabKeyTitleUpdates(): self.game_manager.getTitleUpdateSizeKey(),
+                    self.game_manager.getTabKeySquadsUpdates(): self.game_manager.getSquadsSizeKey(),
+                    self.game_manager.getTabKeyFutSquadsUpdates(): self.game_manager.getFutSquadsSizeKey()
+                }[tab_key]))
+            )
 
         except Exception as e:
             ErrorHandler.handleError(f"Failed to start download: {str(e)}")
 
+    def _open_download_window(self, update_name: str, url: str, game_id: str, tab_key: str, expected_digests: Dict, size_bytes: int):
+        download_window = DownloadWindow(update_name, url, game_id, tab_key, expected_digests=expected_digests, size_bytes=size_bytes)
+        self.download_windows.append(download_window)
+        download_window.show()
+        MainWindow.center_child_window(self.main_window, download_window)
+
+    def recover_interrupted_installs(self):
+        """Finish or revert Title Update installs whose swap into the game folder was cut short."""
+        for transaction in InstallTransaction.getInterrupted():
+            try:
+                response = NotificationHandler.showConfirmation(
+                    f"Installing {transaction.update_name or 'a Title Update'} into:\n\"{transaction.game_path}\"\n"
+                    "was interrupted while its files were being swapped in.\n\n"
+                    "Yes: Finish the install.\nNo: Revert to the files installed before.\nCancel: Ask again next time."
+                )
+                if response == "Yes":
+                    transaction.complete()
+                elif response == "No":
+                    transaction.revert()
+                else:
+                    continue
+                selected_game = self.config_manager.getConfigKeySelectedGame()
+                if selected_game and os.path.normcase(os.path.abspath(selected_game)) == os.path.normcase(transaction.game_path):
+                    self.game_manager.validateAndUpdateGameExeSHA1(selected_game, self.config_manager)
+            except Exception as e:
+                ErrorHandler.handleError(f"Failed to recover the interrupted install into {transaction.game_path}: {str(e)}")
+
+    def restore_download_queue(self):
+        """Offer to resume downloads left in the queue by the previous session."""
+        try:
+            scheduler = DownloadScheduler()
+            jobs = scheduler.getPendingRestoredJobs()
+            if not jobs:
+                return
+            names = "".join(f"- {job.update_name}\n" for job in scheduler.getQueueOrder() if job in jobs)
+            response = NotificationHandler.showConfirmation(
+                f"{len(jobs)} download(s) were still in the queue when the tool was closed:\n{names}\n"
+                "Yes: Resume them now.\nNo: Remove them from the queue.\nCancel: Ask again next time."
+            )
+            if response == "No":
+                scheduler.clear()
+            elif response == "Yes":
+                for job in scheduler.getQueueOrder():
+                    if job in jobs:
+                        self._open_download_window(job.update_name, job.url, job.game_id, job.tab_key, job.expected_digests, job.size_bytes)
+        except Exception as e:
+            ErrorHandler.handleError(f"Failed to restore download queue: {str(e)}")
+
     def start_install(self):
         try:
             tab_key = self.game_manager.getTabKeys()[self.main_container.tab_container.currentIndex()]
@@ -744,21 +824,41 @@ class ButtonManager:
             profile_folder = self.game_manager.getProfileDirectory(self.game_manager.getSelectedGameId(game_path), profile_subfolder)
             file_path = os.path.join(profile_folder, update_name)
 
-            for ext in MainDataManager().getCompressedFileExtensions() + [""]:
+            for ext in MainDataManager().getCompressedFileExtensions() + [ContentStore.EXTENSION, ""]:
                 if os.path.exists(test_path := os.path.join(profile_folder, update_name + ext)):
                     file_path = test_path
                     break
             else:
                 raise ValueError(f"Update file not found: {file_path}")
 
-            install_window = InstallWindow(update_name, tab_key, game_path, file_path, table_component=table)
-            install_window.setWindowModality(Qt.ApplicationModal)
-            self.install_windows.append(install_window)
-            install_window.show()
-            MainWindow.center_child_window(self.main_window, install_window)
+            self._open_install_window(update_name, tab_key, game_path, file_path, table)
         except Exception as e:
             ErrorHandler.handleError(f"Failed to start installation of {update_name}: {str(e)}")
 
+    def _open_install_window(self, update_name: str, tab_key: str, game_path: str, file_path: str, table, pipeline_job=None):
+        install_window = InstallWindow(update_name, tab_key, game_path, file_path, table_component=table, pipeline_job=pipeline_job)
+        install_window.setWindowModality(Qt.ApplicationModal)
+        self.install_windows.append(install_window)
+        install_window.show()
+        MainWindow.center_child_window(self.main_window, install_window)
+
+    def install_pipeline_job(self, job):
+        """Install an update the job pipeline downloaded, once no other install is running."""
+        try:
+            if not job.game_path or not os.path.exists(job.game_path) or not os.path.exists(job.file_path):
+                logger.info(f"Skipping automatic installation of {job.update_name}: game or downloaded file is no longer available")
+                JobPipeline().releaseInstall(job)
+                return
+            if self.game_manager.getSelectedGameId(job.game_path) != job.download.game_id:
+                logger.warning(f"Skipping automatic installation of {job.update_name}: it is for {job.download.game_id}, not the game at {job.game_path}")
+                JobPipeline().releaseInstall(job)
+                return
+            table = self.main_container.get_table_component(job.tab_key) if job.game_path == self.config_manager.getConfigKeySelectedGame() else None
+            self._open_install_window(job.update_name, job.tab_key, job.game_path, job.file_path, table, pipeline_job=job)
+        except Exception as e:
+            JobPipeline().releaseInstall(job)
+            ErrorHandler.handleError(f"Failed to start installation of {job.update_name}: {str(e)}")
+
     def uninstall_installed_file(self):
         try:
             tab_key = self.game_manager.getTabKeys()[self.main_container.tab_container.currentIndex()]
@@ -830,7 +930,7 @@ class ButtonManager:
         try:
             menu = QMenu()
             menu.setStyleSheet("QMenu { font-size: 12px; }")
-            chk = CheckBox("Auto-use installed IDM for handling downloads instead of aria2")
+            chk = CheckBox("Auto-use installed IDM for handling downloads instead of the download engine")
             chk.setTristate(False)
             chk.setChecked(self.config_manager.getConfigKeyAutoUseIDM())
             chk.setStyleSheet("CheckBox { font-size: 12px; color: white; }")
@@ -860,6 +960,16 @@ class ButtonManager:
             act = QWidgetAction(menu)
             act.setDefaultWidget(chk)
             menu.addAction(act)
+
+            install_chk = CheckBox("Install updates automatically once their download completes")
+            install_chk.setTristate(False)
+            install_chk.setChecked(self.config_manager.getConfigKeyInstallAfterDownload())
+            install_chk.setStyleSheet("CheckBox { font-size: 12px; color: white; }")
+            install_chk.toggled.connect(self.config_manager.setConfigKeyInstallAfterDownload)
+            apply_tooltip(install_chk, "installAfterDownload")
+            install_act = QWidgetAction(menu)
+            install_act.setDefaultWidget(install_chk)
+            menu.addAction(install_act)
             menu.exec(self.buttons["download_options"].mapToGlobal(QPoint(0, self.buttons["download_options"].height())))
         except Exception as e:
             ErrorHandler.handleError(f"Failed to show download options: {str(e)}")
@@ -916,6 +1026,9 @@ def main():
     setThemeColor(THEME_COLOR)
 
     app_data_manager = AppDataManager()
+    # Temp folders deleted in the background while the tool was closing
+    for folder in (AppDataManager.getTempFolder(), os.path.dirname(AppDataManager.getTempFolder())):
+        FastDelete.purgeTrash(folder)
 
     update_window = ToolUpdaterWindow()
     update_window.setWindowModality(Qt.ApplicationModal)
@@ -927,7 +1040,7 @@ def main():
     main_window = SelectGameWindow()
     main_window.show()
     
-    app.aboutToQuit.connect(lambda: app_data_manager.manageTempFolder(clean=True, clean_all=True))
+    app.aboutToQuit.connect(lambda: app_data_manager.manageTempFolder(clean=True, clean_all=True, keep_resumable=True))
     sys.exit(app.exec())
 
 if __name__ == "__main__":
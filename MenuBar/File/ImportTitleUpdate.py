@@ -1,8 +1,5 @@
 import os
 import shutil
-import zipfile
-import py7zr
-import rarfile
 import pickle
 import zlib
 from enum import Enum
@@ -14,6 +11,11 @@ from Core.MainDataManager import MainDataManager
 from Core.GameManager import GameManager
 from Core.AppDataManager import AppDataManager
 from Core.ErrorHandler import ErrorHandler
+from Core.IntegrityManager import IntegrityManager
+from Core.ConfigManager import ConfigManager
+from Core.ArchiveReader import ArchiveReader, ArchiveError
+from Core.ContentStore import ContentStore
+from Core.ProgressBus import ProgressChannel
 
 class ImportState(Enum):
     SEARCHING_EXECUTABLE = "Searching for executable file..."
@@ -22,7 +24,6 @@ class ImportState(Enum):
     COMPLETED = "Completed successfully!"
 
 class ImportTitleUpdate(QThread):
-    state_changed = Signal(ImportState, int, str, bool)
     completed_signal = Signal()
     error_signal = Signal(str)
     cancel_signal = Signal()
@@ -38,6 +39,7 @@ class ImportTitleUpdate(QThread):
         self.exe_path_in_source = None
         self.is_canceled = False
         self.is_cleaned = False
+        self.progress_channel = ProgressChannel()
         os.makedirs(self.temp_path, exist_ok=True)
 
     def get_file_size(self):
@@ -52,7 +54,7 @@ class ImportTitleUpdate(QThread):
     def emit_state(self, state: ImportState, progress: int, details: str = "", is_success: bool = False):
         if not self.is_canceled:
             try:
-                self.state_changed.emit(state, progress, details, is_success)
+                self.progress_channel.publish(state, details, percentage=progress, is_success=is_success)
             except Exception as e:
                 ErrorHandler.handleError(f"Failed to emit state: {str(e)}")
                 if not self.is_canceled:
@@ -72,7 +74,7 @@ class ImportTitleUpdate(QThread):
         self._cleanup()
 
     def run(self):
-        zf = rf = szf = None
+        archive = None
         try:
             ext = os.path.splitext(self.input_path)[1].lower()
             is_compressed = os.path.isfile(self.input_path) and ext in self.data_mgr.getCompressedFileExtensions()
@@ -89,28 +91,12 @@ class ImportTitleUpdate(QThread):
 
             if is_compressed:
                 try:
-                    pwd = self.data_mgr.getKey()
-                    if ext == ".zip":
-                        zf = zipfile.ZipFile(self.input_path, "r")
-                        if pwd: zf.setpassword(pwd.encode('utf-8'))
-                    elif ext == ".7z":
-                        szf = py7zr.SevenZipFile(self.input_path, "r", password=pwd)
-                    elif ext == ".rar":
-                        unrar_path = self.data_mgr.getUnRAR()
-                        if not os.path.exists(unrar_path):
-                            self._handle_error(f"UnRAR tool not found at: {unrar_path}")
-                            return
-                        rarfile.UNRAR_TOOL = unrar_path
-                        rf = rarfile.RarFile(self.input_path, "r")
-                        if pwd: rf.setpassword(pwd)
-                    else:
-                        self._handle_error(f"Unsupported archive type: {ext}")
-                        return
-                except Exception as e:
-                    self._handle_error(f"Failed to open archive {self.input_path}: {str(e)}")
+                    archive = ArchiveReader(self.input_path, self.data_mgr.getKey(), self.data_mgr.getUnRAR())
+                except ArchiveError as e:
+                    self._handle_error(str(e))
                     return
 
-                archive_files = zf.namelist() if ext == ".zip" else szf.getnames() if ext == ".7z" else rf.namelist()
+                archive_files = archive.getNames()
                 for file in archive_files:
                     if os.path.basename(file).lower() in [e.lower() for e in expected_exes]:
                         self.exe_path_in_source = file
@@ -127,17 +113,12 @@ class ImportTitleUpdate(QThread):
                     return
 
                 try:
-                    if ext == ".zip":
-                        zf.extract(self.exe_path_in_source, path=self.temp_path)
-                    elif ext == ".7z":
-                        szf.extract(targets=[self.exe_path_in_source], path=self.temp_path)
-                    elif ext == ".rar":
-                        rf.extract(self.exe_path_in_source, path=self.temp_path)
-                    extracted_path = os.path.join(self.temp_path, self.exe_path_in_source)
+                    archive.extract(
+                        self.temp_path, include=lambda member: member.name == self.exe_path_in_source,
+                        rename=lambda member: exe_name,
+                        progress_callback=lambda done, total, *_: self.progress_channel.publish(bytes_done=done, bytes_total=total),
+                        cancel_check=lambda: self.is_canceled)
                     temp_exe_path = os.path.join(self.temp_path, exe_name)
-                    if os.path.exists(extracted_path):
-                        os.makedirs(os.path.dirname(temp_exe_path), exist_ok=True)
-                        shutil.move(extracted_path, temp_exe_path)
                     if not os.path.exists(temp_exe_path):
                         self._handle_error(f"Failed to extract executable: {exe_name} not found")
                         return
@@ -203,23 +184,42 @@ class ImportTitleUpdate(QThread):
             target_dir = self.game_mgr.getProfileDirectory(short_game_name, self.game_mgr.getProfileTypeTitleUpdate())
             os.makedirs(target_dir, exist_ok=True)
             update_size = self.get_file_size()
+            store = ContentStore(target_dir) if ConfigManager().getConfigKeyContentStore() else None
             final_path = os.path.join(target_dir, f"{update_name}{ext}" if is_compressed else update_name)
             self.emit_state(ImportState.IMPORTING, 90, f"Importing {update_name} ({update_size})")
 
-            if is_compressed:
+            if store:
+                # Files are stored relative to the folder holding the executable, as they are installed
+                progress_callback = lambda done, total, name: self.progress_channel.publish(bytes_done=done, bytes_total=total)
+                if is_compressed:
+                    final_path = store.addArchive(
+                        update_name, archive, include=lambda member: not root_dir or member.name.startswith(root_dir + '/'),
+                        rename=lambda member: os.path.relpath(member.name, root_dir).replace(os.sep, '/') if root_dir else member.name,
+                        progress_callback=progress_callback, cancel_check=lambda: self.is_canceled)
+                else:
+                    final_path = store.addFolder(update_name, root_dir, progress_callback=progress_callback, cancel_check=lambda: self.is_canceled)
+                if not final_path:
+                    return
+                store.collectGarbage()
+            elif is_compressed:
                 if os.path.exists(final_path):
                     os.remove(final_path)
-                shutil.copy2(self.input_path, final_path)
+                IntegrityManager.deleteDigest(final_path)
+                IntegrityManager.copyWithDigest(
+                    self.input_path, final_path, lambda done, total: self.progress_channel.publish(bytes_done=done, bytes_total=total)
+                )
             else:
                 if os.path.exists(final_path):
                     shutil.rmtree(final_path, ignore_errors=True)
                 os.makedirs(final_path, exist_ok=True)
-                for item in os.listdir(root_dir):
+                items = os.listdir(root_dir)
+                for i, item in enumerate(items):
                     src, dst = os.path.join(root_dir, item), os.path.join(final_path, item)
                     if os.path.isfile(src):
                         shutil.copy2(src, dst)
                     elif os.path.isdir(src):
                         shutil.copytree(src, dst, dirs_exist_ok=True)
+                    self.progress_channel.publish(items_done=i + 1, items_total=len(items))
 
             self.emit_state(ImportState.IMPORTING, 90, f"{update_name} ({update_size})", True)
             self._cleanup()
@@ -229,9 +229,7 @@ class ImportTitleUpdate(QThread):
             if not self.is_canceled:
                 self.error_signal.emit(f"Import failed: {str(e)}")
         finally:
-            if zf: zf.close()
-            if rf: rf.close()
-            if szf: szf.close()
+            if archive: archive.close()
             self._cleanup()
             self.quit()
 
@@ -0,0 +1,33 @@
+import os
+from PySide6.QtWidgets import QFileDialog
+
+from Core.Logger import logger
+from Core.ConfigManager import ConfigManager
+from Core.GameManager import GameManager
+from Core.AppDataManager import AppDataManager
+from Core.NotificationManager import NotificationHandler
+from Core.SettingsBackup import SettingsBackup
+from Core.ErrorHandler import ErrorHandler
+
+def restore_settings_backup(parent=None):
+    try:
+        game_path = ConfigManager().getConfigKeySelectedGame()
+        game_mgr = GameManager()
+        backup_dir = os.path.join(AppDataManager.getBackupsFolder(), game_mgr.getSelectedGameId(game_path))
+        settings_path = game_mgr.getGameSettingsFolderPath(game_path)
+        snapshot_path, _ = QFileDialog.getOpenFileName(
+            parent, "Restore Game Settings Backup", backup_dir, f"Settings Backups (*{SettingsBackup.EXTENSION})")
+        if not snapshot_path:
+            return
+        confirmation_message = (
+            f"The game settings folder will be restored from:\n\"{os.path.basename(snapshot_path)}\"\n\n"
+            f"Files in \"{settings_path}\" that are part of the backup will be replaced.\n\n"
+            f"Do you want to continue?"
+        )
+        if NotificationHandler.showConfirmation(confirmation_message) != "Yes":
+            logger.info("Settings restore canceled by user")
+            return
+        SettingsBackup(os.path.dirname(snapshot_path)).restore(snapshot_path, settings_path)
+        NotificationHandler.showInfo(f"Game settings restored from {os.path.basename(snapshot_path)}")
+    except Exception as e:
+        ErrorHandler.handleError(f"Error restoring game settings backup: {e}")
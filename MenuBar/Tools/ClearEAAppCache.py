@@ -1,12 +1,12 @@
 import os
 import ctypes
 import psutil
-import shutil
 import winreg
-import time
 
 from Core.Logger import logger
 from Core.ErrorHandler import ErrorHandler
+from Core.FastDelete import FastDelete
+from Core.ProcessMonitor import ProcessMonitor
 
 EACachePaths = [
     os.path.join(os.getenv("USERPROFILE"), "AppData", "Roaming", "EA"),
@@ -20,7 +20,7 @@ EACachePaths = [
 def is_eadesktop_running():
     """Check if EA Desktop application is running"""
     try:
-        return next((proc.info['pid'] for proc in psutil.process_iter(['pid', 'name']) if proc.info['name'] == "EADesktop.exe"), None)
+        return next((proc.pid for proc in ProcessMonitor().find("EADesktop.exe")), None)
     except psutil.Error as e:
         ErrorHandler.handleError(f"Error checking if EA Desktop is running: {e}")
         return None
@@ -28,45 +28,18 @@ def is_eadesktop_running():
 def terminate_eadesktop(pid):
     """Force terminate EA Desktop and all related subprocesses if running"""
     try:
-        # Terminate all EACefSubProcess.exe subprocesses
-        logger.info("Scanning for EACefSubProcess.exe processes.")
-        cef_count = 0
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                if proc.info['name'] == "EACefSubProcess.exe":
-                    cef_count += 1
-                    sub_pid = proc.info['pid']
-                    sub_process = psutil.Process(sub_pid)
-                    if sub_process.is_running():
-                        sub_process.terminate()
-                        sub_process.wait(timeout=10)
-                        logger.info(f"EACefSubProcess.exe (PID: {sub_pid}) force closed.")
-            except (psutil.NoSuchProcess, psutil.AccessDenied, Exception) as e:
-                ErrorHandler.handleError(f"Failed to process EACefSubProcess.exe with error: {e}")
-        if cef_count > 0:
-            logger.info(f"Total EACefSubProcess.exe processes found and terminated: {cef_count}")
-        else:
-            logger.info("No EACefSubProcess.exe processes found running.")
-
-        # terminate EALocalHostSvc.exe
-        logger.info("Scanning for EALocalHostSvc.exe processes.")
-        svc_count = 0
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                if proc.info['name'] == "EALocalHostSvc.exe":
-                    svc_count += 1
-                    svc_pid = proc.info['pid']
-                    svc_process = psutil.Process(svc_pid)
-                    if svc_process.is_running():
-                        svc_process.terminate()
-                        svc_process.wait(timeout=10)
-                        logger.info(f"EALocalHostSvc.exe (PID: {svc_pid}) force closed.")
-            except (psutil.NoSuchProcess, psutil.AccessDenied, Exception) as e:
-                ErrorHandler.handleError(f"Failed to process EALocalHostSvc.exe with error: {e}")
-        if svc_count > 0:
-            logger.info(f"Total EALocalHostSvc.exe processes found and terminated: {svc_count}")
-        else:
-            logger.info("No EALocalHostSvc.exe processes found running.")
+        # Terminate the EACefSubProcess.exe subprocesses and EALocalHostSvc.exe
+        for name in ("EACefSubProcess.exe", "EALocalHostSvc.exe"):
+            processes = ProcessMonitor().find(name)
+            for proc in processes:
+                if proc.terminate(timeout=10):
+                    logger.info(f"{name} (PID: {proc.pid}) force closed.")
+                else:
+                    ErrorHandler.handleError(f"Failed to close {name} (PID: {proc.pid})")
+            if processes:
+                logger.info(f"Total {name} processes found and terminated: {len(processes)}")
+            else:
+                logger.info(f"No {name} processes found running.")
 
         # Terminate the main EADesktop.exe process
         logger.info(f"Attempting to terminate EADesktop.exe with PID: {pid}")
@@ -81,8 +54,10 @@ def terminate_eadesktop(pid):
         except (psutil.NoSuchProcess, psutil.AccessDenied, Exception) as e:
             ErrorHandler.handleError(f"Failed to terminate EADesktop.exe with error: {e}")
 
-        logger.info("Waiting 5 seconds before proceeding with cleanup...")
-        time.sleep(5)
+        # Helpers EA Desktop starts again while it shuts down are caught by their exit events
+        logger.info("Waiting for EA Desktop processes to exit before proceeding with cleanup...")
+        if not ProcessMonitor().waitUntilGone(ProcessMonitor.EA_PROCESSES, timeout=5):
+            logger.warning("EA Desktop processes are still running, proceeding with cleanup anyway.")
 
         return True
     except (psutil.NoSuchProcess, psutil.AccessDenied, Exception) as e:
@@ -121,12 +96,9 @@ def delete_cache_files():
         for path in EACachePaths:
             if os.path.exists(path):
                 try:
-                    if os.path.isdir(path):
-                        shutil.rmtree(path)
-                        logger.info(f"Deleted directory: {path}")
-                    else:
-                        os.remove(path)
-                        logger.info(f"Deleted file: {path}")
+                    is_dir = os.path.isdir(path)
+                    FastDelete.deleteTree(path)
+                    logger.info(f"Deleted {'directory' if is_dir else 'file'}: {path}")
                     deleted_files += 1
                 except Exception as e:
                     ErrorHandler.handleError(f"Error deleting {path}: {e}")
@@ -11,6 +11,7 @@ from UIComponents.MainStyles import MainStyles
 
 from Core.Logger import logger
 from Core.ErrorHandler import ErrorHandler
+from Core.ProcessMonitor import ProcessMonitor
 
 class EAAppWindow(BaseWindow):
     def __init__(self, parent=None):
@@ -65,7 +66,7 @@ class EAAppWindow(BaseWindow):
             ErrorHandler.handleError(f"Error setting up UI: {e}")
     def manage_eadesktop(self):
         try:
-            pid = next((proc.info['pid'] for proc in psutil.process_iter(['pid', 'name']) if proc.info['name'] == "EADesktop.exe"), None)
+            pid = next((proc.pid for proc in ProcessMonitor().find("EADesktop.exe")), None)
             if pid:
                 logger.info(f"EA Desktop is running (PID: {pid}). Terminating...")
                 process = psutil.Process(pid)
@@ -11,6 +11,7 @@ from UIComponents.MainStyles import MainStyles
 
 from Core.Logger import logger
 from Core.ErrorHandler import ErrorHandler
+from Core.ProcessMonitor import ProcessMonitor
 
 class EpicGamesWindow(BaseWindow):
     def __init__(self, parent=None):
@@ -74,7 +75,7 @@ class EpicGamesWindow(BaseWindow):
 
     def manage_epicgames(self):
         try:
-            pid = next((proc.info['pid'] for proc in psutil.process_iter(['pid', 'name']) if proc.info['name'] == "EpicGamesLauncher.exe"), None)
+            pid = next((proc.pid for proc in ProcessMonitor().find("EpicGamesLauncher.exe")), None)
 
             if pid:
                 logger.info(f"Epic Games Launcher is running (PID: {pid}). Terminating...")
@@ -7,6 +7,7 @@ from UIWindows.ImportTitleUpdateWindow import ImportTitleUpdateWindow
 from MenuBar.File.OpenSquadFilesPath import open_squad_files_path
 from MenuBar.File.OpenGameFolder import open_game_path
 from MenuBar.File.OpenBackupsFolder import open_backups_path
+from MenuBar.File.RestoreSettingsBackup import restore_settings_backup
 from MenuBar.Tools.ClearEAAppCache import delete_cache_files
 from MenuBar.Tools.RepairGame.Steam import SteamWindow
 from MenuBar.Tools.RepairGame.EAApp import EAAppWindow
@@ -130,6 +131,7 @@ class MenuBar:
         menu.addAction(self._create_action("Open Game Folder", "open_folder", open_game_path, "Ctrl+G"))
         menu.addAction(self._create_action("Open Squad Files Path", "open_folder", open_squad_files_path))
         menu.addAction(self._create_action("Open Backups Folder", "open_folder", open_backups_path))
+        menu.addAction(self._create_action("Restore Game Settings Backup", "restart_app", lambda: restore_settings_backup(self.parent)))
         menu.addSeparator()
         menu.addAction(self._create_action("Exit", "exit", QApplication.quit, "Alt+F4"))
         menu.exec(button.mapToGlobal(QPoint(button.rect().bottomLeft().x(), button.rect().bottomLeft().y())))
@@ -120,6 +120,15 @@ TOOLTIPS = {
     "deleteSquadsAfterInatall": {"text": "This automatically deletes the squad update file from the Profiles folder after it has been installed on your game.\nThis helps save disk space and prevents the buildup of squad update files in Profiles folder.", 
                                  "formats": {"This helps save disk space and prevents the buildup of squad update files in Profiles folder.": ["highlight"]}, 
                                  "position": ToolTipPosition.BOTTOM_LEFT, "delay": 880},
+    "installSquadsWhileDownloading": {"text": "Extracts the squad file next to your settings folder while it downloads, then installs it as soon as the download completes.\nThe squad file is still kept in Profiles folder unless it is set to be deleted once installed.", 
+                                      "formats": {"The squad file is still kept in Profiles folder unless it is set to be deleted once installed.": ["highlight"]}, 
+                                      "position": ToolTipPosition.BOTTOM_LEFT, "delay": 880},
+    "deltaInstall": {"text": "Compares the installed game files with the title update's depot manifests and only extracts the files that changed, instead of cleaning the game folder and installing every file.\nFiles the title update does not have are still deleted, the \"Data\" folder is left as it is.",
+                     "formats": {"Files the title update does not have are still deleted, the \"Data\" folder is left as it is.": ["highlight"]},
+                     "position": ToolTipPosition.BOTTOM_LEFT, "delay": 880},
+    "contentStore": {"text": "Stores imported and backed up title updates file by file in the Profiles folder, keeping each identical file only once across all of them, instead of a full archive or folder per title update.\nStored title updates show as \"Ready To Install\" and install like any other; downloaded archives are kept as they are.",
+                     "formats": {"Stored title updates show as \"Ready To Install\" and install like any other; downloaded archives are kept as they are.": ["highlight"]},
+                     "position": ToolTipPosition.BOTTOM_LEFT, "delay": 880},
     "deleteLiveTuningUpdate": {"text": "This automatically deletes the Live Tuning Update file (attribdb.bin) after rolling back your title update.\nThis helps eliminate any changes to gameplay attributes, keeping the game using the original gameplay data from the title update only.", 
                                "formats": {"This helps eliminate any changes to gameplay attributes, keeping the game using the original gameplay data from the title update only.": ["highlight"]}, 
                                "position": ToolTipPosition.BOTTOM_LEFT, "delay": 880},
@@ -127,15 +136,24 @@ TOOLTIPS = {
     "openLiveTuningFolder": {"text": "Locate", "position": ToolTipPosition.TOP, "delay": 880},
 
     # Download Options
+    "downloadEngineOptions": {"text": "Sets the engine used to download updates.\nNative is built into the tool and needs no external programs, aria2 requires aria2c.exe in Data/ThirdParty.", 
+                              "formats": {"Native is built into the tool and needs no external programs, aria2 requires aria2c.exe in Data/ThirdParty.": ["highlight"]}, 
+                              "position": ToolTipPosition.TOP_LEFT, "delay": 880},
     "segmentsOptions": {"text": "Sets the number of segments to split the download into.\nMore segments can increase download speed by enabling parallel downloads, but too many may cause instability or errors.", 
                         "formats": {"More segments can increase download speed by enabling parallel downloads, but too many may cause instability or errors.": ["highlight"]}, 
                         "position": ToolTipPosition.TOP_LEFT, "delay": 880},
+    "autoTuneSegments": {"text": "Measures the download speed during the first seconds and adds or removes segments to get the most out of the server.\nThe chosen number is remembered for each server and used as the starting point next time.", 
+                         "formats": {"The chosen number is remembered for each server and used as the starting point next time.": ["highlight"]}, 
+                         "position": ToolTipPosition.TOP_LEFT, "delay": 880},
     "speedLimitOptions": {"text": "This caps your download speed to a chosen value in KBytes/sec.\nThis helps manage bandwidth usage.", 
                           "formats": {"This helps manage bandwidth usage.": ["highlight"]}, 
                           "position": ToolTipPosition.BOTTOM_LEFT, "delay": 880},
-    "autoUseIDM": {"text": "This uses your installed Internet Download Manager (IDM) to handle downloads automatically.\nThis will override aria2.", 
-                   "formats": {"This will override aria2.": ["highlight"]}, 
+    "autoUseIDM": {"text": "This uses your installed Internet Download Manager (IDM) to handle downloads automatically.\nThis will override the selected download engine.", 
+                   "formats": {"This will override the selected download engine.": ["highlight"]}, 
                    "position": ToolTipPosition.BOTTOM_LEFT, "delay": 880},
+    "installAfterDownload": {"text": "Installs each update as soon as its download completes, one install at a time.\nOther downloads keep running while an update installs.",
+                             "formats": {"one install at a time": ["highlight"]},
+                             "position": ToolTipPosition.BOTTOM_LEFT, "delay": 880},
     "changeIDMPath": {"text": "Change Internet Download Manager executable path.\nThis will override the automatically detected path.", 
                       "formats": {"This will override the automatically detected path.": ["highlight"]}, 
                       "position": ToolTipPosition.BOTTOM_LEFT, "delay": 880},
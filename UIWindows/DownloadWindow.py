@@ -14,7 +14,10 @@ from Core.Logger import logger
 from Core.ConfigManager import ConfigManager
 from Core.GameManager import GameManager
 from Core.ErrorHandler import ErrorHandler
-from Core.DownloadCore import DownloadCore
+from Core.NotificationManager import NotificationHandler
+from Core.DownloadScheduler import DownloadScheduler, DownloadJob
+from Core.JobPipeline import JobPipeline
+from Core.ProgressBus import ProgressBus, ProgressFrame
 
 # Window Constants
 WINDOW_TITLE = "Downloading: {}"
@@ -32,8 +35,10 @@ BOLD_STYLE = "font-size: 16px; font-weight: bold; color: rgba(255, 255, 255, 0.9
 NORMAL_STYLE = "font-size: 14px; color: rgba(255, 255, 255, 0.7); background-color: transparent;"
 
 class DownloadWindow(BaseWindow):
-    def __init__(self, update_name, download_url, short_game_name, tab_key, file_name=None, parent=None):
+    def __init__(self, update_name, download_url, short_game_name, tab_key, file_name=None, parent=None, expected_digests=None, size_bytes=0):
         super().__init__(parent=parent)
+        self.expected_digests = expected_digests or {}
+        self.size_bytes = size_bytes
         self.update_name = update_name or "Unknown Update"
         self.download_url = download_url
         self.short_game_name = short_game_name
@@ -42,6 +47,9 @@ class DownloadWindow(BaseWindow):
         self.game_manager = GameManager()
         self.use_idm = self.config_manager.getConfigKeyAutoUseIDM() and self.config_manager.getConfigKeyIDMPath()
         self.button_manager = ButtonManager(self)
+        self.scheduler = DownloadScheduler()
+        self.progress_bus = ProgressBus()
+        self.job = None
         self.download_thread = None
         self.timer = QTimer(self)
         self.downloaded = 0.0
@@ -52,6 +60,7 @@ class DownloadWindow(BaseWindow):
         self.splits = "0"
         self.is_paused = False
         self.download_started = False
+        self.queue_summary = ""
         
         self.setWindowTitle(WINDOW_TITLE.format(self.update_name))
         self.resize(*WINDOW_SIZE)
@@ -65,8 +74,15 @@ class DownloadWindow(BaseWindow):
     def closeEvent(self, event):
         """Handle window close event."""
         try:
+            self._disconnect_scheduler()
+            if self.download_thread:
+                self.progress_bus.unsubscribe(self.download_thread.progress_channel, self.update_progress_from_frame)
+            if self.job:
+                # Keep the job queued, with its partial data, until it is resumed
+                self.scheduler.suspend(self.job)
             if self.download_thread and not self.download_thread.cancel_flag:
-                self.download_thread.cancel()
+                self.download_thread.cancel(keep_partial=True)
+            if self.download_thread:
                 self.download_thread.wait()
             super().closeEvent(event)
         except Exception as e:
@@ -151,9 +167,53 @@ class DownloadWindow(BaseWindow):
         super().showEvent(event)
 
     def start_download(self):
-        self.download_thread = DownloadCore(self.download_url, self.short_game_name, self.update_name, self.tab_key)
+        if self.job:
+            return
+        self.scheduler.job_started.connect(self.on_job_started)
+        self.scheduler.queue_changed.connect(self.on_queue_changed)
+        self.scheduler.queue_progress.connect(self.on_queue_progress)
+        self.job = self.scheduler.enqueue(self.short_game_name, self.tab_key, self.update_name, self.download_url,
+                                          self.size_bytes, self.expected_digests)
+        # The pipeline installs it once downloaded, when asked to or when squads were extracted while downloading,
+        # into the game the download is for, which a download restored from the queue may not share with the selected one
+        JobPipeline().submit(self.job, self.game_manager.getGamePathById(self.job.game_id), self.config_manager.getConfigKeyInstallAfterDownload())
+        if self.job.thread:
+            self.on_job_started(self.job)
+        else:
+            self.scheduler.schedule()
+        self.on_queue_changed()
+
+    def on_job_started(self, job: DownloadJob):
+        if job is not self.job or self.download_thread is job.thread:
+            return
+        self.download_thread = job.thread
         self.connect_download_signals()
-        self.download_thread.start()
+        if job.thread.isRunning():
+            self.on_download_started()
+        self.button_manager.update_button_states()
+        self.update_info_label()
+
+    def on_queue_changed(self):
+        if self.job and not self.download_thread:
+            self.update_info_label()
+
+    def on_queue_progress(self, downloaded, total, rate, eta):
+        active_jobs = len(self.scheduler.getActiveJobs())
+        self.queue_summary = (
+            f"Queue ({active_jobs}): {downloaded:.2f} / {total:.2f} MB, {rate:.2f} MB/s, {self.format_time_left(eta)}"
+            if active_jobs > 1 else ""
+        )
+
+    def _disconnect_scheduler(self):
+        for signal, slot in [
+            (self.scheduler.job_started, self.on_job_started),
+            (self.scheduler.queue_changed, self.on_queue_changed),
+            (self.scheduler.queue_progress, self.on_queue_progress),
+        ]:
+            try:
+                signal.disconnect(slot)
+            except (RuntimeError, TypeError):
+                pass
 
     def connect_download_signals(self):
         signals = [
@@ -161,11 +221,11 @@ class DownloadWindow(BaseWindow):
             (self.download_thread.resumed_signal, self.on_resumed),
             (self.download_thread.download_completed_signal, self.handle_download_completed),
             (self.download_thread.download_started_signal, self.on_download_started),
-            (self.download_thread.progress_signal, self.update_progress_from_signal),
             (self.download_thread.error_signal, self.close),
         ]
         for signal, slot in signals:
             signal.connect(slot)
+        self.progress_bus.subscribe(self.download_thread.progress_channel, self.update_progress_from_frame)
 
     def on_download_started(self):
         logger.info("Download started.")
@@ -200,15 +260,15 @@ class DownloadWindow(BaseWindow):
             return
         self.update_info_label()
 
-    def update_progress_from_signal(self, downloaded, total, percentage, rate, eta, connections, splits):
+    def update_progress_from_frame(self, frame: ProgressFrame):
         if not self.use_idm:
-            self.downloaded = downloaded
-            self.total = total
-            self.progress_ring.setValue(int(percentage))
-            self.rate = f"{rate:.2f} MB/s"
-            self.time_left = self.format_time_left(eta)
-            self.connections = str(connections)
-            self.splits = str(splits)
+            self.downloaded = frame.bytes_done / (1024 ** 2)
+            self.total = frame.bytes_total / (1024 ** 2)
+            self.progress_ring.setValue(int(frame.percentage))
+            self.rate = f"{frame.rate / (1024 ** 2):.2f} MB/s"
+            self.time_left = self.format_time_left(frame.getETAText())
+            self.connections = str(frame.extra.get("connections", 0))
+            self.splits = str(frame.extra.get("splits", 0))
             self.button_manager.update_button_states()
             self.update_info_label()
 
@@ -238,7 +298,17 @@ class DownloadWindow(BaseWindow):
             self.wait_view.show()
             return
 
-        if self.use_idm:
+        if self.job and not self.download_thread:
+            position = self.scheduler.getQueuePosition(self.job)
+            self.progress_view.hide()
+            self.spinner.show()
+            self.spinner_label.setText("Queued...")
+            self.extra_info_label.setText(
+                f"{position} download(s) ahead in the queue." if position else "Waiting for a free connection..."
+            )
+            self.extra_info_label.show()
+            self.wait_view.show()
+        elif self.use_idm:
             self.progress_view.hide()
             self.spinner.show()
             self.spinner_label.setText("Waiting for IDM to complete...")
@@ -257,7 +327,8 @@ class DownloadWindow(BaseWindow):
                     f"Time Left: {self.time_left}<br>"
                     f"Splits: {self.splits}<br>"
                     f"Connections: {self.connections}"
-                    f"</span></div>"
+                    + (f"<br>{self.queue_summary}" if self.queue_summary else "") +
+                    "</span></div>"
                 )
                 self.progress_view.show()
             else:
@@ -281,19 +352,34 @@ class ButtonManager:
         return self.button_container
 
     def close(self):
+        if self.window.job:
+            self.window.scheduler.cancel(self.window.job)
         if self.window.download_thread:
-            self.window.download_thread.cancel()
             self.window.download_thread.quit()
             self.window.download_thread.wait()
         self.window.close()
 
     def cancel(self):
+        if self.window.job and not self.window.download_thread:
+            self.window.scheduler.cancel(self.window.job, keep_partial=True)
+            self.window.job = None
+            self.window.close()
+            return
         if self.window.download_thread and not self.window.use_idm:
+            keep_partial = False
+            if self.window.downloaded > 0.0:
+                response = NotificationHandler.showConfirmation(
+                    "Do you want to keep the downloaded part so the download can resume later?\n\n"
+                    "Yes: Keep it and resume next time.\nNo: Delete it.\nCancel: Continue downloading."
+                )
+                if response == "Cancel":
+                    return
+                keep_partial = response == "Yes"
             self.window.update_info_label(cancelling=True)
             self.window.download_thread.cancel_status_signal.connect(
                 lambda status: self.window.close() if status == "canceled" else None
             )
-            self.window.download_thread.cancel()
+            self.window.scheduler.cancel(self.window.job, keep_partial=keep_partial)
 
     def toggle_pause(self):
         if self.window.download_thread and not self.window.use_idm:
@@ -309,7 +395,14 @@ class ButtonManager:
                 self.buttons["resume"].hide()
             self.window.update_info_label()
 
+    def prioritize(self):
+        if self.window.job:
+            self.window.scheduler.setPriority(self.window.job, DownloadJob.PRIORITY_HIGH)
+        self.buttons["prioritize"].hide()
+
     def update_button_states(self):
+        is_queued = self.window.job is not None and not self.window.download_thread
+        self.buttons["prioritize"].setVisible(is_queued and self.window.job.priority != DownloadJob.PRIORITY_HIGH)
         if self.window.downloaded == 0.0:
             self.buttons["pause"].setEnabled(False)
             self.buttons["resume"].setEnabled(False)
@@ -321,6 +414,7 @@ class ButtonManager:
         button_configs = {
             "pause": (" Pause", self.toggle_pause, QIcon("Data/Assets/Icons/ic_fluent_Pause_24_regular.png")),
             "resume": (" Start", self.toggle_pause, QIcon("Data/Assets/Icons/ic_fluent_play_24_regular.png")),
+            "prioritize": ("Download First", self.prioritize, None),
             "cancel": ("Cancel", self.cancel, None),
             "close": ("Close Window", self.close, None)
         }
@@ -331,6 +425,7 @@ class ButtonManager:
                 btn.setIcon(icon)
             self.buttons[name] = btn
         self.buttons["resume"].hide()
+        self.buttons["prioritize"].hide()
         if self.window.use_idm:
             self.buttons["pause"].hide()
             self.buttons["resume"].hide()
@@ -343,6 +438,7 @@ class ButtonManager:
         self.button_layout = QHBoxLayout()
         if not self.window.use_idm:
             self.button_layout.addStretch()
+            self.button_layout.addWidget(self.buttons["prioritize"])
             self.button_layout.addWidget(self.buttons["cancel"])
             self.button_layout.addWidget(self.buttons["pause"]) 
             self.button_layout.addWidget(self.buttons["resume"])
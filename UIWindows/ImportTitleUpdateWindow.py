@@ -17,6 +17,7 @@ from Core.MainDataManager import MainDataManager
 from Core.AppDataManager import AppDataManager
 from Core.GameManager import GameManager
 from Core.ErrorHandler import ErrorHandler
+from Core.ProgressBus import ProgressBus, ProgressFrame
 
 WINDOW_TITLE = "Import Title Update"
 WINDOW_SIZE = (420, 220)
@@ -41,19 +42,19 @@ class StateManager:
         self.progress_bar = progress_bar
         self.state_queue = deque()
 
-    def add_state(self, state: ImportState, progress: int, details: str, is_success: bool):
+    def add_state(self, state: ImportState, progress: int, details: str, is_success: bool, stats: str = ""):
         """Add a state to the queue and process it immediately."""
-        self.state_queue.append((state, progress, details, is_success))
+        self.state_queue.append((state, progress, details, is_success, stats))
         self.process_state_queue()
 
     def process_state_queue(self):
         """Process the state queue and update the UI."""
         if not self.state_queue:
             return
-        state, progress, details, is_success = self.state_queue.popleft()
-        self.update_ui(state, progress, details, is_success)
+        state, progress, details, is_success, stats = self.state_queue.popleft()
+        self.update_ui(state, progress, details, is_success, stats)
 
-    def update_ui(self, state: ImportState, progress: int, details: str, is_success: bool):
+    def update_ui(self, state: ImportState, progress: int, details: str, is_success: bool, stats: str = ""):
         """Update the UI based on the current state."""
         try:
             if state == ImportState.COMPLETED:  # Changed from IMPORT_COMPLETED to COMPLETED
@@ -65,6 +66,7 @@ class StateManager:
                 state_style = WHITE_BOLD
                 details_style = GREEN_NORMAL if is_success else WHTE_NORMAL
                 details_text = f"<br><span style='{details_style}'>{details}</span>" if details else ""
+                details_text += f"<br><span style='{WHTE_NORMAL}'>{stats}</span>" if stats else ""
                 self.update_info_label.setStyleSheet("")
                 self.update_info_label.setText(
                     f"<span style='{state_style}'>Current Task: {state.value}</span>{details_text}"
@@ -82,6 +84,7 @@ class ImportTitleUpdateWindow(BaseWindow):
         self.app_data_mgr = AppDataManager()
         self.operation_id = str(uuid.uuid4())
         self.import_thread = None
+        self.progress_bus = ProgressBus()
         self.is_completed = False
         self.is_canceled = False
         self.button_manager = ButtonManager(self)
@@ -97,6 +100,8 @@ class ImportTitleUpdateWindow(BaseWindow):
     def closeEvent(self, event):
         """Handle window close event."""
         try:
+            if self.import_thread:
+                self.progress_bus.unsubscribe(self.import_thread.progress_channel)
             if self.import_thread and self.import_thread.isRunning():
                 if not self.is_canceled and not self.is_completed:
                     self.import_thread.cancel()
@@ -196,7 +201,7 @@ class ImportTitleUpdateWindow(BaseWindow):
         """Connect import thread signals to handlers."""
         try:
             logger.debug(f"Connecting signals for ImportTitleUpdate: {self.input_path}")
-            self.import_thread.state_changed.connect(self.state_manager.add_state)
+            self.progress_bus.subscribe(self.import_thread.progress_channel, self.on_progress_frame)
             self.import_thread.completed_signal.connect(self.handle_import_completed)
             self.import_thread.error_signal.connect(self.handle_import_error)
             self.import_thread.cancel_signal.connect(self.handle_import_canceled)
@@ -204,9 +209,19 @@ class ImportTitleUpdateWindow(BaseWindow):
             ErrorHandler.handleError(f"Failed to connect ImportTitleUpdate signals: {str(e)}")
             raise
 
+    def on_progress_frame(self, frame: ProgressFrame):
+        """Render the latest coalesced progress of the import thread."""
+        stats = ""
+        if frame.bytes_total and frame.bytes_done < frame.bytes_total:
+            stats = f"{frame.bytes_done / 1024 ** 2:.2f} / {frame.bytes_total / 1024 ** 2:.2f} MB, {frame.rate / 1024 ** 2:.2f} MB/s, Time Left: {frame.getETAText()}"
+        elif frame.items_total and frame.items_done < frame.items_total:
+            stats = f"{frame.items_done} / {frame.items_total} items, Time Left: {frame.getETAText()}"
+        self.state_manager.add_state(frame.state, int(frame.percentage), frame.details, frame.extra.get("is_success", False), stats)
+
     def handle_import_completed(self):
         """Handle import completion."""
         try:
+            self.progress_bus.flush(self.import_thread.progress_channel)
             self.is_completed = True
             self.button_manager.update_button_states(completed=True)
             if self.import_thread:
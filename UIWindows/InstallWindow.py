@@ -14,9 +14,11 @@ from Core.Logger import logger
 from Core.ConfigManager import ConfigManager
 from Core.GameManager import GameManager
 from Core.ErrorHandler import ErrorHandler
+from Core.ProgressBus import ProgressBus, ProgressFrame
+from Core.JobPipeline import JobPipeline
 
 WINDOW_TITLE = "Installing Update"
-WINDOW_SIZE = (460, 250)
+WINDOW_SIZE = (460, 280)
 THEME_COLOR = "#00FF00"
 SPACER_WIDTH = 75
 BAR_HEIGHT = 32
@@ -29,6 +31,7 @@ TITLE_GREEN_STYLE = "font-size: 14px; font-weight: bold; color: #00FF00;"
 OPTIONS_STYLE = "font-size: 14px; font-weight: bold; color: #FFFF00;"
 DISC_STYLE = "font-size: 14px; color: rgba(255, 255, 255, 0.8);"
 FILE_NAMES_STYLE = "font-size: 14px; color: #00FF00;"
+PLAN_STYLE = "font-size: 12px; color: rgba(255, 255, 255, 0.6); background-color: transparent;"
 
 SEPARATOR_STYLE = {"styleSheet": "background-color: rgba(255, 255, 255, 0.1);", "fixedHeight": 1}
 
@@ -40,23 +43,23 @@ class StateManager:
         self.state_queue = deque()
         self.current_progress = 0
 
-    def add_state(self, state: InstallState, progress: int, details: str):
+    def add_state(self, state: InstallState, progress: int, details: str, stats: str = ""):
         """Add a state to the queue and process it immediately."""
-        self.state_queue.append((state, progress, details))
+        self.state_queue.append((state, progress, details, stats))
         self.process_state_queue()
 
     def process_state_queue(self):
         """Process the state queue and update the UI."""
         if not self.state_queue:
             return
-        state, progress, details = self.state_queue.popleft()
-        self.update_ui(state, progress, details)
+        state, progress, details, stats = self.state_queue.popleft()
+        self.update_ui(state, progress, details, stats)
 
-    def update_ui(self, state: InstallState, progress: int, details: str):
+    def update_ui(self, state: InstallState, progress: int, details: str, stats: str = ""):
         """Update the UI based on the current state."""
         try:
             # Update progress bar for specific states
-            if state in (InstallState.INSTALLING_FILES, InstallState.INSTALLING_SQUADS, InstallState.INSTALLING_FUT_SQUADS):
+            if state in (InstallState.VERIFYING_ARCHIVE, InstallState.COMPARING_FILES, InstallState.INSTALLING_FILES, InstallState.APPLYING_FILES, InstallState.INSTALLING_SQUADS, InstallState.INSTALLING_FUT_SQUADS):
                 self.current_progress = progress
                 self.progress_bar.setValue(self.current_progress)
 
@@ -80,6 +83,8 @@ class StateManager:
                 text = f"<span style='{TITLE_STYLE}'>Current Task: </span>" \
                     f"<span style='{style}'>{state.value}</span><br>" \
                     f"<span style='{details_style}'>{details}</span>"
+                if stats:
+                    text += f"<br><span style='{DISC_STYLE}'>{stats}</span>"
 
             self.progress_bar.setValue(progress_value)
             self.update_info_label.setText(text)
@@ -88,17 +93,19 @@ class StateManager:
             raise
 
 class InstallWindow(BaseWindow):
-    def __init__(self, update_name: str, tab_key: str, game_path: str, file_path: str, table_component=None, parent=None):
+    def __init__(self, update_name: str, tab_key: str, game_path: str, file_path: str, table_component=None, parent=None, pipeline_job=None):
         super().__init__(parent=parent)
         self.update_name = update_name
         self.tab_key = tab_key
         self.game_path = game_path
         self.file_path = file_path
         self.table_component = table_component  # Store table_component for signal connection
+        self.pipeline_job = pipeline_job  # Set when the install was chained to its download
         self.config_mgr = ConfigManager()
         self.game_mgr = GameManager()
         self.button_manager = ButtonManager(self)
         self.install_thread = None
+        self.progress_bus = ProgressBus()
         self.is_completed = False
         self.is_canceled = False
         self.setWindowTitle(f"{WINDOW_TITLE}: {self.update_name}")
@@ -114,6 +121,8 @@ class InstallWindow(BaseWindow):
     def closeEvent(self, event):
         """Handle window close event."""
         try:
+            if self.install_thread:
+                self.progress_bus.unsubscribe(self.install_thread.progress_channel)
             if self.install_thread and not self.is_canceled and not self.is_completed:
                 self.install_thread.cancel()
                 self.install_thread.wait()
@@ -173,6 +182,11 @@ class InstallWindow(BaseWindow):
         self.update_info_label.setWordWrap(True)
         self.update_info_label.setFixedWidth(400)
         label_layout.addWidget(self.update_info_label)
+        self.plan_label = QLabel("", alignment=Qt.AlignCenter, styleSheet=PLAN_STYLE)
+        self.plan_label.setWordWrap(True)
+        self.plan_label.setFixedWidth(400)
+        self.plan_label.hide()
+        label_layout.addWidget(self.plan_label)
         self.progress_bar = ProgressBar(self)
         self.progress_bar.setValue(0)
         self.progress_bar.setTextVisible(False)
@@ -202,19 +216,23 @@ class InstallWindow(BaseWindow):
         try:
             self.install_thread = InstallCore(self.update_name, self.tab_key, self.game_path, self.file_path)
             self.connect_install_signals()
+            JobPipeline().registerInstall(self.install_thread, self.pipeline_job)
             self.install_thread.start()
         except ValueError as e:
             ErrorHandler.handleError(f"Failed to start installation: {str(e)}")
+            if self.pipeline_job:
+                JobPipeline().releaseInstall(self.pipeline_job)
             self.close()
 
     def connect_install_signals(self):
         """Connect installation thread signals to handlers."""
         try:
             logger.debug(f"Connecting signals for InstallCore: {self.update_name}")
-            self.install_thread.state_changed.connect(self.state_manager.add_state)
+            self.progress_bus.subscribe(self.install_thread.progress_channel, self.on_progress_frame)
             self.install_thread.completed_signal.connect(self.handle_install_completed)
             self.install_thread.error_signal.connect(self.handle_install_error)
             self.install_thread.cancel_signal.connect(self.handle_install_canceled)
+            self.install_thread.plan_signal.connect(self.show_install_plan)
             # Connect request_table_update signal if table_component is provided and tab_key is TitleUpdates
             if (self.table_component and 
                 self.tab_key == self.game_mgr.getTabKeyTitleUpdates() and 
@@ -225,7 +243,25 @@ class InstallWindow(BaseWindow):
             ErrorHandler.handleError(f"Failed to connect InstallCore signals: {str(e)}")
             raise
 
+    def show_install_plan(self, summary: str):
+        """Show what the install is going to do, worked out before the game folder is touched."""
+        self.plan_label.setText(summary)
+        self.plan_label.show()
+
+    def on_progress_frame(self, frame: ProgressFrame):
+        """Render the latest coalesced progress of the install thread."""
+        stats = ""
+        if frame.state == InstallState.INSTALLATION_COMPLETED:
+            pass
+        elif frame.bytes_total:
+            stats = (f"{frame.bytes_done / 1024 ** 3:.2f} / {frame.bytes_total / 1024 ** 3:.2f} GB, {frame.rate / 1024 ** 2:.1f} MB/s, "
+                     f"Time Left: {frame.getETAText()}")
+        elif frame.items_total:
+            stats = f"{frame.items_done} / {frame.items_total} files, {frame.item_rate:.0f} files/s, Time Left: {frame.getETAText()}"
+        self.state_manager.add_state(frame.state, int(frame.percentage), frame.details, stats)
+
     def handle_install_completed(self):
+        self.progress_bus.flush(self.install_thread.progress_channel)
         self.is_completed = True
         self.button_manager.update_button_states(completed=True)
         QTimer.singleShot(1000, self.close)  
@@ -1,6 +1,5 @@
 import sys
 import re
-import requests
 from datetime import datetime
 from PySide6.QtWidgets import QApplication, QVBoxLayout, QLabel, QWidget
 from PySide6.QtGui import QGuiApplication, QIcon, QPixmap
@@ -14,6 +13,7 @@ from UIComponents.Spinner import LoadingSpinner
 from Core.ErrorHandler import ErrorHandler
 from Core.Logger import logger
 from Core.GameManager import GameManager
+from Core.HttpClient import HttpClient
 
 # Constants
 WINDOW_TITLE = "Patch Notes"
@@ -41,7 +41,7 @@ class PatchNotesFetcher(QObject):
 
         if patch_data and (cover_url := patch_data.get("coverUrl")):
             try:
-                response = requests.get(cover_url, timeout=10)
+                response = HttpClient().get(cover_url, timeout=10)
                 response.raise_for_status()
                 pixmap.loadFromData(response.content)
             except Exception as e:
@@ -396,6 +396,27 @@ class SettingsWindow(BaseWindow):
         delete_squads_cb.setChecked(self.config_mgr.getConfigKeyDeleteSquadsAfterInstall())
         delete_squads_cb.stateChanged.connect(lambda state: self.config_mgr.setConfigKeyDeleteSquadsAfterInstall(state == Qt.CheckState.Checked.value))
         apply_tooltip(delete_squads_cb, "deleteSquadsAfterInatall")
+
+        # Install squads while downloading
+        stream_squads_cb = CheckBox("Extract \"Squad File\" while downloading and install it once the download completes")
+        stream_squads_cb.setStyleSheet(TEXT_STYLE)
+        stream_squads_cb.setChecked(self.config_mgr.getConfigKeyInstallSquadsWhileDownloading())
+        stream_squads_cb.stateChanged.connect(lambda state: self.config_mgr.setConfigKeyInstallSquadsWhileDownloading(state == Qt.CheckState.Checked.value))
+        apply_tooltip(stream_squads_cb, "installSquadsWhileDownloading")
+
+        # Delta install
+        delta_install_cb = CheckBox("Only replace \"Title Update\" files that differ from the installed ones")
+        delta_install_cb.setStyleSheet(TEXT_STYLE)
+        delta_install_cb.setChecked(self.config_mgr.getConfigKeyDeltaInstall())
+        delta_install_cb.stateChanged.connect(lambda state: self.config_mgr.setConfigKeyDeltaInstall(state == Qt.CheckState.Checked.value))
+        apply_tooltip(delta_install_cb, "deltaInstall")
+
+        # Content store
+        content_store_cb = CheckBox("Keep imported and backed up \"Title Updates\" in a deduplicated store")
+        content_store_cb.setStyleSheet(TEXT_STYLE)
+        content_store_cb.setChecked(self.config_mgr.getConfigKeyContentStore())
+        content_store_cb.stateChanged.connect(lambda state: self.config_mgr.setConfigKeyContentStore(state == Qt.CheckState.Checked.value))
+        apply_tooltip(content_store_cb, "contentStore")
         
         # Delete live tuning update
         delete_live_container = QWidget()
@@ -514,6 +535,18 @@ class SettingsWindow(BaseWindow):
         card_layout.addWidget(delete_squads_cb)
         separator = self._create_separator(height=1)
         card_layout.addWidget(separator)
+
+        card_layout.addWidget(stream_squads_cb)
+        separator = self._create_separator(height=1)
+        card_layout.addWidget(separator)
+
+        card_layout.addWidget(delta_install_cb)
+        separator = self._create_separator(height=1)
+        card_layout.addWidget(separator)
+
+        card_layout.addWidget(content_store_cb)
+        separator = self._create_separator(height=1)
+        card_layout.addWidget(separator)
         
         card_layout.addWidget(delete_live_container)
 
@@ -532,6 +565,32 @@ class SettingsWindow(BaseWindow):
         card_layout.setContentsMargins(10, 10, 10, 10)
         card_layout.setSpacing(10)
 
+        # Download Engine
+        engine_container = QWidget()
+        engine_layout = QHBoxLayout(engine_container)
+        engine_layout.setContentsMargins(0, 0, 0, 0)
+        engine_layout.setSpacing(0)
+
+        engine_label = QLabel("Download Engine (Default: Native)")
+        engine_label.setStyleSheet(TEXT_STYLE)
+        apply_tooltip(engine_label, "downloadEngineOptions")
+
+        engine_combo = ComboBox()
+        engine_combo.addItems(["Native", "Aria2"])
+        engine_combo.setCurrentText(self.config_mgr.getConfigKeyDownloadEngine())
+        engine_combo.setFixedSize(300, 28)
+        engine_combo.currentTextChanged.connect(lambda text: self.config_mgr.setConfigKeyDownloadEngine(text))
+
+        engine_layout.addWidget(engine_label)
+        engine_layout.addStretch()
+        engine_layout.addWidget(engine_combo)
+
+        card_layout.addWidget(engine_container)
+
+        # Separator
+        separator = self._create_separator(height=1)
+        card_layout.addWidget(separator)
+
         # Segments
         segments_container = QWidget()
         segments_layout = QHBoxLayout(segments_container)
@@ -554,6 +613,14 @@ class SettingsWindow(BaseWindow):
 
         card_layout.addWidget(segments_container)
 
+        # Auto-tune Segments
+        autotune_cb = CheckBox("Auto-tune the number of segments for each server")
+        autotune_cb.setStyleSheet(TEXT_STYLE)
+        autotune_cb.setChecked(self.config_mgr.getConfigKeyAutoTuneSegments())
+        autotune_cb.stateChanged.connect(lambda state: self.config_mgr.setConfigKeyAutoTuneSegments(state == Qt.CheckState.Checked.value))
+        apply_tooltip(autotune_cb, "autoTuneSegments")
+        card_layout.addWidget(autotune_cb)
+
         # Separator
         separator = self._create_separator(height=1)
         card_layout.addWidget(separator)
@@ -611,7 +678,7 @@ class SettingsWindow(BaseWindow):
         idm_cb_layout.setContentsMargins(0, 0, 0, 0)
         idm_cb_layout.setSpacing(0)
 
-        idm_cb = CheckBox("Auto-use installed IDM for handling downloads instead of aria2")
+        idm_cb = CheckBox("Auto-use installed IDM for handling downloads instead of the download engine")
         idm_cb.setStyleSheet(TEXT_STYLE)
         idm_cb.setChecked(self.config_mgr.getConfigKeyAutoUseIDM())
         apply_tooltip(idm_cb, "autoUseIDM")
@@ -24,6 +24,7 @@ from Core.Logger import logger
 from Core.ConfigManager import ConfigManager
 from Core.GameManager import GameManager
 from Core.ErrorHandler import ErrorHandler
+from Core.CircuitBreaker import CircuitBreaker, CircuitOpenError
 
 # Constants
 TITLE = "Squads Tables Fetcher"
@@ -574,14 +575,21 @@ class NetworkWorker:
 
     def fetch_data(self, url: str, max_retries: int) -> bytes:
         self._initialize_network_manager()
+        breaker = CircuitBreaker()
         for attempt in range(max_retries):
             try:
+                breaker.check(url)
                 request = QNetworkRequest(QUrl(url))
                 request.setTransferTimeout(NetworkConfig.TIMEOUT)
                 self.current_reply = self.network_manager.get(request)
                 loop = QEventLoop()
                 self.current_reply.finished.connect(loop.quit)
                 loop.exec()
+                # No HTTP status means the host never answered, unless the reply was aborted by closing or canceling
+                if self.current_reply.attribute(QNetworkRequest.HttpStatusCodeAttribute) is not None:
+                    breaker.recordSuccess(url)
+                elif self.current_reply.error() != QNetworkReply.OperationCanceledError:
+                    breaker.recordFailure(url)
                 if self.current_reply.error() == QNetworkReply.NoError:
                     data = self.current_reply.readAll().data()
                     self.current_reply.deleteLater()
@@ -595,6 +603,8 @@ class NetworkWorker:
                     time.sleep(NetworkConfig.RETRY_WAIT)
                 else:
                     raise Exception(f"Failed to fetch data after {max_retries} attempts: {error_msg}")
+            except CircuitOpenError:
+                raise
             except Exception as e:
                 ErrorHandler.handleError(f"Unexpected error on attempt {attempt + 1}: {str(e)}")
                 if attempt < max_retries - 1: